@@ -0,0 +1,24 @@
+"""Benchmarks - run with `python -m benchmarks.<name>`"""
+
+import os
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures")
+
+
+def load_fixtures() -> dict[str, bytes]:
+    """Raw bytes of all JSON fixtures, keyed on file name."""
+
+    fixtures = {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith(".json"):
+            with open(os.path.join(FIXTURES_DIR, name), "rb") as fixture:
+                fixtures[name] = fixture.read()
+
+    return fixtures
+
+
+def load_fixture(name: str) -> bytes:
+    """Raw bytes of a single fixture."""
+
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as fixture:
+        return fixture.read()
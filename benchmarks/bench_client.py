@@ -0,0 +1,154 @@
+"""Benchmark - KatApiClient end to end against a local stand-in of the MVR API"""
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Iterator
+import statistics
+import time
+
+import httpx
+
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.errors import KatError
+from kat_bulgaria.kat_api_client import KatApiClient
+
+from .stand_in_server import RedirectTransport, StandInConfig, start_in_process
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_EGN = "0011223344"
+
+
+def _identities(count: int) -> list[KatIdentity]:
+    """Distinct identities, so request coalescing does not merge lookups."""
+
+    return [
+        KatIdentity.individual(_EGN, PersonalIdentificationType.DRIVING_LICENSE, f"{i:09d}")
+        for i in range(count)
+    ]
+
+
+def _max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _Run:
+    """Latencies and outcomes of one benchmark mode."""
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.outcomes: Counter[str] = Counter()
+
+    def record(self, started: float, error: KatError | None) -> None:
+        self.latencies.append(time.perf_counter() - started)
+        self.outcomes["ok" if error is None else error.error_subtype.name] += 1
+
+
+async def _lookup(client: KatApiClient, identity: KatIdentity, run: _Run) -> None:
+    started = time.perf_counter()
+    try:
+        await client.get_obligations(identity)
+    except KatError as err:
+        run.record(started, err)
+    else:
+        run.record(started, None)
+
+
+async def _single(client: KatApiClient, identities: list[KatIdentity], _concurrency: int, run: _Run) -> None:
+    for identity in identities:
+        await _lookup(client, identity, run)
+
+
+async def _concurrent(client: KatApiClient, identities: list[KatIdentity], concurrency: int, run: _Run) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(identity: KatIdentity) -> None:
+        async with semaphore:
+            await _lookup(client, identity, run)
+
+    await asyncio.gather(*(bounded(identity) for identity in identities))
+
+
+async def _batched(client: KatApiClient, identities: list[KatIdentity], concurrency: int, run: _Run) -> None:
+    submitted: dict[KatIdentity, float] = {}
+
+    def submit() -> Iterator[KatIdentity]:
+        # get_obligations_many pulls identities lazily, i.e. when it starts their lookup
+        for identity in identities:
+            submitted[identity] = time.perf_counter()
+            yield identity
+
+    async for result in client.get_obligations_many(submit(), concurrency):
+        run.record(submitted[result.identity], result.error)
+
+
+_MODES = {"single": _single, "concurrent": _concurrent, "batched": _batched}
+
+
+async def _bench(mode: str, port: int, args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    transport = RedirectTransport(port, args.timeout, limits)
+    identities = _identities(args.requests if mode != "single" else max(args.requests // 10, 1))
+    run = _Run()
+
+    async with KatApiClient(transport=transport) as client:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        await _MODES[mode](client, identities, args.concurrency, run)
+        cpu = time.process_time() - cpu
+        wall = time.perf_counter() - wall
+
+    latencies = sorted(run.latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+    rss = _max_rss_mb()
+    outcomes = ", ".join(f"{name}={count}" for name, count in run.outcomes.most_common())
+
+    print(f"{mode:<11} {len(latencies):>6} {len(latencies) / wall:>9.1f} {p50:>8.1f} {p99:>8.1f} "
+          f"{cpu / len(latencies) * 1000:>8.3f} {rss if rss is not None else float('nan'):>8.1f}  {outcomes}")
+
+
+def main() -> None:
+    """Runs every mode against one stand-in server."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000, help="lookups per mode (single runs a tenth)")
+    parser.add_argument("--concurrency", type=int, default=20, help="lookups in flight and pool size")
+    parser.add_argument("--latency", type=float, default=0.02, help="server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="random extra server latency in seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.01, help="share of throttling pages")
+    parser.add_argument("--reading-error-rate", type=float, default=0.01, help="share of errorReadingData")
+    parser.add_argument("--timeout-rate", type=float, default=0.005, help="share of stalled responses")
+    parser.add_argument("--timeout", type=float, default=1.0, help="client timeout in seconds")
+    parser.add_argument("--modes", nargs="+", choices=list(_MODES), default=list(_MODES))
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+        reading_error_rate=args.reading_error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_delay=args.timeout * 2)
+    process, port = start_in_process(config)
+
+    print(f"{'mode':<11} {'calls':>6} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'cpu ms':>8} {'rss MB':>8}  outcomes")
+
+    try:
+        for mode in args.modes:
+            asyncio.run(_bench(mode, port, args))
+    finally:
+        process.terminate()
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Micro-benchmarks - parsing and validation hot paths
+
+Requires pytest-benchmark. Run with `python -m pytest benchmarks/bench_hot_paths.py`,
+add `--benchmark-compare` to compare against a saved run (`--benchmark-autosave`).
+"""
+
+import copy
+import json
+
+import pytest
+
+from kat_bulgaria.data_models import (
+    KatIdentity,
+    KatObligationApiResponse,
+    KatObligationSummary,
+    PersonalIdentificationType
+)
+from kat_bulgaria.helpers import json_loads, strtobool
+from kat_bulgaria.query import build_query
+from kat_bulgaria.validation import validate_business, validate_individual, validate_identities
+
+from . import load_fixtures
+
+_FIXTURES = {name: json_loads(body) for name, body in load_fixtures().items()}
+
+_EGN = "0011223344"
+_LICENSE = "123456789"
+_GOV_ID = "AA1234567"
+_BULSTAT = "000000000"
+_CAR_PLATE = "CB1234AB"
+
+
+def _scaled_payload(count: int) -> dict:
+    """Payload with `count` obligations, copied from a fixture with unique document numbers."""
+
+    payload = copy.deepcopy(_FIXTURES["ok_sample2_6fines.json"])
+    unit_group = payload["obligationsData"][0]
+    templates = [ob for od in payload["obligationsData"] for ob in od["obligations"]]
+
+    obligations = []
+    for i in range(count):
+        ob = copy.deepcopy(templates[i % len(templates)])
+        ob["additionalData"]["documentNumber"] = f"{i:07d}"
+        obligations.append(ob)
+
+    unit_group["obligations"] = obligations
+    payload["obligationsData"] = [unit_group]
+
+    return payload
+
+
+_SCALED = {count: _scaled_payload(count) for count in (1_000, 10_000)}
+_SCALED_BODIES = {count: json.dumps(payload).encode() for count, payload in _SCALED.items()}
+
+
+@pytest.mark.benchmark(group="parse-fixture")
+@pytest.mark.parametrize("name", [name for name in _FIXTURES if name.startswith("ok_")])
+def test_api_response_fixture(benchmark, name: str) -> None:
+    """KatObligationApiResponse on each fixture."""
+
+    benchmark(KatObligationApiResponse, _FIXTURES[name])
+
+
+@pytest.mark.benchmark(group="parse-scaled")
+@pytest.mark.parametrize("count", list(_SCALED))
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_api_response_scaled(benchmark, count: int, lazy: bool) -> None:
+    """KatObligationApiResponse on 1k/10k obligations, eager and lazy."""
+
+    benchmark(KatObligationApiResponse, _SCALED[count], lazy)
+
+
+@pytest.mark.benchmark(group="parse-scaled")
+@pytest.mark.parametrize("count", list(_SCALED))
+def test_summary_scaled(benchmark, count: int) -> None:
+    """KatObligationSummary fast path on 1k/10k obligations."""
+
+    benchmark(KatObligationSummary.from_payload, _SCALED[count])
+
+
+@pytest.mark.benchmark(group="decode-scaled")
+@pytest.mark.parametrize("count", list(_SCALED))
+def test_decode_scaled(benchmark, count: int) -> None:
+    """JSON decoding of 1k/10k obligations with the active decoder."""
+
+    benchmark(json_loads, _SCALED_BODIES[count])
+
+
+@pytest.mark.benchmark(group="validate")
+@pytest.mark.parametrize("identifier_type, identifier", [
+    (PersonalIdentificationType.DRIVING_LICENSE, _LICENSE),
+    (PersonalIdentificationType.NATIONAL_ID, _GOV_ID),
+    (PersonalIdentificationType.CAR_PLATE_NUM, _CAR_PLATE),
+])
+def test_validate_individual(benchmark, identifier_type: str, identifier: str) -> None:
+    """Credentials validation of an individual."""
+
+    benchmark(validate_individual, _EGN, identifier_type, identifier)
+
+
+@pytest.mark.benchmark(group="validate")
+def test_validate_business(benchmark) -> None:
+    """Credentials validation of a business."""
+
+    benchmark(validate_business, _EGN, _GOV_ID, _BULSTAT)
+
+
+@pytest.mark.benchmark(group="validate")
+def test_validate_identities_bulk(benchmark) -> None:
+    """Offline validation of 10k identities with checksums and plate normalization."""
+
+    identities = [
+        KatIdentity.individual(_EGN, PersonalIdentificationType.CAR_PLATE_NUM, f"СВ {i % 10_000:04d} АВ")
+        for i in range(10_000)
+    ]
+
+    benchmark(validate_identities, identities)
+
+
+@pytest.mark.benchmark(group="query")
+@pytest.mark.parametrize("identity", [
+    KatIdentity.individual(_EGN, PersonalIdentificationType.DRIVING_LICENSE, _LICENSE),
+    KatIdentity.individual(_EGN, PersonalIdentificationType.NATIONAL_ID, _GOV_ID),
+    KatIdentity.individual(_EGN, PersonalIdentificationType.CAR_PLATE_NUM, _CAR_PLATE),
+    KatIdentity.business(_EGN, _GOV_ID, _BULSTAT),
+], ids=["license", "national_id", "car_plate", "business"])
+@pytest.mark.parametrize("memoised", [False, True], ids=["cold", "memoised"])
+def test_build_query(benchmark, identity: KatIdentity, memoised: bool) -> None:
+    """Validation and URL building, without and with the memoised queries."""
+
+    benchmark(build_query if memoised else build_query.__wrapped__, identity)
+
+
+@pytest.mark.benchmark(group="strtobool")
+@pytest.mark.parametrize("value", ["True", "false", "1"])
+def test_strtobool(benchmark, value: str) -> None:
+    """strtobool on the values KAT sends in isServed."""
+
+    benchmark(strtobool, value)
@@ -0,0 +1,34 @@
+"""Benchmark - JSON decoding and model building, stdlib vs the optional fast decoder"""
+
+import json
+import timeit
+
+from kat_bulgaria.data_models import KatObligationApiResponse
+from kat_bulgaria.helpers import json_loads
+
+from . import load_fixtures
+
+_NUMBER = 20_000
+
+
+def _bench(body: bytes, loads) -> float:
+    """Microseconds per decode + model build."""
+
+    total = timeit.timeit(lambda: KatObligationApiResponse(loads(body)), number=_NUMBER)
+    return total / _NUMBER * 1_000_000
+
+
+def main() -> None:
+    """Runs the benchmark on every JSON fixture."""
+
+    print(f"decoder: {json_loads.__module__}.{json_loads.__name__}")
+    print(f"{'fixture':<26} {'stdlib us':>10} {'fast us':>10} {'speedup':>8}")
+
+    for name, body in load_fixtures().items():
+        stdlib = _bench(body, json.loads)
+        fast = _bench(body, json_loads)
+        print(f"{name:<26} {stdlib:>10.2f} {fast:>10.2f} {stdlib / fast:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark - memory per obligation, slotted and interned models vs plain dataclasses"""
+
+from dataclasses import dataclass
+import gc
+import tracemalloc
+
+from kat_bulgaria.data_models import KatObligation
+from kat_bulgaria.helpers import json_loads, strtobool
+
+from . import load_fixtures
+
+_COUNT = 100_000
+
+
+@dataclass
+class _DictObligation:
+    """The obligation model before slots and interning, for comparison."""
+
+    unit_group: int
+    status: int
+    amount: int
+    discount_amount: int
+    discount_percentage: int
+    description: str
+    is_served: bool | None
+    vehicle_number: str
+    date_breach: str
+    date_issued: str
+    document_series: str
+    document_number: str
+    breach_of_order: str
+
+    def __init__(self, unit_group: int, obligation: any):
+        self.unit_group = unit_group
+        self.status = obligation["status"]
+        self.amount = obligation["amount"]
+        self.discount_amount = obligation["discountAmount"]
+        self.discount_percentage = int(obligation["additionalData"]["discount"])
+        self.description = obligation["paymentReason"]
+        self.is_served = strtobool(obligation["additionalData"].get("isServed", "false"))
+        self.vehicle_number = obligation["additionalData"]["vehicleNumber"]
+        self.date_breach = obligation["additionalData"]["breachDate"]
+        self.date_issued = obligation["additionalData"]["issueDate"]
+        self.document_series = obligation["additionalData"]["documentSeries"]
+        self.document_number = obligation["additionalData"]["documentNumber"]
+        self.breach_of_order = obligation["additionalData"]["breachOfOrder"]
+
+
+def _bytes_per_object(model: type, body: bytes) -> float:
+    """Bytes retained per obligation, strings included, when keeping many of them in memory."""
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    # Decode the body for every batch, like responses of different lookups,
+    # and keep only the models
+    kept = []
+    while len(kept) < _COUNT:
+        for og in json_loads(body)["obligationsData"]:
+            for ob in og["obligations"]:
+                kept.append(model(og["unitGroup"], ob))
+
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    count = len(kept)
+    del kept
+    return (after - before) / count
+
+
+def main() -> None:
+    """Runs the benchmark on the sample with 6 fines."""
+
+    body = load_fixtures()["ok_sample2_6fines.json"]
+
+    plain = _bytes_per_object(_DictObligation, body)
+    slotted = _bytes_per_object(KatObligation, body)
+
+    print(f"{_COUNT} obligations from ok_sample2_6fines.json")
+    print(f"plain dataclass:    {plain:>7.1f} bytes/obligation")
+    print(f"slotted + interned: {slotted:>7.1f} bytes/obligation")
+    print(f"saved:              {plain - slotted:>7.1f} bytes/obligation ({1 - slotted / plain:.0%})")
+
+
+if __name__ == "__main__":
+    main()
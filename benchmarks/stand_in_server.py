@@ -0,0 +1,133 @@
+"""Local stand-in for the MVR obligations API, serving the test fixtures"""
+
+import asyncio
+from dataclasses import dataclass
+import multiprocessing
+import random
+from typing import Any
+
+import httpx
+
+from . import load_fixture
+
+_OK = ("application/json; charset=utf-8", load_fixture("ok_sample2_6fines.json"))
+_READING_DATA = ("application/json; charset=utf-8", load_fixture("err_apidown.json"))
+_TOO_MANY_REQUESTS = ("text/html; charset=utf-8", load_fixture("err_too_many_requests.html"))
+
+
+@dataclass
+class StandInConfig:
+    """Behaviour of the stand-in server."""
+
+    latency: float = 0.02
+    jitter: float = 0.01
+    throttle_rate: float = 0.0
+    reading_error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_delay: float = 5.0
+    seed: int = 0
+
+
+class StandInServer:
+    """Minimal HTTP/1.1 keep-alive server answering every GET with a fixture."""
+
+    def __init__(self, config: StandInConfig) -> None:
+        self.config = config
+        self.__random = random.Random(config.seed)
+
+    def __pick(self) -> tuple[float, tuple[str, bytes]]:
+        """Chooses the delay and the response of the next request."""
+
+        config = self.config
+        delay = config.latency + self.__random.uniform(0, config.jitter)
+        roll = self.__random.random()
+
+        if roll < config.timeout_rate:
+            return config.timeout_delay, _OK
+
+        roll -= config.timeout_rate
+        if roll < config.throttle_rate:
+            return delay, _TOO_MANY_REQUESTS
+
+        roll -= config.throttle_rate
+        if roll < config.reading_error_rate:
+            return delay, _READING_DATA
+
+        return delay, _OK
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head.startswith(b"GET "):
+                    break
+
+                delay, (content_type, body) = self.__pick()
+                await asyncio.sleep(delay)
+
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"content-type: " + content_type.encode() + b"\r\n"
+                    b"content-length: " + str(len(body)).encode() + b"\r\n"
+                    b"connection: keep-alive\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, port: Any | None = None) -> None:
+        """Serves until cancelled on a free localhost port, published through `port`."""
+
+        server = await asyncio.start_server(self.__handle, "127.0.0.1", 0, backlog=1024)
+        if port is not None:
+            port.value = server.sockets[0].getsockname()[1]
+
+        async with server:
+            await server.serve_forever()
+
+
+def _run(config: StandInConfig, port: Any) -> None:
+    asyncio.run(StandInServer(config).serve(port))
+
+
+def start_in_process(config: StandInConfig) -> tuple[multiprocessing.Process, int]:
+    """
+    Starts the stand-in in a child process, so it does not share the client's CPU and memory
+
+    Returns the process and the port it listens on. Stop it with `process.terminate()`.
+    """
+
+    port = multiprocessing.Value("i", 0)
+    process = multiprocessing.Process(target=_run, args=(config, port), daemon=True)
+    process.start()
+
+    while port.value == 0:
+        if not process.is_alive():
+            raise RuntimeError("stand-in server failed to start")
+        process.join(0.01)
+
+    return process, port.value
+
+
+class RedirectTransport(httpx.AsyncBaseTransport):
+    """
+    Sends every request to the stand-in server instead of MVR
+
+    Also overrides the timeout, so the stand-in's stalled responses
+    time out in benchmark time.
+    """
+
+    def __init__(self, port: int, timeout: float, limits: httpx.Limits) -> None:
+        self.port = port
+        self.timeout = timeout
+        self.__transport = httpx.AsyncHTTPTransport(limits=limits)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=self.port)
+        request.extensions = {**request.extensions, "timeout": httpx.Timeout(self.timeout).as_dict()}
+
+        return await self.__transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.__transport.aclose()
@@ -0,0 +1,195 @@
+"""Obligation lookup cache"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import json
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from .helpers import json_loads
+
+_DEFAULT_MAX_SIZE = 10_000
+_DEFAULT_TTL = 3600.0
+_DEFAULT_NEGATIVE_TTL = 600.0
+
+
+class KatCache(ABC):
+    """
+    Base class for obligation lookup caches.
+
+    Entries are raw KAT API payloads keyed on `KatIdentity.key`. Successful lookups
+    are kept for `ttl` seconds, "user not found" answers for `negative_ttl` seconds.
+    Subclasses implement the storage in `_get`, `_set`, `delete` and `clear`.
+    """
+
+    def __init__(
+        self,
+        ttl: float = _DEFAULT_TTL,
+        negative_ttl: float = _DEFAULT_NEGATIVE_TTL,
+        max_size: int = _DEFAULT_MAX_SIZE
+    ) -> None:
+        """
+        Initialize the cache.
+
+        :param ttl: Seconds a successful lookup is cached
+        :param negative_ttl: Seconds a "user not found" lookup is cached, 0 disables negative caching
+        :param max_size: Maximum number of entries, least recently used are evicted first
+        """
+
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+
+    def get(self, key: str) -> Any | None:
+        """Get a cached payload, None if missing or expired."""
+
+        return self._get(key, time.time())
+
+    def set(self, key: str, value: Any, negative: bool = False) -> None:
+        """Cache a payload; `negative` marks a "user not found" answer."""
+
+        ttl = self.negative_ttl if negative else self.ttl
+        if ttl > 0:
+            self._set(key, value, time.time() + ttl)
+
+    @abstractmethod
+    def _get(self, key: str, now: float) -> Any | None:
+        """Get an entry which has not expired at `now`."""
+
+    @abstractmethod
+    def _set(self, key: str, value: Any, expires_at: float) -> None:
+        """Store an entry until `expires_at`."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+
+class KatMemoryCache(KatCache):
+    """In-memory LRU cache."""
+
+    def __init__(
+        self,
+        ttl: float = _DEFAULT_TTL,
+        negative_ttl: float = _DEFAULT_NEGATIVE_TTL,
+        max_size: int = _DEFAULT_MAX_SIZE
+    ) -> None:
+        super().__init__(ttl, negative_ttl, max_size)
+        self.__entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def _get(self, key: str, now: float) -> Any | None:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self.__entries[key]
+                return None
+
+            self.__entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any, expires_at: float) -> None:
+        with self.__lock:
+            self.__entries[key] = (expires_at, value)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+
+class KatSqliteCache(KatCache):
+    """On-disk SQLite cache, shared between runs and processes."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = _DEFAULT_TTL,
+        negative_ttl: float = _DEFAULT_NEGATIVE_TTL,
+        max_size: int = _DEFAULT_MAX_SIZE
+    ) -> None:
+        """
+        Initialize the cache.
+
+        :param path: Path to the SQLite database file, created if missing
+        :param ttl: Seconds a successful lookup is cached
+        :param negative_ttl: Seconds a "user not found" lookup is cached, 0 disables negative caching
+        :param max_size: Maximum number of entries, least recently used are evicted first
+        """
+
+        super().__init__(ttl, negative_ttl, max_size)
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS kat_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self.__db.execute(
+            "CREATE INDEX IF NOT EXISTS kat_cache_accessed_at ON kat_cache (accessed_at)")
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return self.__db.execute("SELECT COUNT(*) FROM kat_cache").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+
+        with self.__lock:
+            self.__db.close()
+
+    def _get(self, key: str, now: float) -> Any | None:
+        with self.__lock:
+            row = self.__db.execute(
+                "SELECT value, expires_at FROM kat_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at <= now:
+                self.__db.execute("DELETE FROM kat_cache WHERE key = ?", (key,))
+                return None
+
+            self.__db.execute(
+                "UPDATE kat_cache SET accessed_at = ? WHERE key = ?", (time.time_ns(), key))
+
+        return json_loads(value)
+
+    def _set(self, key: str, value: Any, expires_at: float) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+
+        with self.__lock:
+            self.__db.execute(
+                "INSERT OR REPLACE INTO kat_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, encoded, expires_at, time.time_ns()))
+            self.__db.execute(
+                "DELETE FROM kat_cache WHERE key IN ("
+                "SELECT key FROM kat_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,))
+
+    def delete(self, key: str) -> None:
+        with self.__lock:
+            self.__db.execute("DELETE FROM kat_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__db.execute("DELETE FROM kat_cache")
@@ -0,0 +1,168 @@
+"""Circuit breaker"""
+
+from collections import deque
+from enum import Enum
+import threading
+import time
+
+from .errors import KatErrorSubtype
+
+_DEFAULT_FAILURE_RATE = 0.5
+_DEFAULT_WINDOW = 20
+_DEFAULT_MIN_REQUESTS = 5
+_DEFAULT_RESET_TIMEOUT = 30.0
+_DEFAULT_HALF_OPEN_REQUESTS = 1
+
+_OUTAGE_ERRORS = frozenset({
+    KatErrorSubtype.API_TIMEOUT,
+    KatErrorSubtype.API_ERROR_READING_DATA,
+    KatErrorSubtype.API_UNKNOWN_ERROR,
+})
+
+
+class KatCircuitState(Enum):
+    """Circuit breaker states"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class KatCircuitBreaker:
+    """
+    Stops sending requests while the KAT API is down.
+
+    The breaker opens when at least `failure_rate` of the last `window` requests
+    failed with an error in `outage_errors`. While open, requests fail immediately.
+    After `reset_timeout` seconds `half_open_requests` probe requests are let
+    through - the breaker closes if they succeed and opens again if any fails.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = _DEFAULT_FAILURE_RATE,
+        window: int = _DEFAULT_WINDOW,
+        min_requests: int = _DEFAULT_MIN_REQUESTS,
+        reset_timeout: float = _DEFAULT_RESET_TIMEOUT,
+        half_open_requests: int = _DEFAULT_HALF_OPEN_REQUESTS,
+        outage_errors: frozenset[KatErrorSubtype] = _OUTAGE_ERRORS
+    ) -> None:
+        """
+        Initialize the circuit breaker.
+
+        :param failure_rate: Share of failed requests in the window which opens the breaker
+        :param window: Number of most recent requests considered
+        :param min_requests: Requests needed in the window before the breaker may open
+        :param reset_timeout: Seconds to stay open before probing
+        :param half_open_requests: Probe requests let through when half-open
+        :param outage_errors: Error subtypes which count as failures
+        """
+
+        if not 0 < failure_rate <= 1 or min_requests < 1 or window < min_requests or half_open_requests < 1:
+            raise ValueError("invalid circuit breaker configuration")
+
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.reset_timeout = reset_timeout
+        self.half_open_requests = half_open_requests
+        self.outage_errors = outage_errors
+
+        self.__lock = threading.Lock()
+        self.__results: deque[bool] = deque(maxlen=window)
+        self.__state = KatCircuitState.CLOSED
+        self.__opened_at = 0.0
+        self.__half_open_at = 0.0
+        self.__probes = 0
+
+    @property
+    def state(self) -> KatCircuitState:
+        """Current state, an open breaker reports half-open once the reset timeout passed."""
+
+        with self.__lock:
+            if self.__state == KatCircuitState.OPEN and self.retry_after() == 0:
+                return KatCircuitState.HALF_OPEN
+
+            return self.__state
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets probe requests through."""
+
+        if self.__state != KatCircuitState.OPEN:
+            return 0.0
+
+        return max(self.__opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def try_acquire(self) -> float | None:
+        """
+        Checks if a request may be sent
+
+        Returns None if the breaker is open, otherwise a token which must be
+        passed to `record()` with the outcome of the request.
+        """
+
+        with self.__lock:
+            now = time.monotonic()
+
+            if self.__state == KatCircuitState.CLOSED:
+                return now
+
+            if self.__state == KatCircuitState.OPEN:
+                if self.retry_after() > 0:
+                    return None
+
+                self.__state = KatCircuitState.HALF_OPEN
+                self.__half_open_at = now
+                self.__probes = 0
+
+            if self.__probes >= self.half_open_requests:
+                return None
+
+            self.__probes += 1
+            return now
+
+    def record(self, token: float, outcome: KatErrorSubtype | None = None, completed: bool = True) -> None:
+        """
+        Report the outcome of a request
+
+        :param token: Value returned by `try_acquire()`
+        :param outcome: Error subtype of the request, None if it succeeded
+        :param completed: False for cancelled requests, which only free a probe slot
+        """
+
+        failed = outcome in self.outage_errors
+
+        with self.__lock:
+            if self.__state == KatCircuitState.OPEN:
+                return
+
+            if self.__state == KatCircuitState.HALF_OPEN:
+                # Requests sent before the breaker opened are not probes
+                if token < self.__half_open_at:
+                    return
+
+                self.__probes -= 1
+
+                if not completed:
+                    return
+
+                if failed:
+                    self.__open()
+                elif self.__probes == 0:
+                    self.__state = KatCircuitState.CLOSED
+                    self.__results.clear()
+
+                return
+
+            if not completed:
+                return
+
+            self.__results.append(failed)
+
+            if len(self.__results) >= self.min_requests:
+                if sum(self.__results) / len(self.__results) >= self.failure_rate:
+                    self.__open()
+
+    def __open(self) -> None:
+        self.__state = KatCircuitState.OPEN
+        self.__opened_at = time.monotonic()
+        self.__results.clear()
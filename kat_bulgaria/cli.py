@@ -0,0 +1,389 @@
+"""Command line interface - `kat-bulgaria sweep`"""
+
+import argparse
+import asyncio
+from collections.abc import Callable, Iterable, Iterator
+import csv
+from dataclasses import asdict, dataclass
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+from typing import Any
+
+from .data_models import KatBatchResult, KatIdentity
+from .errors import KatErrorType
+from .kat_api_client import KatApiClient
+from .rate_limiter import KatSharedRateLimiter
+from .retry import KatRetryPolicy
+
+# Optional Parquet export - `pip install kat_bulgaria[parquet]`
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+_DEFAULT_WORKERS = 4
+_DEFAULT_CONCURRENCY = 10
+_DEFAULT_RATE = 2.0
+_DEFAULT_BURST = 5
+_DEFAULT_RETRIES = 3
+_DEFAULT_TIMEOUT = 10.0
+
+# Seconds the parent waits for a result before checking if the workers are still alive
+_POLL_INTERVAL = 1.0
+
+_IDENTITY_FIELDS = ("egn", "identifier_type", "identifier", "bulstat")
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class KatSweepSummary:
+    """Counts of a sweep run."""
+
+    queued: int = 0
+    checked: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class _ShardConfig:
+    concurrency: int
+    retries: int
+    timeout: float
+
+
+def _identity_from_row(row: dict) -> KatIdentity:
+    """
+    Identity from a CSV or JSONL row, rows with a BULSTAT are businesses
+
+    Values are read as text and missing ones are empty, so a bad row fails
+    validation and is reported in the results file like any invalid identity.
+    """
+
+    egn, identifier_type, identifier, bulstat = (
+        "" if row.get(name) is None else str(row[name]) for name in _IDENTITY_FIELDS)
+
+    if bulstat:
+        return KatIdentity.business(egn, identifier, bulstat)
+
+    return KatIdentity.individual(egn, identifier_type, identifier)
+
+
+def _jsonl_rows(source: Iterable[str]) -> Iterator[tuple[int, Any]]:
+    """Numbered rows of a JSONL file, None for lines which are not valid JSON."""
+
+    for number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError:
+            yield number, None
+
+
+def read_identities(path: str) -> Iterator[KatIdentity]:
+    """
+    Reads identities from a CSV file with a header row or from a JSONL file
+
+    Columns/keys: egn, identifier_type, identifier and, for businesses, bulstat.
+    JSONL lines which are not a JSON object are skipped with a warning.
+    """
+
+    with open(path, encoding="utf-8", newline="") as source:
+        if path.endswith(".csv"):
+            rows = enumerate(csv.DictReader(source), start=2)
+        else:
+            rows = _jsonl_rows(source)
+
+        for number, row in rows:
+            if not isinstance(row, dict):
+                _LOGGER.warning("Skipping line %d of %s - not a JSON object", number, path)
+                continue
+
+            yield _identity_from_row(row)
+
+
+def read_checkpoint(path: str) -> set[str]:
+    """
+    Keys of the identities already checked in an earlier run of a sweep
+
+    The results file is the checkpoint. Identities which failed with an API
+    error are checked again; a line cut short by an interruption is ignored.
+    """
+
+    done = set()
+
+    try:
+        with open(path, encoding="utf-8") as results:
+            for line in results:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                error = record["error"]
+                if error is None or error["type"] == KatErrorType.VALIDATION_ERROR.value:
+                    done.add(record["key"])
+                else:
+                    done.discard(record["key"])
+    except FileNotFoundError:
+        pass
+
+    return done
+
+
+def _end_last_line(path: str) -> None:
+    """Ends a line cut short by an interruption, so the next result starts on its own line."""
+
+    try:
+        with open(path, "rb+") as results:
+            if results.seek(0, os.SEEK_END) == 0:
+                return
+
+            results.seek(-1, os.SEEK_END)
+            if results.read(1) != b"\n":
+                results.write(b"\n")
+    except FileNotFoundError:
+        pass
+
+
+def _result_record(result: KatBatchResult) -> dict:
+    """JSON-serializable line of the results file."""
+
+    record = {
+        "key": result.identity.key,
+        "identity": asdict(result.identity),
+        "obligations": None,
+        "error": None,
+    }
+
+    if result.error is not None:
+        record["error"] = {
+            "type": result.error.error_type.value,
+            "subtype": result.error.error_subtype.value,
+            "message": result.error.error_message,
+        }
+    else:
+        record["obligations"] = [asdict(obligation) for obligation in result.obligations]
+
+    return record
+
+
+async def _sweep_shard(
+    identities: list[KatIdentity],
+    rate_limiter: KatSharedRateLimiter,
+    config: _ShardConfig,
+    emit: Callable[[dict], None]
+) -> None:
+    """Checks the identities of one shard with a pooled client."""
+
+    retry_policy = KatRetryPolicy(max_attempts=config.retries) if config.retries > 1 else None
+
+    async with KatApiClient(
+            max_connections=config.concurrency,
+            max_keepalive_connections=config.concurrency,
+            timeout=config.timeout,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy) as client:
+        async for result in client.get_obligations_many(identities, config.concurrency):
+            emit(_result_record(result))
+
+
+def _run_shard(
+    identities: list[KatIdentity],
+    rate_limiter: KatSharedRateLimiter,
+    config: _ShardConfig,
+    results: multiprocessing.Queue
+) -> None:
+    """Worker process entry point, sends result lines to the parent and None when done."""
+
+    try:
+        asyncio.run(_sweep_shard(identities, rate_limiter, config, results.put))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        results.put(None)
+
+
+def write_parquet(results_path: str, parquet_path: str) -> None:
+    """Converts a results file to Parquet, keeping the last line of each identity."""
+
+    if pyarrow is None:
+        raise ImportError("pyarrow is not installed - `pip install kat_bulgaria[parquet]`")
+
+    latest = {}
+
+    with open(results_path, encoding="utf-8") as results:
+        for line in results:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            latest[record["key"]] = record
+
+    rows = [{
+        **record["identity"],
+        "obligations": record["obligations"],
+        "error_subtype": record["error"]["subtype"] if record["error"] else None,
+        "error_message": record["error"]["message"] if record["error"] else None,
+    } for record in latest.values()]
+
+    pyarrow.parquet.write_table(pyarrow.Table.from_pylist(rows), parquet_path)
+
+
+def sweep(
+    input_path: str,
+    results_path: str,
+    workers: int = _DEFAULT_WORKERS,
+    concurrency: int = _DEFAULT_CONCURRENCY,
+    rate: float = _DEFAULT_RATE,
+    burst: int = _DEFAULT_BURST,
+    retries: int = _DEFAULT_RETRIES,
+    timeout: float = _DEFAULT_TIMEOUT
+) -> KatSweepSummary:
+    """
+    Checks every identity of an input file and appends the results to a JSONL file
+
+    Identities are split round-robin between `workers` processes, each running
+    its own event loop and pooled client. All processes share one rate limit.
+    Identities already in the results file are skipped, so an interrupted sweep
+    continues where it stopped when run again.
+
+    :param input_path: CSV or JSONL file with identities
+    :param results_path: JSONL file the results are appended to
+    :param workers: Number of worker processes, 1 runs in the current process
+    :param concurrency: Lookups in flight per worker
+    :param rate: Requests per second across all workers
+    :param burst: Maximum number of requests sent back to back
+    :param retries: Attempts per lookup for transient API errors
+    :param timeout: Request timeout in seconds
+    """
+
+    if workers < 1 or concurrency < 1:
+        raise ValueError("workers and concurrency must be at least 1")
+
+    summary = KatSweepSummary()
+    done = read_checkpoint(results_path)
+    shards: list[list[KatIdentity]] = [[] for _ in range(workers)]
+
+    for identity in read_identities(input_path):
+        if identity.key in done:
+            summary.skipped += 1
+            continue
+
+        # Queued once, even if the input lists it twice
+        done.add(identity.key)
+        shards[summary.queued % workers].append(identity)
+        summary.queued += 1
+
+    config = _ShardConfig(concurrency, retries, timeout)
+    rate_limiter = KatSharedRateLimiter(rate, burst)
+
+    _end_last_line(results_path)
+
+    with open(results_path, "a", encoding="utf-8") as results:
+
+        def write(record: dict) -> None:
+            # Flushed line by line - the file is the checkpoint
+            results.write(json.dumps(record, ensure_ascii=False) + "\n")
+            results.flush()
+
+            summary.checked += 1
+            if record["error"] is not None:
+                summary.failed += 1
+
+        if workers == 1:
+            asyncio.run(_sweep_shard(shards[0], rate_limiter, config, write))
+            return summary
+
+        records: multiprocessing.Queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_run_shard, args=(shard, rate_limiter, config, records), daemon=True)
+            for shard in shards if shard
+        ]
+
+        for process in processes:
+            process.start()
+
+        running = len(processes)
+
+        try:
+            while running:
+                try:
+                    record = records.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    # A worker which was killed never sends its None
+                    if not any(process.is_alive() for process in processes):
+                        break
+                    continue
+
+                if record is None:
+                    running -= 1
+                else:
+                    write(record)
+        finally:
+            for process in processes:
+                process.join(timeout=_POLL_INTERVAL)
+                if process.is_alive():
+                    process.terminate()
+
+    return summary
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the `kat-bulgaria` console script."""
+
+    parser = argparse.ArgumentParser(prog="kat-bulgaria", description="Check for obligations to KAT Bulgaria")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sweep_parser = commands.add_parser(
+        "sweep", help="check every identity of a CSV/JSONL file",
+        description="Check every identity of a CSV/JSONL file (columns egn, identifier_type, identifier, "
+                    "bulstat) and append the results to a JSONL file. Run again to resume.")
+    sweep_parser.add_argument("input", help="CSV or JSONL file with identities")
+    sweep_parser.add_argument("-o", "--output", required=True, help="JSONL results file, also the checkpoint")
+    sweep_parser.add_argument("--parquet", help="also write the results to this Parquet file when done")
+    sweep_parser.add_argument("--workers", type=int, default=_DEFAULT_WORKERS, help="worker processes")
+    sweep_parser.add_argument("--concurrency", type=int, default=_DEFAULT_CONCURRENCY,
+                              help="lookups in flight per worker")
+    sweep_parser.add_argument("--rate", type=float, default=_DEFAULT_RATE,
+                              help="requests per second across all workers")
+    sweep_parser.add_argument("--burst", type=int, default=_DEFAULT_BURST, help="requests sent back to back")
+    sweep_parser.add_argument("--retries", type=int, default=_DEFAULT_RETRIES, help="attempts per lookup")
+    sweep_parser.add_argument("--timeout", type=float, default=_DEFAULT_TIMEOUT, help="request timeout in seconds")
+
+    args = parser.parse_args(argv)
+
+    if args.parquet and pyarrow is None:
+        parser.error("--parquet requires pyarrow - `pip install kat_bulgaria[parquet]`")
+
+    try:
+        summary = sweep(
+            args.input, args.output, args.workers, args.concurrency,
+            args.rate, args.burst, args.retries, args.timeout)
+    except KeyboardInterrupt:
+        print("Interrupted - run the same command again to resume.", file=sys.stderr)
+        return 130
+
+    if summary.checked < summary.queued:
+        print(f"{summary.queued - summary.checked} identities were not checked - a worker stopped early, "
+              "run the same command again to resume.", file=sys.stderr)
+
+    print(f"{summary.checked} checked, {summary.failed} failed, {summary.skipped} already done", file=sys.stderr)
+
+    if args.parquet:
+        write_parquet(args.output, args.parquet)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Adaptive concurrency limiting"""
+
+import asyncio
+from collections import deque
+import time
+
+from .errors import KatErrorSubtype
+
+_DEFAULT_INITIAL_LIMIT = 4
+_DEFAULT_MIN_LIMIT = 1
+_DEFAULT_MAX_LIMIT = 50
+_DEFAULT_DECREASE_FACTOR = 0.5
+_DEFAULT_LATENCY_TOLERANCE = 2.0
+_DEFAULT_SMOOTHING = 0.05
+
+_CONGESTION_ERRORS = frozenset({
+    KatErrorSubtype.API_TIMEOUT,
+    KatErrorSubtype.API_TOO_MANY_REQUESTS,
+})
+
+
+class KatAdaptiveConcurrency:
+    """
+    AIMD limit on the number of requests in flight.
+
+    Every healthy response grows the limit by `1 / limit`, i.e. by one per
+    round of requests. A response with an error in `congestion_errors`, or
+    slower than `latency_tolerance` times the baseline latency, cuts the limit
+    by `decrease_factor`. Requests sent before the last cut cannot cut it again,
+    so a burst of timeouts counts as one congestion event.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = _DEFAULT_INITIAL_LIMIT,
+        min_limit: int = _DEFAULT_MIN_LIMIT,
+        max_limit: int = _DEFAULT_MAX_LIMIT,
+        decrease_factor: float = _DEFAULT_DECREASE_FACTOR,
+        latency_tolerance: float = _DEFAULT_LATENCY_TOLERANCE,
+        smoothing: float = _DEFAULT_SMOOTHING,
+        congestion_errors: frozenset[KatErrorSubtype] = _CONGESTION_ERRORS
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        :param initial_limit: Requests in flight allowed at start
+        :param min_limit: The limit is never cut below this value
+        :param max_limit: The limit never grows above this value
+        :param decrease_factor: Multiplier applied to the limit on congestion
+        :param latency_tolerance: Latency above this multiple of the baseline counts as congestion
+        :param smoothing: Weight of a new sample in the baseline latency average
+        :param congestion_errors: Error subtypes which count as congestion
+        """
+
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.congestion_errors = congestion_errors
+
+        self.__limit = float(initial_limit)
+        self.__in_flight = 0
+        self.__baseline: float | None = None
+        self.__decreased_at = 0.0
+        self.__waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+
+        return int(self.__limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests in flight."""
+
+        return self.__in_flight
+
+    @property
+    def baseline_latency(self) -> float | None:
+        """Average latency of responses without congestion errors, None before the first one."""
+
+        return self.__baseline
+
+    async def acquire(self) -> float:
+        """Wait for a free slot; returns the token to pass to `release()`."""
+
+        while self.__in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self.__waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass the wake-up on, it may have been meant for this waiter
+                self.__wake()
+                raise
+
+        self.__in_flight += 1
+        return time.monotonic()
+
+    def release(self, token: float, outcome: KatErrorSubtype | None = None, completed: bool = True) -> None:
+        """
+        Free a slot and adjust the limit
+
+        :param token: Value returned by `acquire()`, or the later monotonic time the request was sent
+        :param outcome: Error subtype of the request, None if it succeeded
+        :param completed: False for cancelled requests, which only free the slot
+        """
+
+        now = time.monotonic()
+        self.__in_flight -= 1
+
+        if not completed:
+            pass
+        elif outcome in self.congestion_errors:
+            self.__decrease(token, now)
+        else:
+            latency = now - token
+            baseline = self.__baseline
+
+            if baseline is not None and latency > baseline * self.latency_tolerance:
+                self.__decrease(token, now)
+            else:
+                self.__limit = min(self.max_limit, self.__limit + 1 / self.__limit)
+
+            # Slow samples move the baseline too, so a lasting slowdown is not punished forever
+            self.__baseline = latency if baseline is None else baseline + (latency - baseline) * self.smoothing
+
+        self.__wake()
+
+    def __decrease(self, token: float, now: float) -> None:
+        if token < self.__decreased_at:
+            return
+
+        self.__decreased_at = now
+        self.__limit = max(self.min_limit, self.__limit * self.decrease_factor)
+
+    def __wake(self) -> None:
+        """Wakes as many waiters as there are free slots."""
+
+        free = self.limit - self.__in_flight
+        while free > 0 and self.__waiters:
+            waiter = self.__waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
@@ -1,10 +1,17 @@
 """Data models"""
 
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, dataclass, fields
+import sys
 
+from .errors import KatError
 from .helpers import strtobool
 
 
+def _intern(value: str | None) -> str | None:
+    """Interns strings repeated across many obligations (legal articles, plates, dates)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 class PersonalIdentificationType:
     """Personal Document Type."""
 
@@ -13,9 +20,50 @@ class PersonalIdentificationType:
     CAR_PLATE_NUM = "car_plate_num"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class KatIdentity:
+    """Identity to check obligations for - an individual or a business."""
+
+    egn: str
+    identifier_type: str
+    identifier: str
+    bulstat: str | None = None
+
+    @classmethod
+    def individual(cls, egn: str, identifier_type: str, identifier: str) -> "KatIdentity":
+        """Identity of an individual."""
+
+        return cls(egn, identifier_type, identifier)
+
+    @classmethod
+    def business(cls, egn: str, govt_id: str, bulstat: str) -> "KatIdentity":
+        """Identity of a business, represented by a person with a National ID."""
+
+        # A missing BULSTAT must fail validation, not turn this into an individual
+        return cls(egn, PersonalIdentificationType.NATIONAL_ID, govt_id, "" if bulstat is None else bulstat)
+
+    @property
+    def is_business(self) -> bool:
+        """Is this a business identity."""
+
+        return self.bulstat is not None
+
+    @property
+    def key(self) -> str:
+        """Normalized key of this identity, e.g. for caching."""
+
+        return "|".join((
+            "business" if self.is_business else "individual",
+            self.egn.strip(),
+            self.identifier_type,
+            self.identifier.strip().upper(),
+            (self.bulstat or "").strip(),
+        ))
+
+
+@dataclass(slots=True)
 class KatObligation:
-    """Single obligation model."""
+    """Single obligation model. Use `freeze()` for an immutable and hashable copy."""
 
     unit_group: int
     status: int
@@ -30,62 +78,260 @@ class KatObligation:
     document_series: str
     document_number: str
     breach_of_order: str
+    obligation_identifier: str | None
 
     def __init__(self, unit_group: int, obligation: any):
         """Parse the data."""
 
-        self.unit_group = unit_group
-        self.status = obligation["status"]
-        self.amount = obligation["amount"]
-        self.discount_amount = obligation["discountAmount"]
-        self.discount_percentage = int(
-            obligation["additionalData"]["discount"])
-        self.description = obligation["paymentReason"]
-
-        if "isServed" in obligation["additionalData"]:
-            self.is_served = strtobool(
-                obligation["additionalData"]["isServed"])
+        additional_data = obligation["additionalData"]
+
+        if "isServed" in additional_data:
+            is_served = strtobool(additional_data["isServed"])
         else:
-            self.is_served = False
+            is_served = False
+
+        # Set through object.__setattr__, so KatFrozenObligation can use this too
+        set_field = object.__setattr__
+        set_field(self, "unit_group", unit_group)
+        set_field(self, "status", obligation["status"])
+        set_field(self, "amount", obligation["amount"])
+        set_field(self, "discount_amount", obligation["discountAmount"])
+        set_field(self, "discount_percentage", int(additional_data["discount"]))
+        set_field(self, "description", obligation["paymentReason"])
+        set_field(self, "is_served", is_served)
+        set_field(self, "vehicle_number", _intern(additional_data["vehicleNumber"]))
+        set_field(self, "date_breach", _intern(additional_data["breachDate"]))
+        set_field(self, "date_issued", _intern(additional_data["issueDate"]))
+        set_field(self, "document_series", _intern(additional_data["documentSeries"]))
+        set_field(self, "document_number", additional_data["documentNumber"])
+        set_field(self, "breach_of_order", _intern(additional_data["breachOfOrder"]))
+        set_field(self, "obligation_identifier", obligation.get("obligationIdentifier"))
+
+    @classmethod
+    def from_dict(cls, fields: dict) -> "KatObligation":
+        """Rebuild an obligation from `dataclasses.asdict()` output, e.g. when loaded from storage."""
+
+        obligation = object.__new__(cls)
+        for name, value in fields.items():
+            object.__setattr__(obligation, name, _intern(value))
+
+        return obligation
+
+    @property
+    def key(self) -> str:
+        """Stable key of this obligation across lookups - document series and number."""
 
-        self.vehicle_number = obligation["additionalData"]["vehicleNumber"]
-        self.date_breach = obligation["additionalData"]["breachDate"]
-        self.date_issued = obligation["additionalData"]["issueDate"]
-        self.document_series = obligation["additionalData"]["documentSeries"]
-        self.document_number = obligation["additionalData"]["documentNumber"]
-        self.breach_of_order = obligation["additionalData"]["breachOfOrder"]
+        return f"{self.document_series}|{self.document_number}"
 
+    def freeze(self) -> "KatFrozenObligation":
+        """Immutable and hashable copy of this obligation, e.g. for sets and dict keys."""
 
-@dataclass
+        return KatFrozenObligation.from_dict({field.name: getattr(self, field.name) for field in fields(self)})
+
+
+def _field_values(obligation: KatObligation) -> tuple:
+    return tuple(getattr(obligation, field.name) for field in fields(obligation))
+
+
+class KatFrozenObligation(KatObligation):
+    """
+    Immutable and hashable obligation.
+
+    Opt-in variant of KatObligation - get one with `KatObligation.freeze()`,
+    or parse one directly with `KatFrozenObligation(unit_group, obligation)`.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other: object) -> bool:
+        # Equal to a mutable obligation with the same values, e.g. `ob.freeze() == ob`
+        if not isinstance(other, KatObligation):
+            return NotImplemented
+
+        return _field_values(self) == _field_values(other)
+
+    def __hash__(self) -> int:
+        return hash(_field_values(self))
+
+    def __reduce__(self) -> tuple:
+        # Unpickled through from_dict, the default state is restored with setattr
+        return KatFrozenObligation.from_dict, ({field.name: getattr(self, field.name) for field in fields(self)},)
+
+    def freeze(self) -> "KatFrozenObligation":
+        return self
+
+
+class KatObligationView:
+    """
+    Lazy view over a raw obligation.
+
+    Exposes the same attributes as KatObligation, but reads each one from the raw
+    payload only when accessed. Use `materialize()` to get a KatObligation.
+    """
+
+    __slots__ = ("unit_group", "raw")
+
+    def __init__(self, unit_group: int, obligation: any):
+        self.unit_group = unit_group
+        self.raw = obligation
+
+    def __repr__(self) -> str:
+        return f"KatObligationView(unit_group={self.unit_group}, document_number={self.document_number!r})"
+
+    @property
+    def status(self) -> int:
+        return self.raw["status"]
+
+    @property
+    def amount(self) -> int:
+        return self.raw["amount"]
+
+    @property
+    def discount_amount(self) -> int:
+        return self.raw["discountAmount"]
+
+    @property
+    def discount_percentage(self) -> int:
+        return int(self.raw["additionalData"]["discount"])
+
+    @property
+    def description(self) -> str:
+        return self.raw["paymentReason"]
+
+    @property
+    def is_served(self) -> bool | None:
+        additional_data = self.raw["additionalData"]
+        if "isServed" in additional_data:
+            return strtobool(additional_data["isServed"])
+        return False
+
+    @property
+    def vehicle_number(self) -> str:
+        return self.raw["additionalData"]["vehicleNumber"]
+
+    @property
+    def date_breach(self) -> str:
+        return self.raw["additionalData"]["breachDate"]
+
+    @property
+    def date_issued(self) -> str:
+        return self.raw["additionalData"]["issueDate"]
+
+    @property
+    def document_series(self) -> str:
+        return self.raw["additionalData"]["documentSeries"]
+
+    @property
+    def document_number(self) -> str:
+        return self.raw["additionalData"]["documentNumber"]
+
+    @property
+    def breach_of_order(self) -> str:
+        return self.raw["additionalData"]["breachOfOrder"]
+
+    @property
+    def obligation_identifier(self) -> str | None:
+        return self.raw.get("obligationIdentifier")
+
+    @property
+    def key(self) -> str:
+        return f"{self.document_series}|{self.document_number}"
+
+    def materialize(self) -> KatObligation:
+        """Parse all fields into a KatObligation."""
+
+        return KatObligation(self.unit_group, self.raw)
+
+
+@dataclass(frozen=True, slots=True)
+class KatObligationSummary:
+    """Totals of all obligations of a response."""
+
+    count: int
+    amount: int
+    discount_amount: int
+
+    @classmethod
+    def from_payload(cls, data: any) -> "KatObligationSummary":
+        """Sums a raw API payload without parsing the obligations."""
+
+        count = amount = discount_amount = 0
+        for od in data["obligationsData"]:
+            for ob in od["obligations"]:
+                count += 1
+                amount += ob["amount"]
+                discount_amount += ob["discountAmount"]
+
+        return cls(count, amount, discount_amount)
+
+
+@dataclass(slots=True)
 class KatObligationUnitGroup:
     """Obligation unit group entry."""
 
     unit_group: int
     error_no_data_found: bool
     error_reading_data: bool
-    obligations: list[KatObligation]
+    obligations: list[KatObligation] | list[KatObligationView]
 
-    def __init__(self, unitgroup: any):
-        """Parse the data."""
+    def __init__(self, unitgroup: any, lazy: bool = False):
+        """
+        Parse the data.
+
+        :param lazy: Wrap the obligations in KatObligationView instead of parsing them
+        """
 
         self.unit_group = unitgroup["unitGroup"]
         self.error_no_data_found = unitgroup["errorNoDataFound"]
         self.error_reading_data = unitgroup["errorReadingData"]
 
+        model = KatObligationView if lazy else KatObligation
+
         self.obligations = []
         for ob in unitgroup["obligations"]:
-            self.obligations.append(KatObligation(self.unit_group, ob))
+            self.obligations.append(model(self.unit_group, ob))
 
 
-@dataclass
+@dataclass(slots=True)
 class KatObligationApiResponse:
     """Full KAT API Response"""
 
     obligations_data: list[KatObligationUnitGroup]
 
-    def __init__(self, data: any):
-        """Parse the data."""
+    def __init__(self, data: any, lazy: bool = False):
+        """
+        Parse the data.
+
+        :param lazy: Wrap the obligations in KatObligationView instead of parsing them
+        """
 
         self.obligations_data = []
         for od in data["obligationsData"]:
-            self.obligations_data.append(KatObligationUnitGroup(od))
+            self.obligations_data.append(KatObligationUnitGroup(od, lazy))
+
+    def summary(self) -> KatObligationSummary:
+        """Totals of all obligations."""
+
+        count = amount = discount_amount = 0
+        for od in self.obligations_data:
+            for ob in od.obligations:
+                count += 1
+                amount += ob.amount
+                discount_amount += ob.discount_amount
+
+        return KatObligationSummary(count, amount, discount_amount)
+
+
+@dataclass(slots=True)
+class KatBatchResult:
+    """Result of a single identity check in a batch."""
+
+    identity: KatIdentity
+    obligations: list[KatObligation] | None = None
+    error: KatError | None = None
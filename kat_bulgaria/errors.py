@@ -18,6 +18,7 @@ class KatErrorSubtype(Enum):
     VALIDATION_DRIVING_LICENSE_INVALID = "invalid_driving_license"
     VALIDATION_CAR_PLATE_NUMBER_INVALID = "invalid_car_plate_number"
     VALIDATION_BULSTAT_INVALID = "invalid_bulstat"
+    VALIDATION_IDENTIFIER_TYPE_INVALID = "invalid_identifier_type"
     VALIDATION_USER_NOT_FOUND_ONLINE = "user_not_found_online"
 
     API_TOO_MANY_REQUESTS = "api_err_too_many_requests"
@@ -25,6 +26,7 @@ class KatErrorSubtype(Enum):
     API_UNKNOWN_ERROR = "api_err_unknown"
     API_TIMEOUT = "api_err_tiomeout"
     API_INVALID_SCHEMA = "api_err_invalid_schema"
+    API_CIRCUIT_OPEN = "api_err_circuit_open"
 
 
 class KatError(Exception):
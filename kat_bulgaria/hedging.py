@@ -0,0 +1,97 @@
+"""Request hedging"""
+
+from collections import deque
+
+_DEFAULT_PERCENTILE = 0.95
+_DEFAULT_BUDGET = 0.05
+_DEFAULT_INITIAL_DELAY = 1.0
+_DEFAULT_MIN_DELAY = 0.05
+_DEFAULT_WINDOW = 500
+_DEFAULT_MIN_SAMPLES = 20
+_DEFAULT_MAX_TOKENS = 10.0
+
+
+class KatHedgingPolicy:
+    """
+    Sends a second, identical request when the first one is slower than usual.
+
+    The hedge goes out once the first request has taken longer than the
+    `percentile` of the last `window` request latencies, and whichever response
+    comes first wins. Every request earns `budget` hedge tokens and every hedge
+    spends one, so hedging adds at most `budget` extra load over time, in
+    bursts of up to `max_tokens` hedges.
+    """
+
+    def __init__(
+        self,
+        percentile: float = _DEFAULT_PERCENTILE,
+        budget: float = _DEFAULT_BUDGET,
+        initial_delay: float = _DEFAULT_INITIAL_DELAY,
+        min_delay: float = _DEFAULT_MIN_DELAY,
+        window: int = _DEFAULT_WINDOW,
+        min_samples: int = _DEFAULT_MIN_SAMPLES,
+        max_tokens: float = _DEFAULT_MAX_TOKENS
+    ) -> None:
+        """
+        Initialize the hedging policy.
+
+        :param percentile: Latency percentile after which the hedge is sent, between 0 and 1
+        :param budget: Hedges allowed per request, e.g. 0.05 for at most 5% extra requests
+        :param initial_delay: Hedge delay in seconds until `min_samples` latencies are recorded
+        :param min_delay: The hedge delay is never shorter than this many seconds
+        :param window: Number of most recent latencies considered
+        :param min_samples: Latencies needed before the percentile is used
+        :param max_tokens: Maximum number of hedges saved up for a burst of slow requests
+        """
+
+        if not 0 < percentile < 1 or budget < 0 or window < min_samples or min_samples < 1:
+            raise ValueError("invalid hedging configuration")
+
+        self.percentile = percentile
+        self.budget = budget
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_tokens = max_tokens
+
+        self.__latencies: deque[float] = deque(maxlen=window)
+        self.__delay: float | None = None
+        self.__tokens = 0.0
+
+    @property
+    def tokens(self) -> float:
+        """Hedges which may be sent right now."""
+
+        return self.__tokens
+
+    def delay(self) -> float:
+        """Seconds to wait for the first request before hedging it."""
+
+        if len(self.__latencies) < self.min_samples:
+            return self.initial_delay
+
+        if self.__delay is None:
+            ordered = sorted(self.__latencies)
+            self.__delay = max(ordered[min(int(len(ordered) * self.percentile), len(ordered) - 1)], self.min_delay)
+
+        return self.__delay
+
+    def record(self, latency: float) -> None:
+        """Report the latency of a request, or the time a cancelled request had been running."""
+
+        self.__latencies.append(latency)
+        self.__delay = None
+
+    def on_request(self) -> None:
+        """Report a first request, which earns `budget` hedge tokens."""
+
+        self.__tokens = min(self.__tokens + self.budget, self.max_tokens)
+
+    def try_hedge(self) -> bool:
+        """Spends a token if there is one; returns False if the hedge is over the budget."""
+
+        if self.__tokens < 1:
+            return False
+
+        self.__tokens -= 1
+        return True
@@ -1,5 +1,37 @@
 """Helper functions"""
 
+from json import JSONDecodeError
+import json
+from typing import Any
+
+# Optional fast JSON decoders - `pip install kat_bulgaria[fast]`
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+
+def _msgspec_loads(data: bytes | str) -> Any:
+    """Decodes JSON with msgspec, raising the same error as the stdlib."""
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError as err:
+        raise JSONDecodeError(str(err), "", 0) from err
+
+
+if orjson is not None:
+    # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+    json_loads = orjson.loads
+elif msgspec is not None:  # pragma: no cover
+    json_loads = _msgspec_loads
+else:  # pragma: no cover
+    json_loads = json.loads
+
 
 def strtobool(value: str) -> bool:
     """Checks if string is truthy"""
@@ -7,3 +39,25 @@ def strtobool(value: str) -> bool:
     if lowered in ("y", "yes", "on", "1", "true", "t"):
         return True
     return False
+
+
+class ByteMarkerScanner:
+    """Looks for a byte marker in a stream of chunks without buffering the stream."""
+
+    def __init__(self, marker: bytes):
+        self.marker = marker
+        self.scanned = 0
+        self.__tail = b""
+
+    def feed(self, chunk: bytes) -> bool:
+        """Scans the next chunk, returns True once the marker is found."""
+
+        self.scanned += len(chunk)
+
+        # Keep the end of the previous chunk, the marker may be split between chunks
+        window = self.__tail + chunk
+        if self.marker in window:
+            return True
+
+        self.__tail = window[-(len(self.marker) - 1):]
+        return False
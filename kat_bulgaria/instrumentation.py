@@ -0,0 +1,282 @@
+"""Instrumentation hooks and metrics adapters"""
+
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any
+
+from .data_models import KatIdentity
+from .errors import KatErrorSubtype
+
+# Optional metrics backends - `pip install kat_bulgaria[prometheus]` / `kat_bulgaria[opentelemetry]`
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+try:
+    from opentelemetry import metrics as otel_metrics
+except ImportError:  # pragma: no cover
+    otel_metrics = None
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class KatRequestEvent:
+    """
+    A single HTTP request to the KAT API, one per attempt.
+
+    Durations are in seconds. `connect` is 0 when a pooled connection was reused
+    and None when the transport does not report it (e.g. mocked transports).
+    """
+
+    identity: KatIdentity
+    attempt: int
+    outcome: KatErrorSubtype | None
+    status_code: int | None
+    bytes_received: int
+    duration: float
+    queued: float
+    connect: float | None
+    wait: float
+    download: float
+    decode: float
+
+    @property
+    def retries(self) -> int:
+        """Number of attempts before this one."""
+
+        return self.attempt - 1
+
+
+@dataclass(slots=True)
+class KatLookupEvent:
+    """A lookup of one identity - served from the cache or by one or more requests."""
+
+    identity: KatIdentity
+    outcome: KatErrorSubtype | None
+    cache_hit: bool
+    duration: float
+
+
+@dataclass(slots=True)
+class KatParseEvent:
+    """Building the obligation models of a lookup."""
+
+    identity: KatIdentity
+    count: int
+    duration: float
+
+
+class KatObserver:
+    """Base class for instrumentation observers - override the hooks you need."""
+
+    def on_request(self, event: KatRequestEvent) -> None:
+        """
+        Called after every HTTP request, successful or not.
+
+        Cancelled requests, e.g. the losing hedge, are not reported.
+        """
+
+    def on_lookup(self, event: KatLookupEvent) -> None:
+        """Called after every lookup, successful or not. Cancelled lookups are not reported."""
+
+    def on_parse(self, event: KatParseEvent) -> None:
+        """Called after the obligations of a lookup are built."""
+
+
+class _RequestTimer:
+    """Collects the phase timings of one request, partly through the httpcore `trace` extension."""
+
+    __slots__ = ("started", "sent", "traced", "connect_started", "connected", "headers", "body", "decoded")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.sent = self.started
+        self.traced = False
+        self.connect_started: float | None = None
+        self.connected: float | None = None
+        self.headers: float | None = None
+        self.body: float | None = None
+        self.decoded: float | None = None
+
+    def trace(self, name: str, _info: dict) -> None:
+        """httpcore trace callback for sync clients."""
+
+        now = time.perf_counter()
+        self.traced = True
+
+        if name.endswith("connect_tcp.started"):
+            self.connect_started = now
+        elif name.endswith(("connect_tcp.complete", "start_tls.complete")):
+            self.connected = now
+        elif name.endswith("send_request_headers.started"):
+            self.sent = now
+
+    async def atrace(self, name: str, info: dict) -> None:
+        """httpcore trace callback for async clients."""
+
+        self.trace(name, info)
+
+    def mark_sent(self) -> None:
+        self.sent = time.perf_counter()
+
+    def mark_headers(self) -> None:
+        self.headers = time.perf_counter()
+
+    def mark_body(self) -> None:
+        self.body = time.perf_counter()
+
+    def mark_decoded(self) -> None:
+        self.decoded = time.perf_counter()
+
+    def event(
+        self,
+        identity: KatIdentity,
+        attempt: int,
+        outcome: KatErrorSubtype | None,
+        status_code: int | None,
+        bytes_received: int
+    ) -> KatRequestEvent:
+        """Builds the event; phases which were not reached take 0 seconds."""
+
+        now = time.perf_counter()
+        headers = self.headers or now
+        body = self.body or headers
+        decoded = self.decoded or body
+
+        if self.connect_started is not None:
+            connect = (self.connected or headers) - self.connect_started
+        else:
+            connect = 0.0 if self.traced else None
+
+        return KatRequestEvent(
+            identity=identity,
+            attempt=attempt,
+            outcome=outcome,
+            status_code=status_code,
+            bytes_received=bytes_received,
+            duration=now - self.started,
+            queued=self.sent - self.started - (connect or 0.0),
+            connect=connect,
+            wait=max(headers - self.sent, 0.0),
+            download=body - headers,
+            decode=decoded - body)
+
+
+def _outcome_label(outcome: KatErrorSubtype | None) -> str:
+    return "ok" if outcome is None else outcome.value
+
+
+class KatPrometheusObserver(KatObserver):
+    """Exports lookup metrics to Prometheus through `prometheus_client`."""
+
+    def __init__(self, registry: Any = None, namespace: str = "kat") -> None:
+        """
+        Initialize the observer.
+
+        :param registry: Collector registry (optional, the default registry by default)
+        :param namespace: Prefix of the metric names
+        """
+
+        if prometheus_client is None:
+            raise ImportError("prometheus_client is not installed - `pip install kat_bulgaria[prometheus]`")
+
+        registry = registry or prometheus_client.REGISTRY
+
+        self.requests = prometheus_client.Histogram(
+            "request_duration_seconds", "KAT API request duration", ["outcome"],
+            namespace=namespace, registry=registry)
+        self.phases = prometheus_client.Histogram(
+            "request_phase_seconds", "KAT API request duration per phase", ["phase"],
+            namespace=namespace, registry=registry)
+        self.bytes = prometheus_client.Counter(
+            "response_bytes", "Bytes received from the KAT API",
+            namespace=namespace, registry=registry)
+        self.retries = prometheus_client.Counter(
+            "retries", "Retried KAT API requests",
+            namespace=namespace, registry=registry)
+        self.lookups = prometheus_client.Counter(
+            "lookups", "Obligation lookups", ["outcome", "cache"],
+            namespace=namespace, registry=registry)
+        self.parse = prometheus_client.Histogram(
+            "parse_duration_seconds", "Obligation model build duration",
+            namespace=namespace, registry=registry)
+
+    def on_request(self, event: KatRequestEvent) -> None:
+        self.requests.labels(_outcome_label(event.outcome)).observe(event.duration)
+        self.bytes.inc(event.bytes_received)
+
+        for phase in ("queued", "connect", "wait", "download", "decode"):
+            value = getattr(event, phase)
+            if value is not None:
+                self.phases.labels(phase).observe(value)
+
+        if event.attempt > 1:
+            self.retries.inc()
+
+    def on_lookup(self, event: KatLookupEvent) -> None:
+        self.lookups.labels(_outcome_label(event.outcome), "hit" if event.cache_hit else "miss").inc()
+
+    def on_parse(self, event: KatParseEvent) -> None:
+        self.parse.observe(event.duration)
+
+
+class KatOpenTelemetryObserver(KatObserver):
+    """Exports lookup metrics through the OpenTelemetry metrics API."""
+
+    def __init__(self, meter: Any = None) -> None:
+        """
+        Initialize the observer.
+
+        :param meter: OpenTelemetry meter (optional, taken from the global meter provider by default)
+        """
+
+        if otel_metrics is None:
+            raise ImportError("opentelemetry-api is not installed - `pip install kat_bulgaria[opentelemetry]`")
+
+        meter = meter or otel_metrics.get_meter("kat_bulgaria")
+
+        self.requests = meter.create_histogram(
+            "kat.request.duration", unit="s", description="KAT API request duration")
+        self.phases = meter.create_histogram(
+            "kat.request.phase.duration", unit="s", description="KAT API request duration per phase")
+        self.bytes = meter.create_counter(
+            "kat.response.size", unit="By", description="Bytes received from the KAT API")
+        self.retries = meter.create_counter(
+            "kat.retries", description="Retried KAT API requests")
+        self.lookups = meter.create_counter(
+            "kat.lookups", description="Obligation lookups")
+        self.parse = meter.create_histogram(
+            "kat.parse.duration", unit="s", description="Obligation model build duration")
+
+    def on_request(self, event: KatRequestEvent) -> None:
+        self.requests.record(event.duration, {"outcome": _outcome_label(event.outcome)})
+        self.bytes.add(event.bytes_received)
+
+        for phase in ("queued", "connect", "wait", "download", "decode"):
+            value = getattr(event, phase)
+            if value is not None:
+                self.phases.record(value, {"phase": phase})
+
+        if event.attempt > 1:
+            self.retries.add(1)
+
+    def on_lookup(self, event: KatLookupEvent) -> None:
+        self.lookups.add(1, {
+            "outcome": _outcome_label(event.outcome),
+            "cache": "hit" if event.cache_hit else "miss"})
+
+    def on_parse(self, event: KatParseEvent) -> None:
+        self.parse.record(event.duration)
+
+
+def _notify(observers: tuple[KatObserver, ...], hook: str, event: Any) -> None:
+    """Passes an event to a hook of every observer, a failing observer does not fail the request."""
+
+    for observer in observers:
+        try:
+            getattr(observer, hook)(event)
+        except Exception:
+            _LOGGER.exception("Observer %r failed in %s", observer, hook)
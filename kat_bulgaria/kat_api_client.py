@@ -1,197 +1,762 @@
 """Obligations module"""
 
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
 from json import JSONDecodeError
-import re
+import time
+from typing import TypeVar
 import httpx
 from httpx import AsyncClient
 
+from .cache import KatCache
+from .circuit_breaker import KatCircuitBreaker
+from .concurrency import KatAdaptiveConcurrency
 from .errors import KatError, KatErrorType, KatErrorSubtype
-from .data_models import KatObligationApiResponse, KatObligation, PersonalIdentificationType
+from .hedging import KatHedgingPolicy
+from .helpers import ByteMarkerScanner, json_loads
+from .instrumentation import KatLookupEvent, KatObserver, KatParseEvent, _RequestTimer, _notify
+from .query import build_query
+from .rate_limiter import KatRateLimiter
+from .retry import KatRetryPolicy
+from .single_flight import SingleFlight
+from .validation import (
+    ERR_INVALID_BULSTAT,
+    ERR_INVALID_CAR_PLATE_NUM,
+    ERR_INVALID_EGN,
+    ERR_INVALID_GOV_ID,
+    ERR_INVALID_LICENSE
+)
+from .data_models import (
+    KatBatchResult,
+    KatIdentity,
+    KatObligation,
+    KatObligationSummary,
+    KatObligationView,
+    PersonalIdentificationType
+)
+
+_T = TypeVar("_T")
 
 _REQUEST_TIMEOUT = 10
 
-# Знам че това е грозно, но е много по-лесно и безпроблемно от custom URL builder за 4 url-a.
-_URL_PERSON_DRIVING_LICENSE = "https://e-uslugi.mvr.bg/api/Obligations/AND?obligatedPersonType=1&additinalDataForObligatedPersonType=1&mode=1&obligedPersonIdent={egn}&drivingLicenceNumber={identifier}"
-_URL_PERSON_GOV_ID = "https://e-uslugi.mvr.bg/api/Obligations/AND?obligatedPersonType=1&additinalDataForObligatedPersonType=2&mode=1&obligedPersonIdent={egn}&personalDocumentNumber={identifier}"
-_URL_PERSON_CAR_PLATE = "https://e-uslugi.mvr.bg/api/Obligations/AND?obligatedPersonType=1&additinalDataForObligatedPersonType=3&mode=1&obligedPersonIdent={egn}&foreignVehicleNumber={car_plate_num}"
-_URL_BUSINESS = "https://e-uslugi.mvr.bg/api/Obligations/AND?obligatedPersonType=2&additinalDataForObligatedPersonType=1&mode=1&obligedPersonIdent={egn}&personalDocumentNumber={identifier}&uic={bulstat}"
+_DEFAULT_MAX_CONNECTIONS = 20
+_DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+_DEFAULT_KEEPALIVE_EXPIRY = 30.0
+_DEFAULT_BATCH_CONCURRENCY = 10
 
-ERR_INVALID_EGN = "EGN is not valid."
-ERR_INVALID_LICENSE = "Driving License Number is not valid."
-ERR_INVALID_GOV_ID = "Government ID Number is not valid."
-ERR_INVALID_CAR_PLATE_NUM = "Car plate number is not valid."
-ERR_INVALID_BULSTAT = "BULSTAT is not valid."
+_TOO_MANY_REQUESTS_MARKER = "Достигнат е максимално допустимият брой заявки към системата".encode()
+
+# The "too many requests" page is ~430 KB with the marker near the end.
+# Stop scanning HTML bodies after this many bytes.
+_MAX_HTML_SCAN_BYTES = 1024 * 1024
 
 ERR_INVALID_USER_DATA = "User data (EGN and Identity Document combination) is not valid."
 
 
 ERR_API_TOO_MANY_REQUESTS = "KAT API too many requests for {identifier_type}={identifier}"
 ERR_API_TIMEOUT = "KAT API request timed out for {identifier_type}={identifier}"
+ERR_API_DEADLINE = "KAT API lookup deadline exceeded for {identifier_type}={identifier}"
 ERR_API_DOWN = "KAT API was unable to process the request. Try again later."
 ERR_API_MALFORMED_RESP = " KAT API returned a malformed response: {data}"
 ERR_API_UNKNOWN = "KAT API returned an unknown error: {error}"
+ERR_API_UNEXPECTED_CONTENT_TYPE = "unexpected content type {content_type}"
+ERR_API_CIRCUIT_OPEN = "KAT API is unavailable, requests are paused for {seconds:.0f} more seconds."
+ERR_CLIENT_CLOSED = "The client was closed while the request for {identifier_type}={identifier} was in flight."
+
+# region shared by KatApiClient and KatApiClientSync
+
+
+def _check_response(resp: httpx.Response, identity: KatIdentity) -> bool:
+    """
+    Checks the status and content type of a streamed response
+
+    Returns True if the body is HTML, which is never valid data and
+    has to be classified with `_html_response_error`.
+    """
+
+    if resp.status_code == httpx.codes.TOO_MANY_REQUESTS:
+        raise _too_many_requests_error(identity)
+
+    resp.raise_for_status()
+
+    return resp.headers.get("content-type", "").startswith("text/html")
+
+
+def _html_response_error(resp: httpx.Response, throttled: bool, identity: KatIdentity) -> KatError:
+    """Error for an HTML response - the "too many requests" page or an unknown page."""
+
+    if throttled:
+        return _too_many_requests_error(identity)
+
+    return KatError(
+        KatErrorType.API_ERROR, KatErrorSubtype.API_UNKNOWN_ERROR,
+        ERR_API_MALFORMED_RESP.format(
+            data=ERR_API_UNEXPECTED_CONTENT_TYPE.format(content_type=resp.headers.get("content-type")))
+    )
+
+
+def _circuit_open_error(breaker: KatCircuitBreaker) -> KatError:
+    return KatError(
+        KatErrorType.API_ERROR, KatErrorSubtype.API_CIRCUIT_OPEN,
+        ERR_API_CIRCUIT_OPEN.format(seconds=breaker.retry_after()))
+
+
+def _deadline_error(identity: KatIdentity) -> KatError:
+    return KatError(
+        KatErrorType.API_ERROR, KatErrorSubtype.API_TIMEOUT,
+        ERR_API_DEADLINE.format(
+            identifier_type=identity.identifier_type,
+            identifier=identity.identifier)
+    )
+
+
+def _client_closed_error(identity: KatIdentity) -> KatError:
+    return KatError(
+        KatErrorType.API_ERROR, KatErrorSubtype.API_UNKNOWN_ERROR,
+        ERR_CLIENT_CLOSED.format(
+            identifier_type=identity.identifier_type,
+            identifier=identity.identifier)
+    )
+
+
+def _deadline_at(deadline: float | None) -> float | None:
+    """Monotonic time at which a deadline of `deadline` seconds from now expires."""
+
+    return None if deadline is None else time.monotonic() + deadline
+
+
+def _attempt_timeout(timeout: httpx.Timeout, expires: float | None) -> httpx.Timeout | None:
+    """
+    Timeouts of one attempt, each phase capped by the time left until the deadline
+
+    Returns None if the deadline has already passed.
+    """
+
+    if expires is None:
+        return timeout
+
+    remaining = expires - time.monotonic()
+    if remaining <= 0:
+        return None
+
+    def cap(value: float | None) -> float:
+        return remaining if value is None else min(value, remaining)
+
+    return httpx.Timeout(
+        connect=cap(timeout.connect), read=cap(timeout.read), write=cap(timeout.write), pool=cap(timeout.pool))
+
+
+def _too_many_requests_error(identity: KatIdentity) -> KatError:
+    return KatError(
+        KatErrorType.API_ERROR, KatErrorSubtype.API_TOO_MANY_REQUESTS,
+        ERR_API_TOO_MANY_REQUESTS.format(
+            identifier_type=identity.identifier_type,
+            identifier=identity.identifier)
+    )
+
+
+def _decode_payload(body: bytes) -> dict:
+    """Decodes a response body and checks the schema."""
+
+    data = json_loads(body)
+
+    if not isinstance(data, dict) or "obligationsData" not in data:
+        # This should never happen.
+        # If we go in this if, this probably means they changed their schema
+        raise KatError(
+            KatErrorType.API_ERROR,
+            KatErrorSubtype.API_INVALID_SCHEMA,
+            ERR_API_MALFORMED_RESP.format(data=data)
+        )
+
+    return data
+
+
+def _transport_error(ex: httpx.HTTPError | JSONDecodeError, identity: KatIdentity) -> KatError:
+    """Maps an httpx or JSON decoding error to a KatError."""
+
+    if isinstance(ex, httpx.TimeoutException):
+        return KatError(KatErrorType.API_ERROR, KatErrorSubtype.API_TIMEOUT, ERR_API_TIMEOUT.format(
+            identifier_type=identity.identifier_type,
+            identifier=identity.identifier))
+
+    if isinstance(ex, httpx.HTTPError):
+        return KatError(KatErrorType.API_ERROR, KatErrorSubtype.API_UNKNOWN_ERROR, ERR_API_UNKNOWN.format(
+            error=str(ex)))
+
+    return KatError(KatErrorType.API_ERROR, KatErrorSubtype.API_UNKNOWN_ERROR, ERR_API_MALFORMED_RESP.format(
+        data=str(ex)))
+
+
+def _validate_response(data: dict):
+    """Validate if the user is valid"""
+
+    for od in data["obligationsData"]:
+        if od.get("errorNoDataFound") is True:
+            raise KatError(
+                KatErrorType.VALIDATION_ERROR, KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE, ERR_INVALID_USER_DATA)
+
+        if od.get("errorReadingData") is True:
+            raise KatError(
+                KatErrorType.API_ERROR, KatErrorSubtype.API_ERROR_READING_DATA, ERR_API_DOWN)
+
+
+def _validate_and_cache(data: dict, cache: KatCache | None, cache_key: str | None):
+    """Validates a fresh payload and caches it, "user not found" included."""
+
+    try:
+        _validate_response(data)
+    except KatError as err:
+        if cache_key is not None and err.error_subtype == KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE:
+            cache.set(cache_key, data, negative=True)
+        raise
+
+    if cache_key is not None:
+        cache.set(cache_key, data)
+
+
+def _get_retry_delay(
+        policy: KatRetryPolicy,
+        err: KatError,
+        attempt: int,
+        started: float,
+        expires: float | None = None) -> float | None:
+    """Seconds to wait before retrying a failed attempt, None if it should not be retried."""
+
+    if attempt >= policy.max_attempts or not policy.is_retryable(err):
+        return None
+
+    delay = policy.get_delay(attempt)
+    now = time.monotonic()
+
+    if policy.deadline is not None and now - started + delay >= policy.deadline:
+        return None
+
+    if expires is not None and now + delay >= expires:
+        return None
+
+    return delay
+
+
+class _RequestAttempt:
+    """
+    Bookkeeping of a single request attempt, shared by both clients
+
+    Checks the deadline and the circuit breaker when created, then tracks the
+    response, outcome and phase timings. `finish()` reports them to the circuit
+    breaker and the observers.
+    """
+
+    __slots__ = (
+        "identity", "attempt", "expires", "timeout", "resp", "outcome", "completed", "cancelled",
+        "__request_timeout", "__circuit_breaker", "__circuit", "__rate_limiter", "__observers", "__timer")
 
-REGEX_EGN = r"^[0-9]{10}$"
-REGEX_DRIVING_LICENSE = r"^[0-9]{9}$"
+    def __init__(
+        self,
+        identity: KatIdentity,
+        attempt: int,
+        expires: float | None,
+        request_timeout: httpx.Timeout,
+        circuit_breaker: KatCircuitBreaker | None,
+        rate_limiter: KatRateLimiter | None,
+        observers: tuple[KatObserver, ...]
+    ) -> None:
+        if _attempt_timeout(request_timeout, expires) is None:
+            raise _deadline_error(identity)
+
+        self.__circuit = None
+        if circuit_breaker is not None:
+            self.__circuit = circuit_breaker.try_acquire()
+            if self.__circuit is None:
+                raise _circuit_open_error(circuit_breaker)
+
+        self.identity = identity
+        self.attempt = attempt
+        self.expires = expires
+        self.timeout: httpx.Timeout | None = None
+        self.resp: httpx.Response | None = None
+        self.outcome: KatErrorSubtype | None = None
+        self.completed = False
+        self.cancelled = False
+
+        self.__request_timeout = request_timeout
+        self.__circuit_breaker = circuit_breaker
+        self.__rate_limiter = rate_limiter
+        self.__observers = observers
+        self.__timer = _RequestTimer() if observers else None
+
+    def stream_options(self, asynchronous: bool) -> dict:
+        """
+        Keyword arguments of `client.stream()`, once the request is let through by the limiters
+
+        Raises the deadline error if the deadline passed while waiting.
+        """
+
+        self.timeout = _attempt_timeout(self.__request_timeout, self.expires)
+        if self.timeout is None:
+            raise _deadline_error(self.identity)
+
+        if self.__timer is None:
+            return {"timeout": self.timeout}
+
+        self.__timer.mark_sent()
+        trace = self.__timer.atrace if asynchronous else self.__timer.trace
+
+        return {"timeout": self.timeout, "extensions": {"trace": trace}}
+
+    def on_headers(self, resp: httpx.Response) -> None:
+        self.resp = resp
+        if self.__timer is not None:
+            self.__timer.mark_headers()
+
+    def on_body(self) -> None:
+        if self.__timer is not None:
+            self.__timer.mark_body()
+
+    def on_decoded(self) -> None:
+        if self.__timer is not None:
+            self.__timer.mark_decoded()
+
+    def on_success(self) -> None:
+        """The API answered with a JSON payload."""
+
+        if self.__rate_limiter is not None:
+            self.__rate_limiter.on_success()
+
+        self.completed = True
+
+    def on_error(self, err: KatError) -> None:
+        if self.__rate_limiter is not None and err.error_subtype == KatErrorSubtype.API_TOO_MANY_REQUESTS:
+            self.__rate_limiter.on_throttled()
+
+        # Nothing was sent if the deadline passed while waiting
+        self.completed = self.timeout is not None
+        self.outcome = err.error_subtype
 
-# ID Format Supports "123456789" and "AA1234567"
-REGEX_GOVT_ID = r"^[0-9]{9}|[A-Z]{2}[0-9]{7}$"
-REGEX_BULSTAT = r"^[0-9]{9}$"
-REGEX_CAR_PLATE = r"^[A-Z0-9]+$"
+    def finish(self) -> None:
+        """Reports the attempt to the circuit breaker and the observers."""
+
+        if self.__circuit is not None:
+            self.__circuit_breaker.record(self.__circuit, self.outcome, self.completed)
+
+        # A cancelled request has no outcome, it would be counted as a success
+        if self.__timer is not None and not self.cancelled:
+            _notify(self.__observers, "on_request", self.__timer.event(
+                self.identity, self.attempt, self.outcome,
+                self.resp.status_code if self.resp is not None else None,
+                self.resp.num_bytes_downloaded if self.resp is not None else 0))
+
+
+def _iter_payload(data: dict, lazy: bool) -> Iterator[KatObligation] | Iterator[KatObligationView]:
+    """Parses the obligations of a validated API payload one at a time."""
+
+    model = KatObligationView if lazy else KatObligation
+
+    for od in data["obligationsData"]:
+        for ob in od["obligations"]:
+            yield model(od["unitGroup"], ob)
+
+
+# endregion
 
 
 class KatApiClient:
     """KAT API manager"""
 
-    def __self__(self):
-        """Initialize API client."""
+    def __init__(
+        self,
+        max_connections: int = _DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = _DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = _DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+        timeout: float | httpx.Timeout = _REQUEST_TIMEOUT,
+        rate_limiter: KatRateLimiter | None = None,
+        retry_policy: KatRetryPolicy | None = None,
+        cache: KatCache | None = None,
+        circuit_breaker: KatCircuitBreaker | None = None,
+        concurrency_limiter: KatAdaptiveConcurrency | None = None,
+        hedging: KatHedgingPolicy | None = None,
+        coalesce_requests: bool = True,
+        lazy_parsing: bool = False,
+        observers: Iterable[KatObserver] | None = None,
+        strict_validation: bool = False
+    ) -> None:
+        """
+        Initialize API client.
+
+        The client owns a pooled httpx.AsyncClient which is created on first use
+        and reused for every lookup. Close it with `aclose()` or use the client
+        as an async context manager, also when it is used for a single lookup.
+
+        :param max_connections: Maximum number of concurrent connections in the pool
+        :param max_keepalive_connections: Maximum number of idle connections kept alive
+        :param keepalive_expiry: Seconds an idle connection is kept alive
+        :param http2: Enable HTTP/2 (requires the `http2` extra - `pip install kat_bulgaria[http2]`)
+        :param transport: Custom httpx transport for the pooled client, e.g. a local stand-in server
+            (optional, replaces the pool limits)
+        :param timeout: Seconds, or an httpx.Timeout with separate connect/read/write/pool timeouts
+        :param rate_limiter: Rate limiter shared by all requests of this client (optional)
+        :param retry_policy: Retry policy for transient API errors (optional, no retries by default)
+        :param cache: Cache for lookup results, e.g. KatMemoryCache or KatSqliteCache (optional)
+        :param circuit_breaker: Circuit breaker failing lookups fast with API_CIRCUIT_OPEN
+            while the API is down (optional)
+        :param concurrency_limiter: Adaptive limit on the requests in flight, shrinking on timeouts,
+            throttling and slowdowns (optional)
+        :param hedging: Hedging policy sending a second request when the first one is slow,
+            to cut tail latency (optional)
+        :param coalesce_requests: Share one in-flight request between concurrent lookups of the same identity
+        :param lazy_parsing: Return KatObligationView objects which parse fields only when accessed
+        :param observers: Instrumentation observers notified of every request, lookup and parse (optional)
+        :param strict_validation: Also reject EGNs and BULSTATs with a wrong checksum or birth date before any request
+        """
+
+        self.__limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry)
+        self.__http2 = http2
+        self.__transport = transport
+        self.__timeout = httpx.Timeout(timeout)
+        self.__client: AsyncClient | None = None
+        self.__client_loop: asyncio.AbstractEventLoop | None = None
+        self.__rate_limiter = rate_limiter
+        self.__retry_policy = retry_policy
+        self.__cache = cache
+        self.__circuit_breaker = circuit_breaker
+        self.__concurrency_limiter = concurrency_limiter
+        self.__hedging = hedging
+        self.__single_flight = SingleFlight() if coalesce_requests else None
+        self.__lazy_parsing = lazy_parsing
+        self.__observers = tuple(observers or ())
+        self.__strict_validation = strict_validation
+
+    async def __aenter__(self) -> "KatApiClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled HTTP client and release its connections.
+
+        Shared requests still in flight are cancelled, so none of them opens
+        the pool again; lookups waiting for them fail with API_UNKNOWN_ERROR.
+        """
 
-    def __validate_response(self, data: KatObligationApiResponse):
-        """Validate if the user is valid"""
+        if self.__single_flight is not None:
+            self.__single_flight.cancel()
 
-        for od in data.obligations_data:
-            if od.error_no_data_found is True:
-                raise KatError(
-                    KatErrorType.VALIDATION_ERROR, KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE, ERR_INVALID_USER_DATA)
+        if self.__client is not None:
+            client = self.__client
+            self.__client = None
 
-            if od.error_reading_data is True:
-                raise KatError(
-                    KatErrorType.API_ERROR, KatErrorSubtype.API_ERROR_READING_DATA, ERR_API_DOWN)
+            # Connections of a pool created in another event loop cannot be closed from this one
+            if self.__client_loop is asyncio.get_running_loop():
+                await client.aclose()
 
-    async def __get_obligations_from_url(
+    def __get_client(self) -> AsyncClient:
+        """
+        Get the pooled HTTP client, creating it on first use
+
+        The pool is bound to the event loop it was created in, a client reused
+        in another loop (e.g. a later `asyncio.run()`) gets a new pool.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        if self.__client is None or self.__client.is_closed or self.__client_loop is not loop:
+            self.__client = httpx.AsyncClient(
+                limits=self.__limits,
+                http2=self.__http2,
+                transport=self.__transport,
+                timeout=self.__timeout)
+            self.__client_loop = loop
+
+        return self.__client
+
+    async def __scan_too_many_requests_page(self, resp: httpx.Response) -> bool:
+        """Scans a streamed HTML response for the "too many requests" marker."""
+
+        scanner = ByteMarkerScanner(_TOO_MANY_REQUESTS_MARKER)
+
+        async for chunk in resp.aiter_bytes():
+            if scanner.feed(chunk):
+                return True
+
+            if scanner.scanned >= _MAX_HTML_SCAN_BYTES:
+                break
+
+        return False
+
+    async def __get_payload(
         self,
-        url: str,
-        identifier_type: PersonalIdentificationType,
-        identifier: str,
-        external_httpx_client: AsyncClient | None = None
-    ) -> list[KatObligation]:
+        identity: KatIdentity,
+        external_httpx_client: AsyncClient | None = None,
+        expires: float | None = None
+    ) -> dict:
+        """
+        Validates the identity and gets its validated API payload
+        through the cache and request coalescing
+
+        :param identity: Identity to check
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param expires: Monotonic time of the lookup deadline (optional)
+        """
+
+        started = time.perf_counter()
+        cache_hit = False
+        outcome = None
+        cancelled = False
+
+        try:
+            query = build_query(identity, self.__strict_validation)
+
+            cache_key = query.key if self.__cache is not None else None
+
+            if cache_key is not None:
+                data = self.__cache.get(cache_key)
+                if data is not None:
+                    cache_hit = True
+                    _validate_response(data)
+                    return data
+
+            if self.__single_flight is None:
+                request = self.__request_with_retry(query.url, identity, external_httpx_client, cache_key, expires)
+            else:
+                # Concurrent lookups of the same identity share one request. The
+                # request runs with the deadline of the lookup which started it,
+                # so only lookups with the same deadline, e.g. of one batch, share it
+                request = self.__single_flight.run(
+                    query.key if expires is None else f"{query.key}@{expires}",
+                    lambda: self.__request_with_retry(query.url, identity, external_httpx_client, cache_key, expires))
+
+            try:
+                if expires is None:
+                    return await request
+
+                # Attempt timeouts are capped by the deadline, this also bounds the
+                # time spent waiting for the rate limiter and for a free slot
+                try:
+                    return await asyncio.wait_for(request, expires - time.monotonic())
+                except TimeoutError as ex:
+                    raise _deadline_error(identity) from ex
+
+            except asyncio.CancelledError:
+                # The shared request was cancelled by aclose(), not this lookup
+                if asyncio.current_task().cancelling():
+                    raise
+                raise _client_closed_error(identity) from None
+
+        except KatError as err:
+            outcome = err.error_subtype
+            raise
+
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+        finally:
+            # A cancelled lookup has no outcome to report
+            if self.__observers and not cancelled:
+                _notify(self.__observers, "on_lookup", KatLookupEvent(
+                    identity, outcome, cache_hit, time.perf_counter() - started))
+
+    async def __request_with_retry(
+        self,
+        url: httpx.URL,
+        identity: KatIdentity,
+        external_httpx_client: AsyncClient | None = None,
+        cache_key: str | None = None,
+        expires: float | None = None
+    ) -> dict:
+        """Gets the validated API payload from URL, retrying transient errors until the deadline"""
+
+        policy = self.__retry_policy
+
+        if policy is None:
+            return await self.__request_attempt(url, identity, external_httpx_client, cache_key, 1, expires)
+
+        started = time.monotonic()
+        attempt = 1
+
+        while True:
+            try:
+                return await self.__request_attempt(url, identity, external_httpx_client, cache_key, attempt, expires)
+            except KatError as err:
+                delay = _get_retry_delay(policy, err, attempt, started, expires)
+                if delay is None:
+                    raise
+
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def __request_attempt(
+        self,
+        url: httpx.URL,
+        identity: KatIdentity,
+        external_httpx_client: AsyncClient | None,
+        cache_key: str | None,
+        attempt: int,
+        expires: float | None
+    ) -> dict:
+        """
+        Gets the validated API payload from URL - single attempt, hedged if enabled
+
+        If the first request takes longer than the hedging delay, an identical
+        request is sent and the first successful response wins. The other request
+        is cancelled. The attempt fails only if both requests fail.
+        """
+
+        hedging = self.__hedging
+
+        if hedging is None:
+            return await self.__request_payload(url, identity, external_httpx_client, cache_key, attempt, expires)
+
+        def send() -> asyncio.Task:
+            task = asyncio.ensure_future(
+                self.__request_payload(url, identity, external_httpx_client, cache_key, attempt, expires))
+            started[task] = time.monotonic()
+            return task
+
+        hedging.on_request()
+        started: dict[asyncio.Task, float] = {}
+        pending = {send()}
+        error = None
+
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedging.delay())
+
+            if not done and hedging.try_hedge():
+                pending.add(send())
+
+            while True:
+                winner = None
+
+                # Look at every finished request, so no error is left unretrieved
+                for task in done:
+                    if task.exception() is None:
+                        winner = winner or task
+                    else:
+                        error = error or task.exception()
+
+                if winner is not None:
+                    hedging.record(time.monotonic() - started[winner])
+                    return winner.result()
+
+                if not pending:
+                    raise error
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+        finally:
+            for task in pending:
+                # The losing request is a lower bound of the latency, keep it so the percentile does not drift down
+                hedging.record(time.monotonic() - started[task])
+                task.cancel()
+
+    async def __request_payload(
+        self,
+        url: httpx.URL,
+        identity: KatIdentity,
+        external_httpx_client: AsyncClient | None = None,
+        cache_key: str | None = None,
+        attempt: int = 1,
+        expires: float | None = None
+    ) -> dict:
         """
-        Gets a list of obligations/fines from URL
+        Gets the validated API payload from URL - single attempt
+
+        Used for both the pooled and external clients:
+        status -> content type -> throttling detection -> JSON parse -> schema check
 
         :param url: URL to fetch the data from
-        :param identifier: Person identifier - Government ID Number or Driving License Number
+        :param identity: Identity the URL was built for
+        :param cache_key: Key to cache the response under (optional)
+        :param attempt: Number of this attempt, starting from 1
+        :param expires: Monotonic time of the lookup deadline (optional)
 
         """
-        data = {}
+        client = external_httpx_client or self.__get_client()
+        request = _RequestAttempt(
+            identity, attempt, expires, self.__timeout,
+            self.__circuit_breaker, self.__rate_limiter, self.__observers)
+        slot = None
 
         try:
-            if external_httpx_client:
-                resp = await external_httpx_client.get(url, timeout=_REQUEST_TIMEOUT)
-                data = resp.json()
-                resp.raise_for_status()
-            else:
-                async with httpx.AsyncClient() as client:
-                    resp = await client.get(url, timeout=_REQUEST_TIMEOUT)
-
-                    resp.raise_for_status()
-
-                    if (resp.headers.get("content-type") == "text/html" and "Достигнат е максимално допустимият брой заявки към системата" in resp.text):
-                        raise KatError(
-                            KatErrorType.API_ERROR, KatErrorSubtype.API_TOO_MANY_REQUESTS,
-                            ERR_API_TOO_MANY_REQUESTS.format(
-                                identifier_type=identifier_type,
-                                identifier=identifier)
-                        )
-
-                    data = resp.json()
-
-        except httpx.TimeoutException as ex_timeout:
-            raise KatError(KatErrorType.API_ERROR, KatErrorSubtype.API_TIMEOUT, ERR_API_TIMEOUT.format(
-                identifier_type=identifier_type,
-                identifier=identifier)
-            ) from ex_timeout
-
-        except httpx.HTTPError as ex_apierror:
-            raise KatError(KatErrorType.API_ERROR, KatErrorSubtype.API_UNKNOWN_ERROR, ERR_API_UNKNOWN.format(
-                error=str(ex_apierror))) from ex_apierror
-
-        except JSONDecodeError as ex_decode_err:
-            raise KatError(KatErrorType.API_ERROR, KatErrorSubtype.API_UNKNOWN_ERROR, ERR_API_MALFORMED_RESP.format(
-                data=str(ex_decode_err))) from ex_decode_err
-
-        if "obligationsData" not in data:
-            # This should never happen.
-            # If we go in this if, this probably means they changed their schema
-            raise KatError(
-                KatErrorType.API_ERROR,
-                KatErrorSubtype.API_INVALID_SCHEMA,
-                ERR_API_MALFORMED_RESP.format(data=data)
-            )
-
-        api_data = KatObligationApiResponse(data)
-        self.__validate_response(api_data)
-
-        response = []
-        for og in api_data.obligations_data:
-            for ob in og.obligations:
-                response.append(ob)
-
-        return response
-
-    def __validate_credentials_individual(
-            self,
-            egn: str,
-            identifier_type: str,
-            identifier: str):
-        """Validates the combination of EGN and License number for an individual."""
-
-        # Validate EGN
-        if egn is None or re.search(REGEX_EGN, egn) is None:
-            raise KatError(
-                KatErrorType.VALIDATION_ERROR,
-                KatErrorSubtype.VALIDATION_EGN_INVALID,
-                ERR_INVALID_EGN)
-
-        # Validate Driving License Number
-        if identifier_type == PersonalIdentificationType.NATIONAL_ID:
-            if identifier is None or re.search(REGEX_GOVT_ID, identifier) is None:
-                raise KatError(
-                    KatErrorType.VALIDATION_ERROR, KatErrorSubtype.VALIDATION_GOV_ID_NUMBER_INVALID, ERR_INVALID_GOV_ID)
-
-        # Validate Driving License Number
-        if identifier_type == PersonalIdentificationType.DRIVING_LICENSE:
-            if identifier is None or re.search(REGEX_DRIVING_LICENSE, identifier) is None:
-                raise KatError(
-                    KatErrorType.VALIDATION_ERROR, KatErrorSubtype.VALIDATION_DRIVING_LICENSE_INVALID, ERR_INVALID_LICENSE)
-
-        # Validate Car Plate Number
-        if identifier_type == PersonalIdentificationType.CAR_PLATE_NUM:
-            if identifier is None or re.search(REGEX_CAR_PLATE, identifier) is None:
-                raise KatError(
-                    KatErrorType.VALIDATION_ERROR, KatErrorSubtype.VALIDATION_CAR_PLATE_NUMBER_INVALID, ERR_INVALID_CAR_PLATE_NUM)
-
-        return True
-
-    def __validate_credentials_business(
-            self,
-            egn: str,
-            govt_id_number: str,
-            bulstat: str) -> bool:
-        """Validates the combination of EGN, Government ID Number and BULSTAT for a business."""
-
-        # Validate EGN
-        if egn is None or re.search(REGEX_EGN, egn) is None:
-            raise KatError(KatErrorType.VALIDATION_ERROR, KatErrorSubtype.VALIDATION_EGN_INVALID,
-                           ERR_INVALID_EGN)
-
-        # Validate Government ID Number
-        if govt_id_number is None or re.search(REGEX_GOVT_ID, govt_id_number) is None:
-            raise KatError(
-                KatErrorType.VALIDATION_ERROR, KatErrorSubtype.VALIDATION_GOV_ID_NUMBER_INVALID, ERR_INVALID_GOV_ID)
+            # The rate token is taken only once there is a free slot, so requests
+            # queued for slots do not all go out at once when slots free up
+            if self.__concurrency_limiter is not None:
+                slot = await self.__concurrency_limiter.acquire()
 
-        # Validate BULSTAT
-        if bulstat is None or re.search(REGEX_BULSTAT, bulstat) is None:
-            raise KatError(
-                KatErrorType.VALIDATION_ERROR, KatErrorSubtype.VALIDATION_BULSTAT_INVALID, ERR_INVALID_BULSTAT)
+            if self.__rate_limiter is not None:
+                await self.__rate_limiter.acquire()
+
+                # The slot latency starts when the request is sent, not while it waits for the rate
+                if slot is not None:
+                    slot = time.monotonic()
+
+            try:
+                async with client.stream("GET", url, **request.stream_options(asynchronous=True)) as resp:
+                    request.on_headers(resp)
+
+                    # HTML is classified from the raw stream and the connection is dropped
+                    # instead of downloading and decoding the whole page
+                    if _check_response(resp, identity):
+                        raise _html_response_error(resp, await self.__scan_too_many_requests_page(resp), identity)
+
+                    body = await resp.aread()
+                    request.on_body()
+
+                    data = _decode_payload(body)
+                    request.on_decoded()
+
+            except (httpx.HTTPError, JSONDecodeError) as ex:
+                raise _transport_error(ex, identity) from ex
+
+            request.on_success()
+            _validate_and_cache(data, self.__cache, cache_key)
+
+        except KatError as err:
+            request.on_error(err)
+            raise
+
+        except asyncio.CancelledError:
+            # e.g. the losing hedge or a request cut off by the lookup deadline
+            request.cancelled = True
+            raise
+
+        finally:
+            if slot is not None:
+                self.__concurrency_limiter.release(slot, request.outcome, request.completed)
 
-        return True
+            request.finish()
+
+        return data
+
+    def __parse_obligations(
+        self, identity: KatIdentity, data: dict
+    ) -> list[KatObligation] | list[KatObligationView]:
+        """Parses a validated API payload into a flat list of obligations."""
+
+        if not self.__observers:
+            return list(_iter_payload(data, self.__lazy_parsing))
+
+        started = time.perf_counter()
+        obligations = list(_iter_payload(data, self.__lazy_parsing))
+        _notify(self.__observers, "on_parse", KatParseEvent(
+            identity, len(obligations), time.perf_counter() - started))
+
+        return obligations
 
     async def get_obligations_individual(
         self,
         egn: str,
         identifier_type: str,
         identifier: str,
-        external_httpx_client: AsyncClient | None = None
+        external_httpx_client: AsyncClient | None = None,
+        deadline: float | None = None
     ) -> list[KatObligation]:
         """
         Gets a list of obligations/fines for an individual
@@ -200,43 +765,249 @@ class KatApiClient:
         :param identifier_type: PersonalIdentificationType.NATIONAL_ID, PersonalIdentificationType.DRIVING_LICENSE or PersonalIdentificationType.CAR_PLATE_NUM
         :param identifier: Number of identification card (National ID or Driving License) or Car Plate Number
         :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
+        """
+
+        return await self.get_obligations(
+            KatIdentity.individual(egn, identifier_type, identifier), external_httpx_client, deadline)
+
+    async def get_obligations_business(
+        self,
+        egn: str,
+        govt_id: str,
+        bulstat: str,
+        external_httpx_client: AsyncClient | None = None,
+        deadline: float | None = None
+    ) -> list[KatObligation]:
+        """
+        Gets a list of obligations/fines for a business entity
+
+        :param egn: EGN (National Identification Number)
+        :param govt_id: National ID Number
+        :param bulstat: Business BULSTAT
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
         """
 
-        self.__validate_credentials_individual(
-            egn, identifier_type, identifier)
+        return await self.get_obligations(
+            KatIdentity.business(egn, govt_id, bulstat), external_httpx_client, deadline)
 
-        url: str
+    async def get_obligations(
+        self, identity: KatIdentity, external_httpx_client: AsyncClient | None = None, deadline: float | None = None
+    ) -> list[KatObligation]:
+        """
+        Gets a list of obligations/fines for an individual or a business entity
 
-        if identifier_type == PersonalIdentificationType.NATIONAL_ID:
-            url = _URL_PERSON_GOV_ID.format(
-                egn=egn, identifier=identifier)
+        With `lazy_parsing` enabled the list holds KatObligationView objects.
 
-        if identifier_type == PersonalIdentificationType.DRIVING_LICENSE:
-            url = _URL_PERSON_DRIVING_LICENSE.format(
-                egn=egn, identifier=identifier)
+        :param identity: Identity to check
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
+        """
 
-        if identifier_type == PersonalIdentificationType.CAR_PLATE_NUM:
-            url = _URL_PERSON_CAR_PLATE.format(
-                egn=egn, car_plate_num=identifier)
+        return self.__parse_obligations(
+            identity, await self.__get_payload(identity, external_httpx_client, _deadline_at(deadline)))
 
-        return await self.__get_obligations_from_url(url, identifier_type, identifier, external_httpx_client)
+    async def get_obligations_summary(
+        self, identity: KatIdentity, external_httpx_client: AsyncClient | None = None, deadline: float | None = None
+    ) -> KatObligationSummary:
+        """
+        Gets the count and totals of the obligations/fines without parsing them
 
-    async def get_obligations_business(
-        self, egn: str, govt_id: str, bulstat: str, external_httpx_client: AsyncClient | None = None
-    ) -> list[KatObligation]:
+        :param identity: Identity to check
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
         """
-        Gets a list of obligations/fines for a business entity
+
+        return KatObligationSummary.from_payload(
+            await self.__get_payload(identity, external_httpx_client, _deadline_at(deadline)))
+
+    async def iter_obligations(
+        self, identity: KatIdentity, external_httpx_client: AsyncClient | None = None, deadline: float | None = None
+    ) -> AsyncIterator[KatObligation]:
+        """
+        Yields the obligations/fines of an individual or a business entity one by one
+
+        Each obligation is parsed only when the consumer asks for it, no list is built.
+
+        :param identity: Identity to check
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
+        """
+
+        data = await self.__get_payload(identity, external_httpx_client, _deadline_at(deadline))
+
+        for obligation in _iter_payload(data, self.__lazy_parsing):
+            yield obligation
+
+    async def iter_obligations_individual(
+        self,
+        egn: str,
+        identifier_type: str,
+        identifier: str,
+        external_httpx_client: AsyncClient | None = None,
+        deadline: float | None = None
+    ) -> AsyncIterator[KatObligation]:
+        """
+        Yields the obligations/fines of an individual one by one
+
+        :param egn: EGN (National Identification Number)
+        :param identifier_type: PersonalIdentificationType.NATIONAL_ID, PersonalIdentificationType.DRIVING_LICENSE
+            or PersonalIdentificationType.CAR_PLATE_NUM
+        :param identifier: Number of identification card (National ID or Driving License) or Car Plate Number
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
+        """
+
+        async for obligation in self.iter_obligations(
+                KatIdentity.individual(egn, identifier_type, identifier), external_httpx_client, deadline):
+            yield obligation
+
+    async def iter_obligations_business(
+        self,
+        egn: str,
+        govt_id: str,
+        bulstat: str,
+        external_httpx_client: AsyncClient | None = None,
+        deadline: float | None = None
+    ) -> AsyncIterator[KatObligation]:
+        """
+        Yields the obligations/fines of a business entity one by one
 
         :param egn: EGN (National Identification Number)
         :param govt_id: National ID Number
         :param bulstat: Business BULSTAT
         :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
+        """
+
+        async for obligation in self.iter_obligations(
+                KatIdentity.business(egn, govt_id, bulstat), external_httpx_client, deadline):
+            yield obligation
+
+    async def __run_many(
+        self,
+        identities: Iterable[KatIdentity],
+        concurrency: int | None,
+        check: Callable[[KatIdentity], Awaitable[_T]]
+    ) -> AsyncIterator[_T]:
+        """
+        Runs `check` for many identities concurrently, yielding results as they complete
+
+        Identities are consumed lazily, so at most `concurrency` checks are in flight.
+        """
+
+        if concurrency is None:
+            # The adaptive limiter decides how many requests go out, up to its maximum
+            if self.__concurrency_limiter is not None:
+                concurrency = self.__concurrency_limiter.max_limit
+            else:
+                concurrency = _DEFAULT_BATCH_CONCURRENCY
+
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        queue = iter(identities)
+        pending: set[asyncio.Task] = set()
+
+        try:
+            while True:
+                while len(pending) < concurrency:
+                    identity = next(queue, None)
+                    if identity is None:
+                        break
+
+                    pending.add(asyncio.create_task(check(identity)))
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def __get_batch_result(
+        self, identity: KatIdentity, external_httpx_client: AsyncClient | None, expires: float | None
+    ) -> KatBatchResult:
+        """Checks a single identity of a batch, capturing the error if any."""
+
+        try:
+            obligations = self.__parse_obligations(
+                identity, await self.__get_payload(identity, external_httpx_client, expires))
+        except KatError as err:
+            return KatBatchResult(identity, error=err)
+
+        return KatBatchResult(identity, obligations=obligations)
+
+    async def get_obligations_many(
+        self,
+        identities: Iterable[KatIdentity],
+        concurrency: int | None = None,
+        external_httpx_client: AsyncClient | None = None,
+        deadline: float | None = None
+    ) -> AsyncIterator[KatBatchResult]:
+        """
+        Checks many identities concurrently, yielding results as they complete
+
+        Identities are consumed lazily, so at most `concurrency` lookups are in flight
+        at any time. Errors are reported per identity in `KatBatchResult.error`.
+
+        :param identities: Identities to check
+        :param concurrency: Maximum number of lookups in flight (default 10, or the maximum of the concurrency limiter)
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the whole batch may take, lookups still running after it
+            fail with API_TIMEOUT (optional)
+        """
+
+        expires = _deadline_at(deadline)
+
+        async for result in self.__run_many(
+                identities, concurrency,
+                lambda identity: self.__get_batch_result(identity, external_httpx_client, expires)):
+            yield result
+
+    async def __get_batch_payload(
+        self, identity: KatIdentity, external_httpx_client: AsyncClient | None, expires: float | None
+    ) -> tuple[KatIdentity, dict | KatError]:
+        """Gets the payload of a single identity of a batch, or the error if any."""
+
+        try:
+            return identity, await self.__get_payload(identity, external_httpx_client, expires)
+        except KatError as err:
+            return identity, err
+
+    async def iter_obligations_many(
+        self,
+        identities: Iterable[KatIdentity],
+        concurrency: int | None = None,
+        external_httpx_client: AsyncClient | None = None,
+        deadline: float | None = None
+    ) -> AsyncIterator[tuple[KatIdentity, KatObligation | KatError]]:
+        """
+        Checks many identities concurrently, yielding obligations one by one
+
+        Yields `(identity, obligation)` for every obligation as soon as the lookup of
+        its identity completes, or `(identity, error)` once for a failed lookup.
+        Identities without obligations yield nothing.
+
+        :param identities: Identities to check
+        :param concurrency: Maximum number of lookups in flight (default 10, or the maximum of the concurrency limiter)
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the whole batch may take, lookups still running after it
+            fail with API_TIMEOUT (optional)
         """
 
-        self.__validate_credentials_business(
-            egn, govt_id, bulstat)
+        expires = _deadline_at(deadline)
 
-        url = _URL_BUSINESS.format(
-            egn=egn, identifier=govt_id, bulstat=bulstat)
+        async for identity, data in self.__run_many(
+                identities, concurrency,
+                lambda identity: self.__get_batch_payload(identity, external_httpx_client, expires)):
+            if isinstance(data, KatError):
+                yield identity, data
+                continue
 
-        return await self.__get_obligations_from_url(url, PersonalIdentificationType.NATIONAL_ID, govt_id, external_httpx_client)
+            for obligation in _iter_payload(data, self.__lazy_parsing):
+                yield identity, obligation
@@ -0,0 +1,427 @@
+"""Synchronous obligations module"""
+
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from json import JSONDecodeError
+import threading
+import time
+import httpx
+from httpx import Client
+
+from .cache import KatCache
+from .circuit_breaker import KatCircuitBreaker
+from .errors import KatError
+from .helpers import ByteMarkerScanner
+from .instrumentation import KatLookupEvent, KatObserver, KatParseEvent, _notify
+from .query import build_query
+from .rate_limiter import KatRateLimiter
+from .retry import KatRetryPolicy
+from .data_models import (
+    KatBatchResult,
+    KatIdentity,
+    KatObligation,
+    KatObligationSummary,
+    KatObligationView
+)
+from .kat_api_client import (
+    _DEFAULT_BATCH_CONCURRENCY,
+    _DEFAULT_KEEPALIVE_EXPIRY,
+    _DEFAULT_MAX_CONNECTIONS,
+    _DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    _MAX_HTML_SCAN_BYTES,
+    _REQUEST_TIMEOUT,
+    _RequestAttempt,
+    _TOO_MANY_REQUESTS_MARKER,
+    _check_response,
+    _deadline_at,
+    _decode_payload,
+    _get_retry_delay,
+    _html_response_error,
+    _iter_payload,
+    _transport_error,
+    _validate_and_cache,
+    _validate_response
+)
+
+
+class KatApiClientSync:
+    """Synchronous KAT API manager, for scripts and threaded applications"""
+
+    def __init__(
+        self,
+        max_connections: int = _DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = _DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = _DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+        transport: httpx.BaseTransport | None = None,
+        timeout: float | httpx.Timeout = _REQUEST_TIMEOUT,
+        rate_limiter: KatRateLimiter | None = None,
+        retry_policy: KatRetryPolicy | None = None,
+        cache: KatCache | None = None,
+        circuit_breaker: KatCircuitBreaker | None = None,
+        lazy_parsing: bool = False,
+        observers: Iterable[KatObserver] | None = None,
+        strict_validation: bool = False
+    ) -> None:
+        """
+        Initialize API client.
+
+        The client owns a pooled httpx.Client which is created on first use and
+        shared by every lookup, including the worker threads of `get_obligations_many`.
+        Close it with `close()` or use the client as a context manager.
+
+        :param max_connections: Maximum number of concurrent connections in the pool
+        :param max_keepalive_connections: Maximum number of idle connections kept alive
+        :param keepalive_expiry: Seconds an idle connection is kept alive
+        :param http2: Enable HTTP/2 (requires the `http2` extra - `pip install kat_bulgaria[http2]`)
+        :param transport: Custom httpx transport for the pooled client, e.g. a local stand-in server
+            (optional, replaces the pool limits)
+        :param timeout: Seconds, or an httpx.Timeout with separate connect/read/write/pool timeouts
+        :param rate_limiter: Rate limiter shared by all requests of this client (optional)
+        :param retry_policy: Retry policy for transient API errors (optional, no retries by default)
+        :param cache: Cache for lookup results, e.g. KatMemoryCache or KatSqliteCache (optional)
+        :param circuit_breaker: Circuit breaker failing lookups fast with API_CIRCUIT_OPEN
+            while the API is down (optional)
+        :param lazy_parsing: Return KatObligationView objects which parse fields only when accessed
+        :param observers: Instrumentation observers notified of every request, lookup and parse (optional)
+        :param strict_validation: Also reject EGNs and BULSTATs with a wrong checksum or birth date before any request
+        """
+
+        self.__limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry)
+        self.__http2 = http2
+        self.__transport = transport
+        self.__timeout = httpx.Timeout(timeout)
+        self.__client: Client | None = None
+        self.__client_lock = threading.Lock()
+        self.__rate_limiter = rate_limiter
+        self.__retry_policy = retry_policy
+        self.__cache = cache
+        self.__circuit_breaker = circuit_breaker
+        self.__lazy_parsing = lazy_parsing
+        self.__observers = tuple(observers or ())
+        self.__strict_validation = strict_validation
+
+    def __enter__(self) -> "KatApiClientSync":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled HTTP client and release its connections."""
+
+        with self.__client_lock:
+            client = self.__client
+            self.__client = None
+
+        if client is not None:
+            client.close()
+
+    def __get_client(self) -> Client:
+        """Get the pooled HTTP client, creating it on first use."""
+
+        with self.__client_lock:
+            if self.__client is None or self.__client.is_closed:
+                self.__client = httpx.Client(
+                    limits=self.__limits,
+                    http2=self.__http2,
+                    transport=self.__transport,
+                    timeout=self.__timeout)
+
+            return self.__client
+
+    def __scan_too_many_requests_page(self, resp: httpx.Response) -> bool:
+        """Scans a streamed HTML response for the "too many requests" marker."""
+
+        scanner = ByteMarkerScanner(_TOO_MANY_REQUESTS_MARKER)
+
+        for chunk in resp.iter_bytes():
+            if scanner.feed(chunk):
+                return True
+
+            if scanner.scanned >= _MAX_HTML_SCAN_BYTES:
+                break
+
+        return False
+
+    def __get_payload(
+        self,
+        identity: KatIdentity,
+        external_httpx_client: Client | None = None,
+        expires: float | None = None
+    ) -> dict:
+        """
+        Validates the identity and gets its validated API payload through the cache
+
+        :param identity: Identity to check
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param expires: Monotonic time of the lookup deadline (optional)
+        """
+
+        started = time.perf_counter()
+        cache_hit = False
+        outcome = None
+
+        try:
+            query = build_query(identity, self.__strict_validation)
+
+            cache_key = query.key if self.__cache is not None else None
+
+            if cache_key is not None:
+                data = self.__cache.get(cache_key)
+                if data is not None:
+                    cache_hit = True
+                    _validate_response(data)
+                    return data
+
+            return self.__request_with_retry(query.url, identity, external_httpx_client, cache_key, expires)
+
+        except KatError as err:
+            outcome = err.error_subtype
+            raise
+
+        finally:
+            if self.__observers:
+                _notify(self.__observers, "on_lookup", KatLookupEvent(
+                    identity, outcome, cache_hit, time.perf_counter() - started))
+
+    def __request_with_retry(
+        self,
+        url: httpx.URL,
+        identity: KatIdentity,
+        external_httpx_client: Client | None = None,
+        cache_key: str | None = None,
+        expires: float | None = None
+    ) -> dict:
+        """Gets the validated API payload from URL, retrying transient errors until the deadline"""
+
+        policy = self.__retry_policy
+
+        if policy is None:
+            return self.__request_payload(url, identity, external_httpx_client, cache_key, expires=expires)
+
+        started = time.monotonic()
+        attempt = 1
+
+        while True:
+            try:
+                return self.__request_payload(url, identity, external_httpx_client, cache_key, attempt, expires)
+            except KatError as err:
+                delay = _get_retry_delay(policy, err, attempt, started, expires)
+                if delay is None:
+                    raise
+
+                time.sleep(delay)
+                attempt += 1
+
+    def __request_payload(
+        self,
+        url: httpx.URL,
+        identity: KatIdentity,
+        external_httpx_client: Client | None = None,
+        cache_key: str | None = None,
+        attempt: int = 1,
+        expires: float | None = None
+    ) -> dict:
+        """
+        Gets the validated API payload from URL - single attempt
+
+        Each phase timeout is capped by the time left until the deadline, a response
+        trickling in slower than that can still run over it.
+
+        :param url: URL to fetch the data from
+        :param identity: Identity the URL was built for
+        :param cache_key: Key to cache the response under (optional)
+        :param attempt: Number of this attempt, starting from 1
+        :param expires: Monotonic time of the lookup deadline (optional)
+        """
+
+        client = external_httpx_client or self.__get_client()
+        request = _RequestAttempt(
+            identity, attempt, expires, self.__timeout,
+            self.__circuit_breaker, self.__rate_limiter, self.__observers)
+
+        try:
+            if self.__rate_limiter is not None:
+                self.__rate_limiter.acquire_sync()
+
+            try:
+                with client.stream("GET", url, **request.stream_options(asynchronous=False)) as resp:
+                    request.on_headers(resp)
+
+                    if _check_response(resp, identity):
+                        raise _html_response_error(resp, self.__scan_too_many_requests_page(resp), identity)
+
+                    body = resp.read()
+                    request.on_body()
+
+                    data = _decode_payload(body)
+                    request.on_decoded()
+
+            except (httpx.HTTPError, JSONDecodeError) as ex:
+                raise _transport_error(ex, identity) from ex
+
+            request.on_success()
+            _validate_and_cache(data, self.__cache, cache_key)
+
+        except KatError as err:
+            request.on_error(err)
+            raise
+
+        finally:
+            request.finish()
+
+        return data
+
+    def __parse_obligations(
+        self, identity: KatIdentity, data: dict
+    ) -> list[KatObligation] | list[KatObligationView]:
+        """Parses a validated API payload into a flat list of obligations."""
+
+        if not self.__observers:
+            return list(_iter_payload(data, self.__lazy_parsing))
+
+        started = time.perf_counter()
+        obligations = list(_iter_payload(data, self.__lazy_parsing))
+        _notify(self.__observers, "on_parse", KatParseEvent(
+            identity, len(obligations), time.perf_counter() - started))
+
+        return obligations
+
+    def get_obligations_individual(
+        self,
+        egn: str,
+        identifier_type: str,
+        identifier: str,
+        external_httpx_client: Client | None = None,
+        deadline: float | None = None
+    ) -> list[KatObligation]:
+        """
+        Gets a list of obligations/fines for an individual
+
+        :param egn: EGN (National Identification Number)
+        :param identifier_type: PersonalIdentificationType.NATIONAL_ID, PersonalIdentificationType.DRIVING_LICENSE
+            or PersonalIdentificationType.CAR_PLATE_NUM
+        :param identifier: Number of identification card (National ID or Driving License) or Car Plate Number
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
+        """
+
+        return self.get_obligations(
+            KatIdentity.individual(egn, identifier_type, identifier), external_httpx_client, deadline)
+
+    def get_obligations_business(
+        self,
+        egn: str,
+        govt_id: str,
+        bulstat: str,
+        external_httpx_client: Client | None = None,
+        deadline: float | None = None
+    ) -> list[KatObligation]:
+        """
+        Gets a list of obligations/fines for a business entity
+
+        :param egn: EGN (National Identification Number)
+        :param govt_id: National ID Number
+        :param bulstat: Business BULSTAT
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
+        """
+
+        return self.get_obligations(
+            KatIdentity.business(egn, govt_id, bulstat), external_httpx_client, deadline)
+
+    def get_obligations(
+        self, identity: KatIdentity, external_httpx_client: Client | None = None, deadline: float | None = None
+    ) -> list[KatObligation]:
+        """
+        Gets a list of obligations/fines for an individual or a business
+
+        :param identity: Identity to check
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
+        """
+
+        return self.__parse_obligations(
+            identity, self.__get_payload(identity, external_httpx_client, _deadline_at(deadline)))
+
+    def get_obligations_summary(
+        self, identity: KatIdentity, external_httpx_client: Client | None = None, deadline: float | None = None
+    ) -> KatObligationSummary:
+        """
+        Gets the count and total amount of obligations without building obligation objects
+
+        :param identity: Identity to check
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the lookup may take in total, including retries (optional)
+        """
+
+        return KatObligationSummary.from_payload(
+            self.__get_payload(identity, external_httpx_client, _deadline_at(deadline)))
+
+    def __get_batch_result(
+        self, identity: KatIdentity, external_httpx_client: Client | None, expires: float | None
+    ) -> KatBatchResult:
+        """Runs a single lookup of a batch, capturing its error if any."""
+
+        try:
+            obligations = self.__parse_obligations(
+                identity, self.__get_payload(identity, external_httpx_client, expires))
+        except KatError as err:
+            return KatBatchResult(identity, error=err)
+
+        return KatBatchResult(identity, obligations=obligations)
+
+    def get_obligations_many(
+        self,
+        identities: Iterable[KatIdentity],
+        max_workers: int = _DEFAULT_BATCH_CONCURRENCY,
+        external_httpx_client: Client | None = None,
+        deadline: float | None = None
+    ) -> Iterator[KatBatchResult]:
+        """
+        Checks many identities on a thread pool, yielding results as they complete
+
+        Identities are consumed lazily, so at most `max_workers` lookups are in flight
+        at any time. Errors are reported per identity in `KatBatchResult.error`.
+
+        :param identities: Identities to check
+        :param max_workers: Maximum number of lookups in flight
+        :param external_httpx_client: Externally created httpx client (optional)
+        :param deadline: Seconds the whole batch may take, lookups still running after it
+            fail with API_TIMEOUT (optional)
+        """
+
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        expires = _deadline_at(deadline)
+        queue = iter(identities)
+        pending: set[Future[KatBatchResult]] = set()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        def submit() -> bool:
+            identity = next(queue, None)
+            if identity is None:
+                return False
+
+            pending.add(executor.submit(self.__get_batch_result, identity, external_httpx_client, expires))
+            return True
+
+        try:
+            while len(pending) < max_workers and submit():
+                pass
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    pending.discard(future)
+                    submit()
+                    yield future.result()
+        finally:
+            # Stop queued lookups when the caller stops iterating early
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,96 @@
+"""Query building"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import httpx
+
+from .data_models import KatIdentity, PersonalIdentificationType
+from .validation import validate_identity
+
+_API_URL = httpx.URL("https://e-uslugi.mvr.bg/api/Obligations/AND")
+
+# Memoised queries per (identity, checksums), enough for a large batch
+_QUERY_CACHE_SIZE = 65_536
+
+_PERSON_INDIVIDUAL = 1
+_PERSON_BUSINESS = 2
+
+# additinalDataForObligatedPersonType and the name of the document parameter per identifier type
+_INDIVIDUAL_DOCUMENTS = {
+    PersonalIdentificationType.DRIVING_LICENSE: (1, "drivingLicenceNumber"),
+    PersonalIdentificationType.NATIONAL_ID: (2, "personalDocumentNumber"),
+    PersonalIdentificationType.CAR_PLATE_NUM: (3, "foreignVehicleNumber"),
+}
+_BUSINESS_DOCUMENT = (1, "personalDocumentNumber")
+
+
+@dataclass(frozen=True, slots=True)
+class KatQuery:
+    """
+    A validated and normalized API query. Immutable and hashable.
+
+    Equal identities which differ only in formatting (e.g. a plate in Cyrillic
+    and in Latin letters) give equal queries with equal keys.
+    """
+
+    egn: str
+    identifier_type: str
+    identifier: str
+    bulstat: str | None = None
+    url: httpx.URL = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.bulstat is not None:
+            person_type, (document_type, document_param) = _PERSON_BUSINESS, _BUSINESS_DOCUMENT
+        else:
+            person_type = _PERSON_INDIVIDUAL
+            document_type, document_param = _INDIVIDUAL_DOCUMENTS[self.identifier_type]
+
+        params = {
+            "obligatedPersonType": person_type,
+            "additinalDataForObligatedPersonType": document_type,
+            "mode": 1,
+            "obligedPersonIdent": self.egn,
+            document_param: self.identifier,
+        }
+
+        if self.bulstat is not None:
+            params["uic"] = self.bulstat
+
+        # Frozen dataclass - fields can only be set through object.__setattr__
+        object.__setattr__(self, "url", _API_URL.copy_merge_params(params))
+
+    @property
+    def is_business(self) -> bool:
+        """Is this a business query."""
+
+        return self.bulstat is not None
+
+    @property
+    def key(self) -> str:
+        """Key of this query for caching and deduplication, the same as `KatIdentity.key` of the normalized identity."""
+
+        return "|".join((
+            "business" if self.is_business else "individual",
+            self.egn,
+            self.identifier_type,
+            self.identifier,
+            self.bulstat or "",
+        ))
+
+
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
+def build_query(identity: KatIdentity, checksums: bool = False) -> KatQuery:
+    """
+    Validates an identity and builds its query, raises KatError if invalid
+
+    Queries are memoised, so building the same identity again is a dict lookup.
+
+    :param identity: Identity to check
+    :param checksums: Also check the EGN and BULSTAT checksums and the EGN birth date
+    """
+
+    normalized = validate_identity(identity, checksums)
+
+    return KatQuery(normalized.egn, normalized.identifier_type, normalized.identifier, normalized.bulstat)
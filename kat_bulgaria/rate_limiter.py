@@ -0,0 +1,202 @@
+"""Client-side rate limiting"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from typing import Any
+
+_DEFAULT_RATE = 2.0
+_DEFAULT_BURST = 5
+_DEFAULT_MIN_RATE = 0.1
+_DEFAULT_BACKOFF_FACTOR = 0.5
+_DEFAULT_RECOVERY_STEP = 0.05
+_DEFAULT_COOLDOWN = 5.0
+
+
+class KatRateLimiter:
+    """
+    Adaptive token bucket shared by all requests of a client.
+
+    Requests take one token each; tokens refill at `rate` per second up to `burst`.
+    When KAT answers with "too many requests" the rate is cut by `backoff_factor`
+    and every request waits out a `cooldown`. Each successful request then adds
+    `recovery_step` back to the rate, up to the configured maximum.
+    """
+
+    def __init__(
+        self,
+        rate: float = _DEFAULT_RATE,
+        burst: int = _DEFAULT_BURST,
+        min_rate: float = _DEFAULT_MIN_RATE,
+        backoff_factor: float = _DEFAULT_BACKOFF_FACTOR,
+        recovery_step: float = _DEFAULT_RECOVERY_STEP,
+        cooldown: float = _DEFAULT_COOLDOWN
+    ) -> None:
+        """
+        Initialize the rate limiter.
+
+        :param rate: Maximum requests per second
+        :param burst: Maximum number of requests sent back to back
+        :param min_rate: The rate is never cut below this value
+        :param backoff_factor: Multiplier applied to the rate on "too many requests"
+        :param recovery_step: Requests per second added back on each success
+        :param cooldown: Seconds to pause all requests after "too many requests"
+        """
+
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self.cooldown = cooldown
+
+        self.__rate = rate
+        self.__tokens = float(burst)
+        self.__updated_at = time.monotonic()
+        self.__throttled_at: float | None = None
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Current requests per second."""
+
+        return self.__rate
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accumulated since the last update."""
+
+        elapsed = max(now - self.__updated_at, 0)
+        self.__tokens = min(self.burst, self.__tokens + elapsed * self.__rate)
+        self.__updated_at = now
+
+    def _reserve(self, now: float) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+
+        self._refill(now)
+        self.__tokens -= 1
+
+        if self.__tokens >= 0:
+            return 0.0
+
+        return -self.__tokens / self.__rate
+
+    def _throttled(self, now: float) -> None:
+        """Cut the rate and pause all requests for the cooldown."""
+
+        # Requests in flight are likely to be throttled together - react only once.
+        if self.__throttled_at is not None and now - self.__throttled_at < self.cooldown:
+            return
+
+        self.__throttled_at = now
+        self._refill(now)
+        self.__rate = max(self.min_rate, self.__rate * self.backoff_factor)
+        self.__tokens = min(self.__tokens, 0) - self.cooldown * self.__rate
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+
+        with self.__lock:
+            delay = self._reserve(time.monotonic())
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self) -> None:
+        """Block the calling thread until a request may be sent."""
+
+        with self.__lock:
+            delay = self._reserve(time.monotonic())
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_throttled(self) -> None:
+        """Report a "too many requests" response."""
+
+        with self.__lock:
+            self._throttled(time.monotonic())
+
+    def on_success(self) -> None:
+        """Report a response which was not throttled."""
+
+        with self.__lock:
+            self._refill(time.monotonic())
+            self.__rate = min(self.max_rate, self.__rate + self.recovery_step)
+
+
+class KatSharedRateLimiter:
+    """
+    GCRA rate limit shared by several processes, e.g. the workers of a sweep.
+
+    The theoretical arrival time of the next request is kept in shared memory,
+    so all processes together send at most `rate` requests per second, in bursts
+    of up to `burst`. A "too many requests" response pauses every process for
+    `cooldown` seconds. Has the same interface as KatRateLimiter - create it in
+    the parent process and pass it to the `rate_limiter` of each client.
+    """
+
+    def __init__(
+        self,
+        rate: float = _DEFAULT_RATE,
+        burst: int = _DEFAULT_BURST,
+        cooldown: float = _DEFAULT_COOLDOWN,
+        context: Any = None
+    ) -> None:
+        """
+        Initialize the rate limiter.
+
+        :param rate: Maximum requests per second across all processes
+        :param burst: Maximum number of requests sent back to back
+        :param cooldown: Seconds to pause all processes after "too many requests"
+        :param context: multiprocessing context the worker processes are started with (optional)
+        """
+
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self.cooldown = cooldown
+
+        self.__interval = 1 / rate
+        # Wall clock time - the monotonic clock is not comparable across processes everywhere
+        self.__arrival = (context or multiprocessing).Value("d", 0.0)
+
+    def _reserve(self) -> float:
+        """Take the next slot and return how many seconds to wait before using it."""
+
+        with self.__arrival.get_lock():
+            now = time.time()
+            arrival = max(self.__arrival.value, now)
+            self.__arrival.value = arrival + self.__interval
+
+        return max(arrival - now - (self.burst - 1) * self.__interval, 0.0)
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self) -> None:
+        """Block the calling thread until a request may be sent."""
+
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_throttled(self) -> None:
+        """Report a "too many requests" response."""
+
+        with self.__arrival.get_lock():
+            # Past the burst allowance too, so no request goes out before the cooldown ends
+            pause_until = time.time() + self.cooldown + (self.burst - 1) * self.__interval
+            self.__arrival.value = max(self.__arrival.value, pause_until)
+
+    def on_success(self) -> None:
+        """Report a response which was not throttled."""
@@ -0,0 +1,51 @@
+"""Retry policy"""
+
+from dataclasses import dataclass
+import random
+
+from .errors import KatError, KatErrorType, KatErrorSubtype
+
+_TRANSIENT_ERRORS = frozenset({
+    KatErrorSubtype.API_TIMEOUT,
+    KatErrorSubtype.API_ERROR_READING_DATA,
+    KatErrorSubtype.API_TOO_MANY_REQUESTS,
+})
+
+
+@dataclass
+class KatRetryPolicy:
+    """
+    Retry policy with exponential backoff and full jitter.
+
+    Only errors with a subtype in `retry_on` are retried. Validation errors are
+    never retried, as sending the same data again cannot succeed.
+    """
+
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_cap: float = 10.0
+    jitter: bool = True
+    retry_on: frozenset[KatErrorSubtype] = _TRANSIENT_ERRORS
+    deadline: float | None = None
+
+    def is_retryable(self, error: KatError) -> bool:
+        """Checks if the request which failed with this error may be retried."""
+
+        if error.error_type == KatErrorType.VALIDATION_ERROR:
+            return False
+
+        return error.error_subtype in self.retry_on
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before the next attempt
+
+        :param attempt: Number of the attempt that just failed, starting from 1
+        """
+
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+
+        if self.jitter:
+            return random.uniform(0, delay)
+
+        return delay
@@ -0,0 +1,219 @@
+"""Fleet polling scheduler"""
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import asdict
+import json
+import sqlite3
+import threading
+import time
+
+from .data_models import KatBatchResult, KatIdentity
+from .errors import KatErrorType
+from .kat_api_client import KatApiClient
+from .store import KatObligationDiff, KatObligationStore
+
+_DEFAULT_INTERVAL = 24 * 3600.0
+_DEFAULT_UNPAID_INTERVAL = 6 * 3600.0
+_DEFAULT_INVALID_INTERVAL = 7 * 24 * 3600.0
+_DEFAULT_RETRY_INTERVAL = 300.0
+_DEFAULT_BUDGET = 1000
+_DEFAULT_BUDGET_PERIOD = 24 * 3600.0
+_DEFAULT_POLL_INTERVAL = 60.0
+
+
+class KatPollingScheduler:
+    """
+    Polls a registry of identities, most stale first, within a request budget.
+
+    Each identity is rechecked every `interval` seconds, or every `unpaid_interval`
+    seconds while it has obligations. Both are divided by the identity's priority.
+    Failed lookups back off from `retry_interval`, identities KAT does not know are
+    rechecked after `invalid_interval`. At most `budget` lookups are sent per
+    `budget_period`. The registry, the schedule and the spent budget are kept in
+    SQLite, so a restarted scheduler continues where it stopped.
+    """
+
+    def __init__(
+        self,
+        client: KatApiClient,
+        path: str,
+        store: KatObligationStore | None = None,
+        on_change: Callable[[KatObligationDiff], None] | None = None,
+        interval: float = _DEFAULT_INTERVAL,
+        unpaid_interval: float = _DEFAULT_UNPAID_INTERVAL,
+        invalid_interval: float = _DEFAULT_INVALID_INTERVAL,
+        retry_interval: float = _DEFAULT_RETRY_INTERVAL,
+        budget: int = _DEFAULT_BUDGET,
+        budget_period: float = _DEFAULT_BUDGET_PERIOD,
+        concurrency: int | None = None
+    ) -> None:
+        """
+        Initialize the scheduler.
+
+        :param client: Client used for the lookups
+        :param path: Path to the SQLite database file with the schedule, created if missing
+        :param store: Obligation store updated with every successful lookup (optional)
+        :param on_change: Called with the difference when a lookup changed the stored obligations (optional)
+        :param interval: Seconds between checks of an identity without obligations
+        :param unpaid_interval: Seconds between checks of an identity with obligations
+        :param invalid_interval: Seconds between checks of an identity KAT does not know
+        :param retry_interval: Seconds before retrying a failed lookup, doubled on each failure
+        :param budget: Maximum number of lookups per budget period
+        :param budget_period: Seconds the budget applies to
+        :param concurrency: Maximum number of lookups in flight (optional, see `KatApiClient.get_obligations_many`)
+        """
+
+        self.client = client
+        self.store = store
+        self.on_change = on_change
+        self.interval = interval
+        self.unpaid_interval = unpaid_interval
+        self.invalid_interval = invalid_interval
+        self.retry_interval = retry_interval
+        self.budget = budget
+        self.budget_period = budget_period
+        self.concurrency = concurrency
+
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS kat_schedule ("
+            "identity_key TEXT PRIMARY KEY, identity TEXT NOT NULL, priority REAL NOT NULL, "
+            "next_check REAL NOT NULL, last_checked REAL, failures INTEGER NOT NULL DEFAULT 0)")
+        self.__db.execute(
+            "CREATE INDEX IF NOT EXISTS kat_schedule_next_check ON kat_schedule (next_check)")
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS kat_schedule_spent (checked_at REAL NOT NULL)")
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return self.__db.execute("SELECT COUNT(*) FROM kat_schedule").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+
+        with self.__lock:
+            self.__db.close()
+
+    def add(self, identity: KatIdentity, priority: float = 1.0) -> None:
+        """
+        Register an identity, due immediately; re-adding only updates the priority
+
+        :param identity: Identity to poll
+        :param priority: Relative polling frequency, 2 checks twice as often as 1
+        """
+
+        if priority <= 0:
+            raise ValueError("priority must be positive")
+
+        with self.__lock:
+            self.__db.execute(
+                "INSERT INTO kat_schedule (identity_key, identity, priority, next_check) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (identity_key) DO UPDATE SET priority = excluded.priority",
+                (identity.key, json.dumps(asdict(identity)), priority, time.time()))
+
+    def remove(self, identity: KatIdentity) -> None:
+        """Stop polling an identity."""
+
+        with self.__lock:
+            self.__db.execute("DELETE FROM kat_schedule WHERE identity_key = ?", (identity.key,))
+
+    def remaining_budget(self) -> int:
+        """Number of lookups which may be sent in the current budget period."""
+
+        with self.__lock:
+            return self.__remaining_budget(time.time())
+
+    def __remaining_budget(self, now: float) -> int:
+        self.__db.execute(
+            "DELETE FROM kat_schedule_spent WHERE checked_at <= ?", (now - self.budget_period,))
+        spent = self.__db.execute("SELECT COUNT(*) FROM kat_schedule_spent").fetchone()[0]
+
+        return max(self.budget - spent, 0)
+
+    def next_check(self) -> float | None:
+        """Time of the earliest scheduled check, None if the registry is empty."""
+
+        with self.__lock:
+            return self.__db.execute("SELECT MIN(next_check) FROM kat_schedule").fetchone()[0]
+
+    def __take_due(self, now: float) -> list[tuple[KatIdentity, float, int]]:
+        """Picks the due identities, most overdue first, and spends the budget on them."""
+
+        with self.__lock:
+            limit = self.__remaining_budget(now)
+            if limit == 0:
+                return []
+
+            rows = self.__db.execute(
+                "SELECT identity, priority, failures FROM kat_schedule WHERE next_check <= ? "
+                "ORDER BY next_check LIMIT ?", (now, limit)).fetchall()
+
+            self.__db.executemany(
+                "INSERT INTO kat_schedule_spent (checked_at) VALUES (?)", [(now,)] * len(rows))
+
+        return [(KatIdentity(**json.loads(identity)), priority, failures)
+                for identity, priority, failures in rows]
+
+    def __reschedule(self, result: KatBatchResult, priority: float, failures: int, now: float) -> None:
+        """Saves the outcome of a lookup and schedules the next one."""
+
+        err = result.error
+
+        if err is None:
+            interval = (self.unpaid_interval if result.obligations else self.interval) / priority
+            failures = 0
+        elif err.error_type == KatErrorType.VALIDATION_ERROR:
+            interval = self.invalid_interval
+            failures = 0
+        else:
+            failures += 1
+            interval = min(self.retry_interval * 2 ** (failures - 1), self.interval / priority)
+
+        with self.__lock:
+            self.__db.execute(
+                "UPDATE kat_schedule SET next_check = ?, last_checked = ?, failures = ? WHERE identity_key = ?",
+                (now + interval, now, failures, result.identity.key))
+
+    async def run_once(self) -> list[KatBatchResult]:
+        """Checks all identities which are due, within the remaining budget."""
+
+        due = self.__take_due(time.time())
+        if not due:
+            return []
+
+        schedule = {identity: (priority, failures) for identity, priority, failures in due}
+        results = []
+
+        async for result in self.client.get_obligations_many(schedule, self.concurrency):
+            self.__reschedule(result, *schedule[result.identity], time.time())
+
+            if result.error is None and self.store is not None:
+                diff = self.store.update(result.identity, result.obligations)
+                if diff and self.on_change is not None:
+                    self.on_change(diff)
+
+            results.append(result)
+
+        return results
+
+    async def run_forever(self, poll_interval: float = _DEFAULT_POLL_INTERVAL) -> None:
+        """
+        Checks due identities until cancelled
+
+        :param poll_interval: Maximum seconds to sleep between runs, so new identities are picked up
+        """
+
+        while True:
+            results = await self.run_once()
+
+            next_check = self.next_check()
+            if next_check is None or (not results and next_check <= time.time()):
+                # Empty registry or the budget is spent
+                delay = poll_interval
+            else:
+                delay = next_check - time.time()
+
+            await asyncio.sleep(min(max(delay, 0), poll_interval))
@@ -0,0 +1,71 @@
+"""Request coalescing"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call between concurrent callers with the same key.
+
+    The first caller starts the call, everyone arriving before it completes awaits
+    the same result or error. Cancelling one awaiter does not cancel the call,
+    it is cancelled once the last of its awaiters is gone.
+    """
+
+    def __init__(self) -> None:
+        self.__calls: dict[str, asyncio.Future] = {}
+        self.__waiters: dict[asyncio.Future, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.__calls)
+
+    async def run(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Run `func`, or join the call already running under `key`."""
+
+        call = self.__calls.get(key)
+
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self.__calls[key] = call
+            self.__waiters[call] = 0
+            call.add_done_callback(lambda done: self.__finish(key, done))
+
+        self.__waiters[call] += 1
+
+        try:
+            return await asyncio.shield(call)
+        finally:
+            self.__waiters[call] -= 1
+
+            if not self.__waiters[call]:
+                del self.__waiters[call]
+
+                # Nobody is waiting for the result any more
+                if not call.done():
+                    self.__forget(key, call)
+                    call.cancel()
+
+    def cancel(self) -> None:
+        """Cancel every call in flight, its awaiters get a CancelledError."""
+
+        calls = list(self.__calls.items())
+
+        for key, call in calls:
+            self.__forget(key, call)
+            call.cancel()
+
+    def __forget(self, key: str, call: asyncio.Future) -> None:
+        # A call being cancelled is not joined by new callers
+        if self.__calls.get(key) is call:
+            del self.__calls[key]
+
+    def __finish(self, key: str, call: asyncio.Future) -> None:
+        self.__forget(key, call)
+
+        # Mark the error as retrieved in case every awaiter was cancelled
+        if not call.cancelled():
+            call.exception()
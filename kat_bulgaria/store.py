@@ -0,0 +1,162 @@
+"""Persistent obligation store"""
+
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+import json
+import sqlite3
+import threading
+import time
+
+from .data_models import KatIdentity, KatObligation, KatObligationView
+from .helpers import json_loads
+
+
+def _store_keys(obligations: list[KatObligation]) -> dict[str, KatObligation]:
+    """
+    Obligations by their key in the store
+
+    The key is `KatObligation.key`. Obligations sharing it (e.g. several fines on
+    one document) add their `obligation_identifier`, and a counter in payload
+    order if that is shared too, so none of them is dropped.
+    """
+
+    shared = Counter(ob.key for ob in obligations)
+    keyed = {}
+
+    for ob in obligations:
+        key = ob.key
+        if shared[key] > 1:
+            key = f"{key}|{ob.obligation_identifier or ''}"
+
+        unique, n = key, 1
+        while unique in keyed:
+            n += 1
+            unique = f"{key}#{n}"
+
+        keyed[unique] = ob
+
+    return keyed
+
+
+@dataclass(slots=True)
+class KatObligationDiff:
+    """Changes of an identity's obligations since the previous snapshot."""
+
+    identity: KatIdentity
+    added: list[KatObligation] = field(default_factory=list)
+    removed: list[KatObligation] = field(default_factory=list)
+    changed: list[tuple[KatObligation, KatObligation]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class KatObligationStore:
+    """
+    On-disk SQLite store of the last known obligations of each identity.
+
+    Obligations are keyed on `KatObligation.key` (document series and number),
+    with the raw `obligation_identifier` added for obligations sharing a document. `update()` saves a fresh
+    lookup and returns only what was added, removed (e.g. paid) or changed since
+    the previous one, writing just those rows.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the store.
+
+        :param path: Path to the SQLite database file, created if missing
+        """
+
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS kat_obligations ("
+            "identity_key TEXT NOT NULL, obligation_key TEXT NOT NULL, obligation_identifier TEXT, "
+            "data TEXT NOT NULL, first_seen REAL NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (identity_key, obligation_key))")
+        self.__db.execute(
+            "CREATE INDEX IF NOT EXISTS kat_obligations_identifier ON kat_obligations (obligation_identifier)")
+
+    def close(self) -> None:
+        """Close the database connection."""
+
+        with self.__lock:
+            self.__db.close()
+
+    def get(self, identity: KatIdentity) -> list[KatObligation]:
+        """Last saved obligations of an identity."""
+
+        with self.__lock:
+            rows = self.__db.execute(
+                "SELECT data FROM kat_obligations WHERE identity_key = ? ORDER BY first_seen, rowid",
+                (identity.key,)).fetchall()
+
+        return [KatObligation.from_dict(json_loads(data)) for data, in rows]
+
+    def update(
+        self, identity: KatIdentity, obligations: Iterable[KatObligation | KatObligationView]
+    ) -> KatObligationDiff:
+        """
+        Replace the saved obligations of an identity and return the difference
+
+        :param identity: Identity the obligations were looked up for
+        :param obligations: Result of a successful lookup, e.g. `get_obligations()`
+        """
+
+        current = _store_keys([ob.materialize() if isinstance(ob, KatObligationView) else ob for ob in obligations])
+
+        diff = KatObligationDiff(identity)
+        now = time.time()
+
+        with self.__lock:
+            self.__db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.__db.execute(
+                    "SELECT obligation_key, data FROM kat_obligations WHERE identity_key = ?",
+                    (identity.key,)).fetchall()
+
+                previous = {key: KatObligation.from_dict(json_loads(data)) for key, data in rows}
+
+                upserts = []
+                for key, ob in current.items():
+                    old = previous.get(key)
+                    if old is None:
+                        diff.added.append(ob)
+                    elif old != ob:
+                        diff.changed.append((old, ob))
+                    else:
+                        continue
+
+                    upserts.append((identity.key, key, ob.obligation_identifier,
+                                    json.dumps(asdict(ob), ensure_ascii=False), now, now))
+
+                removed = [key for key in previous if key not in current]
+                diff.removed.extend(previous[key] for key in removed)
+
+                self.__db.executemany(
+                    "INSERT INTO kat_obligations "
+                    "(identity_key, obligation_key, obligation_identifier, data, first_seen, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (identity_key, obligation_key) DO UPDATE SET "
+                    "obligation_identifier = excluded.obligation_identifier, "
+                    "data = excluded.data, updated_at = excluded.updated_at",
+                    upserts)
+                self.__db.executemany(
+                    "DELETE FROM kat_obligations WHERE identity_key = ? AND obligation_key = ?",
+                    [(identity.key, key) for key in removed])
+
+                self.__db.execute("COMMIT")
+            except BaseException:
+                self.__db.execute("ROLLBACK")
+                raise
+
+        return diff
+
+    def delete(self, identity: KatIdentity) -> None:
+        """Forget the saved obligations of an identity."""
+
+        with self.__lock:
+            self.__db.execute("DELETE FROM kat_obligations WHERE identity_key = ?", (identity.key,))
@@ -0,0 +1,235 @@
+"""Offline validation of identities"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from datetime import date
+import re
+
+from .data_models import KatIdentity, PersonalIdentificationType
+from .errors import KatError, KatErrorType, KatErrorSubtype
+
+ERR_INVALID_EGN = "EGN is not valid."
+ERR_INVALID_LICENSE = "Driving License Number is not valid."
+ERR_INVALID_GOV_ID = "Government ID Number is not valid."
+ERR_INVALID_CAR_PLATE_NUM = "Car plate number is not valid."
+ERR_INVALID_BULSTAT = "BULSTAT is not valid."
+ERR_INVALID_IDENTIFIER_TYPE = "Identifier type is not valid."
+
+REGEX_EGN = r"^[0-9]{10}$"
+REGEX_DRIVING_LICENSE = r"^[0-9]{9}$"
+
+# ID Format Supports "123456789" and "AA1234567"
+REGEX_GOVT_ID = r"^(?:[0-9]{9}|[A-Z]{2}[0-9]{7})$"
+REGEX_BULSTAT = r"^[0-9]{9}$"
+REGEX_CAR_PLATE = r"^[A-Z0-9]+$"
+
+# Compiled once, matched with fullmatch so a trailing newline does not pass "$"
+_EGN = re.compile(REGEX_EGN)
+_DRIVING_LICENSE = re.compile(REGEX_DRIVING_LICENSE)
+_GOVT_ID = re.compile(REGEX_GOVT_ID)
+_BULSTAT = re.compile(REGEX_BULSTAT)
+_CAR_PLATE = re.compile(REGEX_CAR_PLATE)
+
+_EGN_WEIGHTS = (2, 4, 8, 5, 10, 9, 7, 3, 6)
+_BULSTAT_WEIGHTS = (1, 2, 3, 4, 5, 6, 7, 8)
+_BULSTAT_WEIGHTS_FALLBACK = (3, 4, 5, 6, 7, 8, 9, 10)
+
+# The month of an EGN is offset by 20 for births in the 1800s and by 40 for births in the 2000s
+_EGN_MONTH_OFFSETS = ((40, 2000), (20, 1800), (0, 1900))
+
+# Bulgarian plates only use the Cyrillic letters which look like Latin ones,
+# people type them in either alphabet and with spaces or dashes in between
+_PLATE_TRANSLATION = str.maketrans("АВЕКМНОРСТУХ", "ABEKMHOPCTYX", " -")
+
+
+@dataclass(slots=True)
+class KatValidationResult:
+    """Result of a single identity validation in a batch."""
+
+    identity: KatIdentity
+    normalized: KatIdentity | None = None
+    error: KatError | None = None
+
+
+def _checksum(digits: str, weights: tuple[int, ...]) -> int:
+    return sum(int(digit) * weight for digit, weight in zip(digits, weights)) % 11
+
+
+def egn_birth_date(egn: str) -> date | None:
+    """Birth date encoded in an EGN, None if the EGN does not contain a valid date."""
+
+    if not isinstance(egn, str) or _EGN.fullmatch(egn) is None:
+        return None
+
+    year, month, day = int(egn[0:2]), int(egn[2:4]), int(egn[4:6])
+
+    for offset, century in _EGN_MONTH_OFFSETS:
+        if month > offset:
+            try:
+                return date(century + year, month - offset, day)
+            except ValueError:
+                return None
+
+    return None
+
+
+def is_valid_egn(egn: str) -> bool:
+    """Checks the format, birth date and checksum of an EGN."""
+
+    if egn_birth_date(egn) is None:
+        return False
+
+    return _checksum(egn, _EGN_WEIGHTS) % 10 == int(egn[9])
+
+
+def is_valid_bulstat(bulstat: str) -> bool:
+    """Checks the format and checksum of a 9-digit BULSTAT (UIC)."""
+
+    if not isinstance(bulstat, str) or _BULSTAT.fullmatch(bulstat) is None:
+        return False
+
+    check = _checksum(bulstat, _BULSTAT_WEIGHTS)
+    if check == 10:
+        check = _checksum(bulstat, _BULSTAT_WEIGHTS_FALLBACK) % 10
+
+    return check == int(bulstat[8])
+
+
+def is_valid_gov_id(govt_id: str) -> bool:
+    """Checks the format of an ID card number."""
+
+    return isinstance(govt_id, str) and _GOVT_ID.fullmatch(govt_id) is not None
+
+
+def normalize_car_plate(car_plate: str) -> str:
+    """Upper-cases a plate, converts Cyrillic letters to the Latin look-alikes and strips spaces and dashes."""
+
+    return car_plate.upper().translate(_PLATE_TRANSLATION)
+
+
+def normalize_identity(identity: KatIdentity) -> KatIdentity:
+    """
+    Strips whitespace, upper-cases document numbers and normalizes car plates
+
+    Values which are not strings (e.g. a number read from a spreadsheet) are
+    left as they are and fail validation.
+    """
+
+    identifier = identity.identifier
+    if isinstance(identifier, str):
+        if identity.identifier_type == PersonalIdentificationType.CAR_PLATE_NUM:
+            identifier = normalize_car_plate(identifier)
+        else:
+            identifier = identifier.strip().upper()
+
+    normalized = replace(
+        identity,
+        egn=identity.egn.strip() if isinstance(identity.egn, str) else identity.egn,
+        identifier=identifier,
+        bulstat=identity.bulstat.strip() if isinstance(identity.bulstat, str) else identity.bulstat)
+
+    # Keep the original instance if nothing changed, it is the cheaper dict key
+    return identity if normalized == identity else normalized
+
+
+def _validation_error(subtype: KatErrorSubtype, message: str) -> KatError:
+    return KatError(KatErrorType.VALIDATION_ERROR, subtype, message)
+
+
+def _validate_egn(egn: str, checksums: bool) -> None:
+    if not isinstance(egn, str) or _EGN.fullmatch(egn) is None or (checksums and not is_valid_egn(egn)):
+        raise _validation_error(KatErrorSubtype.VALIDATION_EGN_INVALID, ERR_INVALID_EGN)
+
+
+def validate_individual(egn: str, identifier_type: str, identifier: str, checksums: bool = False) -> bool:
+    """
+    Validates the combination of EGN and identifier of an individual, raises KatError if invalid
+
+    :param egn: EGN of the person
+    :param identifier_type: PersonalIdentificationType
+    :param identifier: Driving License Number, Government ID Number or car plate number
+    :param checksums: Also check the EGN checksum and birth date
+    """
+
+    _validate_egn(egn, checksums)
+
+    if identifier_type == PersonalIdentificationType.NATIONAL_ID:
+        if not is_valid_gov_id(identifier):
+            raise _validation_error(KatErrorSubtype.VALIDATION_GOV_ID_NUMBER_INVALID, ERR_INVALID_GOV_ID)
+
+    elif identifier_type == PersonalIdentificationType.DRIVING_LICENSE:
+        if not isinstance(identifier, str) or _DRIVING_LICENSE.fullmatch(identifier) is None:
+            raise _validation_error(KatErrorSubtype.VALIDATION_DRIVING_LICENSE_INVALID, ERR_INVALID_LICENSE)
+
+    elif identifier_type == PersonalIdentificationType.CAR_PLATE_NUM:
+        if not isinstance(identifier, str) or _CAR_PLATE.fullmatch(identifier) is None:
+            raise _validation_error(KatErrorSubtype.VALIDATION_CAR_PLATE_NUMBER_INVALID, ERR_INVALID_CAR_PLATE_NUM)
+
+    else:
+        raise _validation_error(KatErrorSubtype.VALIDATION_IDENTIFIER_TYPE_INVALID, ERR_INVALID_IDENTIFIER_TYPE)
+
+    return True
+
+
+def validate_business(egn: str, govt_id_number: str, bulstat: str, checksums: bool = False) -> bool:
+    """
+    Validates the combination of EGN, Government ID Number and BULSTAT of a business, raises KatError if invalid
+
+    :param egn: EGN of the representative
+    :param govt_id_number: Government ID Number of the representative
+    :param bulstat: BULSTAT of the business
+    :param checksums: Also check the EGN and BULSTAT checksums and the EGN birth date
+    """
+
+    _validate_egn(egn, checksums)
+
+    if not is_valid_gov_id(govt_id_number):
+        raise _validation_error(KatErrorSubtype.VALIDATION_GOV_ID_NUMBER_INVALID, ERR_INVALID_GOV_ID)
+
+    if (not isinstance(bulstat, str) or _BULSTAT.fullmatch(bulstat) is None
+            or (checksums and not is_valid_bulstat(bulstat))):
+        raise _validation_error(KatErrorSubtype.VALIDATION_BULSTAT_INVALID, ERR_INVALID_BULSTAT)
+
+    return True
+
+
+def validate_identity(identity: KatIdentity, checksums: bool = True) -> KatIdentity:
+    """
+    Normalizes and validates an identity, raises KatError if invalid
+
+    Returns the normalized identity, which is what should be sent to the API.
+
+    :param identity: Identity to validate
+    :param checksums: Also check the EGN and BULSTAT checksums and the EGN birth date
+    """
+
+    normalized = normalize_identity(identity)
+
+    if normalized.is_business:
+        validate_business(normalized.egn, normalized.identifier, normalized.bulstat, checksums)
+    else:
+        validate_individual(normalized.egn, normalized.identifier_type, normalized.identifier, checksums)
+
+    return normalized
+
+
+def validate_identities(identities: Iterable[KatIdentity], checksums: bool = True) -> list[KatValidationResult]:
+    """
+    Validates many identities without any requests, e.g. before a batch lookup
+
+    Returns one result per identity, in order - with the normalized identity
+    or with the validation error.
+
+    :param identities: Identities to validate
+    :param checksums: Also check the EGN and BULSTAT checksums and the EGN birth date
+    """
+
+    results = []
+
+    for identity in identities:
+        try:
+            results.append(KatValidationResult(identity, validate_identity(identity, checksums)))
+        except KatError as err:
+            results.append(KatValidationResult(identity, error=err))
+
+    return results
@@ -10,9 +10,12 @@ from kat_bulgaria.errors import KatError, KatErrorType, KatErrorSubtype
 async def sample_code():
     """Validates credentials"""
 
+    # Един клиент за всички проверки - връзките към МВР се преизползват.
+    client = KatApiClient()
+
     try:
         # Проверка за физически лица - лична карта:
-        obligations = await KatApiClient().get_obligations_individual(
+        obligations = await client.get_obligations_individual(
             egn="валидно_егн",
             identifier_type=PersonalIdentificationType.NATIONAL_ID,
             identifier="номер_лична_карта"
@@ -21,7 +24,7 @@ async def sample_code():
         print(f"Raw JSON: {obligations}\n")
 
         # Проверка за физически лица -  шофьорска книжка:
-        obligations = await KatApiClient().get_obligations_individual(
+        obligations = await client.get_obligations_individual(
             egn="валидно_егн",
             identifier_type=PersonalIdentificationType.DRIVING_LICENSE,
             identifier="номер_шофьорска_книжка"
@@ -30,7 +33,7 @@ async def sample_code():
         print(f"Raw JSON: {obligations}\n")
 
         # Проверка за физически лица - номер на автомобил (латиница, без интервали):
-        obligations = await KatApiClient().get_obligations_individual(
+        obligations = await client.get_obligations_individual(
             egn="валидно_егн",
             identifier_type=PersonalIdentificationType.CAR_PLATE_NUM,
             identifier="номер_автомобил_латиница_без_интервали"
@@ -39,7 +42,7 @@ async def sample_code():
         print(f"Raw JSON: {obligations}\n")
 
         # Проверка за юридически лица - лична карта:
-        obligations = await KatApiClient().get_obligations_business(
+        obligations = await client.get_obligations_business(
             egn="валидно_егн",
             govt_id="номер_лична_карта",
             bulstat="валиден_булстат"
@@ -71,6 +74,7 @@ async def sample_code():
 
                 # KAT API is slow. Happens couple of times per day.
                 # Retry or wait for some time to pass.
+                # KatApiClient(retry_policy=KatRetryPolicy()) retries it automatically.
                 KatErrorSubtype.API_TIMEOUT,
 
                 # KAT API has pooped its pants and is unable to do anything.
@@ -88,5 +92,8 @@ async def sample_code():
             ):
                 print(f"Error Subtype: {err.error_subtype} \n")
 
+    finally:
+        await client.aclose()
+
 # Run the async function
 asyncio.run(sample_code())
@@ -0,0 +1,135 @@
+"""Cache tests."""
+
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.cache import KatCache, KatMemoryCache, KatSqliteCache
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorSubtype
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+
+from .conftest import EGN, LICENSE, GOV_ID, BULSTAT
+
+
+def test_identity_key_normalized() -> None:
+    """Cache - identity keys ignore surrounding whitespace and case."""
+
+    assert KatIdentity.individual(EGN, PersonalIdentificationType.NATIONAL_ID, " aa1234567 ").key \
+        == KatIdentity.individual(EGN, PersonalIdentificationType.NATIONAL_ID, GOV_ID).key
+    assert KatIdentity.business(EGN, GOV_ID, BULSTAT).key \
+        != KatIdentity.individual(EGN, PersonalIdentificationType.NATIONAL_ID, GOV_ID).key
+
+
+def test_memory_cache_ttl() -> None:
+    """Cache - memory entries expire after their TTL."""
+
+    cache = KatMemoryCache(ttl=10, negative_ttl=1)
+    cache.set("ok", {"a": 1})
+    cache.set("missing", {"b": 2}, negative=True)
+
+    now = time.time()
+    assert cache._get("ok", now + 5) == {"a": 1}
+    assert cache._get("missing", now + 5) is None
+    assert cache._get("ok", now + 11) is None
+    assert len(cache) == 0
+
+
+def test_memory_cache_lru_eviction() -> None:
+    """Cache - least recently used memory entries are evicted first."""
+
+    cache = KatMemoryCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_cache_backend_must_implement_storage() -> None:
+    """An incomplete cache backend fails when created."""
+
+    class _Incomplete(KatCache):
+        def _get(self, key, now):
+            return None
+
+    with pytest.raises(TypeError):
+        _Incomplete()
+
+
+def test_sqlite_cache_roundtrip_and_eviction(tmp_path) -> None:
+    """Cache - SQLite entries persist across instances and respect the size cap."""
+
+    path = str(tmp_path / "cache.db")
+
+    cache = KatSqliteCache(path, max_size=2)
+    cache.set("a", {"obligationsData": ["б"]})
+    cache.set("b", {"obligationsData": []})
+    cache.get("a")
+    cache.set("c", {"obligationsData": []})
+    cache.close()
+
+    cache = KatSqliteCache(path, max_size=2)
+    assert cache.get("a") == {"obligationsData": ["б"]}
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_client_cache_hit(
+    httpx_mock: HTTPXMock, ok_sample2_6fines: pytest.fixture
+) -> None:
+    """Cache - a repeated lookup is served from the cache."""
+
+    httpx_mock.add_response(json=ok_sample2_6fines)
+
+    async with KatApiClient(cache=KatMemoryCache()) as client:
+        resp1 = await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+        resp2 = await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert resp1 == resp2
+    assert len(resp2) == 6
+
+
+@pytest.mark.asyncio
+async def test_client_cache_negative(
+    httpx_mock: HTTPXMock, err_nodatafound: pytest.fixture
+) -> None:
+    """Cache - user not found is cached and raised again without a request."""
+
+    httpx_mock.add_response(json=err_nodatafound)
+
+    async with KatApiClient(cache=KatMemoryCache()) as client:
+        for _ in range(2):
+            with pytest.raises(KatError) as ctx:
+                await client.get_obligations_business(EGN, GOV_ID, BULSTAT)
+
+            assert ctx.value.error_subtype == KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE
+
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_cache_skips_api_errors(
+    httpx_mock: HTTPXMock, err_apidown: pytest.fixture
+) -> None:
+    """Cache - errorReadingData responses are not cached."""
+
+    httpx_mock.add_response(json=err_apidown, is_reusable=True)
+    cache = KatMemoryCache()
+
+    async with KatApiClient(cache=cache) as client:
+        for _ in range(2):
+            with pytest.raises(KatError):
+                await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert len(cache) == 0
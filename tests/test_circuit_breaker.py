@@ -0,0 +1,103 @@
+"""Circuit breaker tests."""
+
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.circuit_breaker import KatCircuitBreaker, KatCircuitState
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.errors import KatError, KatErrorSubtype
+from kat_bulgaria.kat_api_client import KatApiClient
+
+from .conftest import EGN
+
+
+def _fail(breaker: KatCircuitBreaker, times: int, outcome=KatErrorSubtype.API_TIMEOUT) -> None:
+    for _ in range(times):
+        breaker.record(breaker.try_acquire(), outcome)
+
+
+def test_breaker_opens_on_failure_rate() -> None:
+    """Circuit breaker - opens once enough recent requests failed."""
+
+    breaker = KatCircuitBreaker(failure_rate=0.5, window=10, min_requests=4)
+
+    _fail(breaker, 2, None)
+    _fail(breaker, 1)
+    _fail(breaker, 1, KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE)
+    assert breaker.state == KatCircuitState.CLOSED
+
+    _fail(breaker, 1)
+    assert breaker.state == KatCircuitState.CLOSED
+
+    _fail(breaker, 1, KatErrorSubtype.API_ERROR_READING_DATA)
+    assert breaker.state == KatCircuitState.OPEN
+    assert breaker.try_acquire() is None
+    assert breaker.retry_after() > 0
+
+
+def test_breaker_half_open_probe() -> None:
+    """Circuit breaker - lets one probe through after the timeout, closing on success."""
+
+    breaker = KatCircuitBreaker(min_requests=1, reset_timeout=0.01)
+    _fail(breaker, 1)
+
+    time.sleep(0.02)
+    assert breaker.state == KatCircuitState.HALF_OPEN
+
+    probe = breaker.try_acquire()
+    assert probe is not None
+    assert breaker.try_acquire() is None
+
+    breaker.record(probe, None)
+    assert breaker.state == KatCircuitState.CLOSED
+
+
+def test_breaker_half_open_failure_reopens() -> None:
+    """Circuit breaker - a failed probe opens the breaker again; stale requests are ignored."""
+
+    breaker = KatCircuitBreaker(min_requests=1, reset_timeout=0.01)
+    stale = breaker.try_acquire()
+    _fail(breaker, 1)
+
+    time.sleep(0.02)
+    probe = breaker.try_acquire()
+
+    breaker.record(stale, None)
+    assert breaker.state == KatCircuitState.HALF_OPEN
+
+    breaker.record(probe, KatErrorSubtype.API_TIMEOUT)
+    assert breaker.state == KatCircuitState.OPEN
+
+
+def test_breaker_cancelled_probe_frees_slot() -> None:
+    """Circuit breaker - a cancelled probe lets another probe through."""
+
+    breaker = KatCircuitBreaker(min_requests=1, reset_timeout=0.01)
+    _fail(breaker, 1)
+    time.sleep(0.02)
+
+    breaker.record(breaker.try_acquire(), completed=False)
+
+    assert breaker.try_acquire() is not None
+
+
+@pytest.mark.asyncio
+async def test_client_fails_fast_when_open(httpx_mock: HTTPXMock, err_apidown: pytest.fixture) -> None:
+    """Circuit breaker - lookups fail with API_CIRCUIT_OPEN without sending requests."""
+
+    httpx_mock.add_response(json=err_apidown, is_reusable=True)
+
+    breaker = KatCircuitBreaker(min_requests=3, reset_timeout=60)
+    subtypes = []
+
+    async with KatApiClient(circuit_breaker=breaker) as client:
+        for i in range(5):
+            identity = KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, f"{i:09d}")
+            with pytest.raises(KatError) as ctx:
+                await client.get_obligations(identity)
+            subtypes.append(ctx.value.error_subtype)
+
+    assert subtypes == [KatErrorSubtype.API_ERROR_READING_DATA] * 3 + [KatErrorSubtype.API_CIRCUIT_OPEN] * 2
+    assert len(httpx_mock.get_requests()) == 3
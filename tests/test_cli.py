@@ -0,0 +1,188 @@
+"""Sweep command line tests."""
+
+import json
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.cli import main, read_checkpoint, read_identities, sweep
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.errors import KatErrorSubtype, KatErrorType
+from kat_bulgaria.rate_limiter import KatSharedRateLimiter
+
+from .conftest import EGN, LICENSE, GOV_ID, BULSTAT, INVALID_EGN
+
+_DRIVER = {"egn": EGN, "identifier_type": PersonalIdentificationType.DRIVING_LICENSE, "identifier": LICENSE}
+_BUSINESS = {"egn": EGN, "identifier_type": "", "identifier": GOV_ID, "bulstat": BULSTAT}
+_INVALID = {"egn": INVALID_EGN, "identifier_type": PersonalIdentificationType.DRIVING_LICENSE, "identifier": LICENSE}
+
+
+def _write_jsonl(path, rows: list[dict]) -> str:
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+
+def _read_jsonl(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as lines:
+        return [json.loads(line) for line in lines]
+
+
+def test_read_identities_csv(tmp_path) -> None:
+    """CSV rows with a BULSTAT are businesses."""
+
+    path = tmp_path / "identities.csv"
+    path.write_text(
+        "egn,identifier_type,identifier,bulstat\n"
+        f"{EGN},{PersonalIdentificationType.DRIVING_LICENSE},{LICENSE},\n"
+        f"{EGN},,{GOV_ID},{BULSTAT}\n", encoding="utf-8")
+
+    assert list(read_identities(str(path))) == [
+        KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE),
+        KatIdentity.business(EGN, GOV_ID, BULSTAT),
+    ]
+
+
+def test_read_identities_jsonl(tmp_path) -> None:
+    """JSONL rows, blank lines are skipped."""
+
+    path = _write_jsonl(tmp_path / "identities.jsonl", [_DRIVER, _BUSINESS])
+
+    assert list(read_identities(path)) == [
+        KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE),
+        KatIdentity.business(EGN, GOV_ID, BULSTAT),
+    ]
+
+
+def test_read_identities_bad_rows(tmp_path, caplog: pytest.LogCaptureFixture) -> None:
+    """Values are read as text, missing ones are empty, lines which are not JSON objects are skipped."""
+
+    path = tmp_path / "identities.jsonl"
+    path.write_text(
+        json.dumps({"egn": 9011223344, "identifier_type": None, "identifier": 123456789}) + "\n"
+        + json.dumps({"egn": EGN, "identifier": LICENSE}) + "\n"
+        + "[1, 2]\n"
+        + '{"egn": "cut\n', encoding="utf-8")
+
+    assert list(read_identities(str(path))) == [
+        KatIdentity.individual("9011223344", "", "123456789"),
+        KatIdentity.individual(EGN, "", LICENSE),
+    ]
+    assert "line 3" in caplog.text and "line 4" in caplog.text
+
+
+def test_read_checkpoint(tmp_path) -> None:
+    """Successes and validation errors are done, API errors and cut lines are not."""
+
+    path = tmp_path / "results.jsonl"
+    path.write_text(
+        json.dumps({"key": "ok", "error": None}) + "\n"
+        + json.dumps({"key": "invalid", "error": {"type": "validation_failed"}}) + "\n"
+        + json.dumps({"key": "retried", "error": None}) + "\n"
+        + json.dumps({"key": "retried", "error": {"type": "api_error"}}) + "\n"
+        + json.dumps({"key": "down", "error": {"type": "api_error"}}) + "\n"
+        + '{"key": "cut', encoding="utf-8")
+
+    assert read_checkpoint(str(path)) == {"ok", "invalid"}
+    assert read_checkpoint(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_shared_rate_limiter_burst() -> None:
+    """A burst goes out at once, the next request waits for the rate."""
+
+    limiter = KatSharedRateLimiter(rate=10, burst=2)
+
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire_sync()
+
+    assert 0.08 <= time.monotonic() - started < 0.5
+
+
+def test_shared_rate_limiter_throttled() -> None:
+    """A "too many requests" response pauses every request for the cooldown."""
+
+    limiter = KatSharedRateLimiter(rate=100, burst=5, cooldown=0.1)
+    limiter.on_throttled()
+
+    started = time.monotonic()
+    limiter.acquire_sync()
+
+    assert time.monotonic() - started >= 0.09
+
+
+def test_sweep_resumes(tmp_path, httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """Results are appended, a second run skips the identities already checked."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    input_path = _write_jsonl(tmp_path / "identities.jsonl", [_DRIVER, _INVALID])
+    results_path = str(tmp_path / "results.jsonl")
+
+    summary = sweep(input_path, results_path, workers=1, rate=100)
+
+    assert (summary.checked, summary.failed, summary.skipped) == (2, 1, 0)
+
+    records = {record["identity"]["egn"]: record for record in _read_jsonl(results_path)}
+
+    assert records[EGN]["obligations"] == []
+    assert records[INVALID_EGN]["error"]["subtype"] == KatErrorSubtype.VALIDATION_EGN_INVALID.value
+
+    summary = sweep(input_path, results_path, workers=1, rate=100)
+
+    assert (summary.checked, summary.skipped) == (0, 2)
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_sweep_reports_bad_rows(tmp_path, httpx_mock: HTTPXMock) -> None:
+    """Rows with missing or non-text values get a validation error in the results file."""
+
+    rows = [{"egn": 9011223344, "identifier": LICENSE}, {"egn": EGN, "identifier_type": "passport", "identifier": 1}]
+    input_path = _write_jsonl(tmp_path / "identities.jsonl", rows)
+    results_path = str(tmp_path / "results.jsonl")
+
+    summary = sweep(input_path, results_path, workers=1, rate=100)
+
+    assert (summary.checked, summary.failed) == (2, 2)
+    assert all(record["error"]["type"] == KatErrorType.VALIDATION_ERROR.value for record in _read_jsonl(results_path))
+    assert not httpx_mock.get_requests()
+
+
+def test_sweep_ends_cut_line(tmp_path, httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """A line cut short by an interruption does not corrupt the next result."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    input_path = _write_jsonl(tmp_path / "identities.jsonl", [_DRIVER])
+    results_path = tmp_path / "results.jsonl"
+    results_path.write_text('{"key": "cut', encoding="utf-8")
+
+    sweep(input_path, str(results_path), workers=1, rate=100)
+
+    assert read_checkpoint(str(results_path)) == {KatIdentity(**_DRIVER).key}
+
+
+def test_sweep_worker_processes(tmp_path) -> None:
+    """Results of every worker process reach the results file."""
+
+    rows = [{**_INVALID, "identifier": f"{i:09d}"} for i in range(5)]
+    input_path = _write_jsonl(tmp_path / "identities.jsonl", rows)
+    results_path = str(tmp_path / "results.jsonl")
+
+    summary = sweep(input_path, results_path, workers=2)
+
+    assert (summary.queued, summary.checked, summary.failed) == (5, 5, 5)
+    assert len(_read_jsonl(results_path)) == 5
+
+
+def test_main(tmp_path, capsys) -> None:
+    """Console script entry point."""
+
+    input_path = _write_jsonl(tmp_path / "identities.jsonl", [_INVALID])
+    results_path = str(tmp_path / "results.jsonl")
+
+    assert main(["sweep", input_path, "-o", results_path, "--workers", "1"]) == 0
+    assert "1 checked, 1 failed, 0 already done" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        main(["sweep", input_path])
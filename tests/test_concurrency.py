@@ -0,0 +1,166 @@
+"""Adaptive concurrency tests."""
+
+import asyncio
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.concurrency import KatAdaptiveConcurrency
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.errors import KatErrorSubtype
+from kat_bulgaria.kat_api_client import KatApiClient
+from kat_bulgaria.rate_limiter import KatRateLimiter
+
+from .conftest import EGN
+
+
+@pytest.mark.asyncio
+async def test_concurrency_grows_on_success() -> None:
+    """Adaptive concurrency - healthy responses grow the limit by about one per round."""
+
+    limiter = KatAdaptiveConcurrency(initial_limit=2, max_limit=4)
+
+    for _ in range(20):
+        limiter.release(await limiter.acquire())
+
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cut_once_per_burst() -> None:
+    """Adaptive concurrency - timeouts of requests sent together cut the limit once."""
+
+    limiter = KatAdaptiveConcurrency(initial_limit=8)
+
+    tokens = [await limiter.acquire() for _ in range(8)]
+    for token in tokens:
+        limiter.release(token, KatErrorSubtype.API_TIMEOUT)
+
+    assert limiter.limit == 4
+
+    limiter.release(await limiter.acquire(), KatErrorSubtype.API_TOO_MANY_REQUESTS)
+
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_ignores_other_errors_and_cancellation() -> None:
+    """Adaptive concurrency - validation errors are healthy, cancelled requests are ignored."""
+
+    limiter = KatAdaptiveConcurrency(initial_limit=2)
+
+    limiter.release(await limiter.acquire(), KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE)
+    limiter.release(await limiter.acquire(), KatErrorSubtype.API_TIMEOUT, completed=False)
+
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cut_on_slowdown() -> None:
+    """Adaptive concurrency - latency above the tolerance cuts the limit."""
+
+    limiter = KatAdaptiveConcurrency(initial_limit=4, latency_tolerance=2)
+
+    limiter.release(await limiter.acquire())
+    token = await limiter.acquire()
+    limiter.release(token - 1.0)
+
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_waits_for_slot() -> None:
+    """Adaptive concurrency - requests over the limit wait for a free slot."""
+
+    limiter = KatAdaptiveConcurrency(initial_limit=1)
+    token = await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    limiter.release(token)
+    limiter.release(await waiter)
+
+    assert limiter.in_flight == 0
+
+
+def test_concurrency_invalid_limits() -> None:
+    """Adaptive concurrency - limits must be ordered."""
+
+    with pytest.raises(ValueError):
+        KatAdaptiveConcurrency(initial_limit=10, max_limit=5)
+
+
+@pytest.mark.asyncio
+async def test_client_batch_shrinks_on_timeouts(httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture) -> None:
+    """Adaptive concurrency - a batch keeps requests in flight within the shrinking limit."""
+
+    in_flight = 0
+    max_in_flight = 0
+    calls = 0
+    limits = []
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight, calls
+        calls += 1
+        call = calls
+        limits.append(limiter.limit)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.005)
+        in_flight -= 1
+        if call <= 4:
+            raise httpx.ReadTimeout("timeout")
+        return httpx.Response(200, json=ok_no_fines)
+
+    httpx_mock.add_callback(handler, is_reusable=True)
+
+    limiter = KatAdaptiveConcurrency(initial_limit=4, max_limit=4)
+    identities = [
+        KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, f"{i:09d}")
+        for i in range(12)
+    ]
+
+    async with KatApiClient(concurrency_limiter=limiter) as client:
+        results = [r async for r in client.get_obligations_many(identities)]
+
+    assert len(results) == 12
+    assert sum(r.error is not None for r in results) == 4
+    assert max_in_flight <= 4
+    assert limiter.in_flight == 0
+    assert min(limits) < 4
+
+
+@pytest.mark.asyncio
+async def test_client_rate_token_taken_after_slot(httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture) -> None:
+    """Adaptive concurrency - requests waiting for a slot keep to the rate when slots free up together."""
+
+    loop = asyncio.get_running_loop()
+    release = loop.time() + 0.5
+    sent = []
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        sent.append(loop.time())
+        # The first requests all complete at once
+        await asyncio.sleep(max(release - loop.time(), 0))
+        return httpx.Response(200, json=ok_no_fines)
+
+    httpx_mock.add_callback(handler, is_reusable=True)
+
+    limiter = KatAdaptiveConcurrency(initial_limit=2, max_limit=2)
+    identities = [
+        KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, f"{i:09d}")
+        for i in range(4)
+    ]
+
+    async with KatApiClient(concurrency_limiter=limiter, rate_limiter=KatRateLimiter(rate=10, burst=1)) as client:
+        results = [r async for r in client.get_obligations_many(identities, concurrency=4)]
+
+    gaps = [later - earlier for earlier, later in zip(sent, sent[1:])]
+
+    assert all(r.error is None for r in results)
+    assert min(gaps) >= 0.08
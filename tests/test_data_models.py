@@ -0,0 +1,62 @@
+"""Data model tests."""
+
+import dataclasses
+import pickle
+
+import pytest
+
+from kat_bulgaria.data_models import KatFrozenObligation, KatObligation, KatObligationApiResponse
+
+
+def _obligations(payload: dict) -> list[KatObligation]:
+    return [ob for og in KatObligationApiResponse(payload).obligations_data for ob in og.obligations]
+
+
+def test_obligation_slotted_and_mutable(ok_fine_served: pytest.fixture) -> None:
+    """Models - obligations have no __dict__ and can be modified."""
+
+    obligation = _obligations(ok_fine_served)[0]
+    obligation.amount = 0
+
+    assert not hasattr(obligation, "__dict__")
+    assert obligation.amount == 0
+
+
+def test_frozen_obligation(ok_fine_served: pytest.fixture) -> None:
+    """Models - frozen obligations have no __dict__ and cannot be modified."""
+
+    obligation = _obligations(ok_fine_served)[0].freeze()
+
+    assert isinstance(obligation, KatObligation)
+    assert not hasattr(obligation, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        obligation.amount = 0
+
+
+def test_frozen_obligation_hashable(ok_fine_served: pytest.fixture) -> None:
+    """Models - equal frozen obligations hash the same."""
+
+    first = _obligations(ok_fine_served)[0].freeze()
+    second = KatFrozenObligation(first.unit_group, ok_fine_served["obligationsData"][0]["obligations"][0])
+
+    assert first == second
+    assert len({first, second}) == 1
+    assert first == _obligations(ok_fine_served)[0] == first
+    assert pickle.loads(pickle.dumps(first)) == first
+
+
+def test_obligation_repeated_strings_interned(ok_sample2_6fines: pytest.fixture) -> None:
+    """Models - repeated strings are shared between obligations."""
+
+    first, second = _obligations(ok_sample2_6fines)[:2]
+
+    assert first.vehicle_number == second.vehicle_number
+    assert first.vehicle_number is second.vehicle_number
+
+
+def test_obligation_pickle(ok_sample2_6fines: pytest.fixture) -> None:
+    """Models - obligations survive pickling, e.g. between processes."""
+
+    obligations = _obligations(ok_sample2_6fines)
+
+    assert pickle.loads(pickle.dumps(obligations)) == obligations
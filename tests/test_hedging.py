@@ -0,0 +1,175 @@
+"""Request hedging tests."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.data_models import PersonalIdentificationType
+from kat_bulgaria.hedging import KatHedgingPolicy
+from kat_bulgaria.instrumentation import KatObserver
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorSubtype
+
+from .conftest import EGN, LICENSE
+
+
+def test_hedging_delay_percentile() -> None:
+    """The initial delay is used until there are enough samples, then the percentile."""
+
+    policy = KatHedgingPolicy(percentile=0.9, initial_delay=2, min_delay=0, min_samples=10)
+
+    for latency in range(9):
+        policy.record(latency / 10)
+
+    assert policy.delay() == 2
+
+    policy.record(0.9)
+
+    assert policy.delay() == 0.9
+
+    policy.record(0.0)
+
+    assert policy.delay() == 0.8
+
+
+def test_hedging_min_delay() -> None:
+    """The delay is never shorter than the minimum."""
+
+    policy = KatHedgingPolicy(min_delay=0.2, min_samples=1)
+    policy.record(0.01)
+
+    assert policy.delay() == 0.2
+
+
+def test_hedging_budget() -> None:
+    """Requests earn hedge tokens up to the maximum, hedges spend them."""
+
+    policy = KatHedgingPolicy(budget=0.5, max_tokens=2)
+
+    assert not policy.try_hedge()
+
+    for _ in range(10):
+        policy.on_request()
+
+    assert policy.tokens == 2
+    assert policy.try_hedge()
+    assert policy.try_hedge()
+    assert not policy.try_hedge()
+
+
+def _slow_first(ok_no_fines: dict, delay: float = 5):
+    calls = []
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        calls.append(None)
+        if len(calls) == 1:
+            await asyncio.sleep(delay)
+        return httpx.Response(200, json=ok_no_fines)
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """A slow request is hedged and the faster response is returned."""
+
+    httpx_mock.add_callback(_slow_first(ok_no_fines), is_reusable=True)
+
+    policy = KatHedgingPolicy(budget=1, initial_delay=0.05)
+
+    async with KatApiClient(hedging=policy) as client:
+        started = time.monotonic()
+        await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert time.monotonic() - started < 1
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_fast_request_not_hedged(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """A request faster than the delay is not hedged."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    policy = KatHedgingPolicy(budget=1, initial_delay=1)
+
+    async with KatApiClient(hedging=policy) as client:
+        await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert policy.tokens == 1
+
+
+@pytest.mark.asyncio
+async def test_hedging_over_budget(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """No hedge is sent without a token."""
+
+    httpx_mock.add_callback(_slow_first(ok_no_fines, 0.2), is_reusable=True)
+
+    policy = KatHedgingPolicy(budget=0.5, initial_delay=0.05)
+
+    async with KatApiClient(hedging=policy) as client:
+        await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_both_fail(httpx_mock: HTTPXMock) -> None:
+    """The attempt fails only after both requests failed."""
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.1)
+        raise httpx.ReadTimeout("timed out")
+
+    httpx_mock.add_callback(handler, is_reusable=True)
+
+    policy = KatHedgingPolicy(budget=1, initial_delay=0.05)
+
+    async with KatApiClient(hedging=policy) as client:
+        with pytest.raises(KatError) as ctx:
+            await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_TIMEOUT
+    assert len(httpx_mock.get_requests()) == 2
+
+
+class _Requests(KatObserver):
+    def __init__(self) -> None:
+        self.events = []
+
+    def on_request(self, event) -> None:
+        self.events.append(event)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_requests_not_reported(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """The losing hedge is not reported as a success."""
+
+    httpx_mock.add_callback(_slow_first(ok_no_fines), is_reusable=True)
+
+    observer = _Requests()
+    policy = KatHedgingPolicy(budget=1, initial_delay=0.05)
+
+    async with KatApiClient(hedging=policy, observers=[observer]) as client:
+        await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert [(e.outcome, e.status_code) for e in observer.events] == [(None, 200)]
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancelled_request_not_reported(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """A request cut off by the lookup deadline is not reported as a success."""
+
+    httpx_mock.add_callback(_slow_first(ok_no_fines))
+
+    observer = _Requests()
+
+    async with KatApiClient(observers=[observer]) as client:
+        with pytest.raises(KatError):
+            await client.get_obligations_individual(
+                EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE, deadline=0.05)
+
+    assert observer.events == []
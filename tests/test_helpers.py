@@ -0,0 +1,27 @@
+"""Helper tests."""
+
+from json import JSONDecodeError
+
+import pytest
+
+from kat_bulgaria.helpers import json_loads, strtobool
+
+
+def test_json_loads_bytes_and_str() -> None:
+    """JSON - bytes and str are decoded the same way."""
+
+    assert json_loads('{"a": "б"}'.encode("utf-8")) == json_loads('{"a": "б"}') == {"a": "б"}
+
+
+def test_json_loads_error_type() -> None:
+    """JSON - invalid input raises the stdlib JSONDecodeError."""
+
+    with pytest.raises(JSONDecodeError):
+        json_loads(b"<html></html>")
+
+
+@pytest.mark.parametrize("value,expected", [("True", True), ("yes", True), ("1", True), ("False", False), ("", False)])
+def test_strtobool(value: str, expected: bool) -> None:
+    """strtobool - truthy strings."""
+
+    assert strtobool(value) is expected
@@ -0,0 +1,139 @@
+"""Instrumentation tests."""
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.cache import KatMemoryCache
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.errors import KatError, KatErrorSubtype
+from kat_bulgaria.instrumentation import KatObserver
+from kat_bulgaria.kat_api_client import KatApiClient
+from kat_bulgaria.kat_api_client_sync import KatApiClientSync
+from kat_bulgaria.retry import KatRetryPolicy
+
+from .conftest import EGN, LICENSE, INVALID_EGN
+
+_IDENTITY = KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+
+class _Recorder(KatObserver):
+    def __init__(self) -> None:
+        self.requests = []
+        self.lookups = []
+        self.parses = []
+
+    def on_request(self, event) -> None:
+        self.requests.append(event)
+
+    def on_lookup(self, event) -> None:
+        self.lookups.append(event)
+
+    def on_parse(self, event) -> None:
+        self.parses.append(event)
+
+
+@pytest.mark.asyncio
+async def test_observer_request_retry_and_cache(
+    httpx_mock: HTTPXMock, ok_sample2_6fines: pytest.fixture
+) -> None:
+    """Instrumentation - requests, retries, cache hits and parsing are reported."""
+
+    httpx_mock.add_exception(httpx.ReadTimeout("timeout"))
+    httpx_mock.add_response(json=ok_sample2_6fines)
+
+    recorder = _Recorder()
+    policy = KatRetryPolicy(backoff_base=0.001, jitter=False)
+
+    async with KatApiClient(retry_policy=policy, cache=KatMemoryCache(), observers=[recorder]) as client:
+        await client.get_obligations(_IDENTITY)
+        await client.get_obligations(_IDENTITY)
+
+    failed, ok = recorder.requests
+    assert (failed.attempt, failed.outcome, failed.status_code) == (1, KatErrorSubtype.API_TIMEOUT, None)
+    assert (ok.attempt, ok.retries, ok.outcome, ok.status_code) == (2, 1, None, 200)
+    assert ok.bytes_received > 0
+    assert ok.duration >= ok.wait + ok.download + ok.decode
+
+    assert [e.cache_hit for e in recorder.lookups] == [False, True]
+    assert all(e.outcome is None for e in recorder.lookups)
+    assert [e.count for e in recorder.parses] == [6, 6]
+
+
+@pytest.mark.asyncio
+async def test_observer_validation_error() -> None:
+    """Instrumentation - a failed lookup reports its error without a request."""
+
+    recorder = _Recorder()
+
+    async with KatApiClient(observers=[recorder]) as client:
+        with pytest.raises(KatError):
+            await client.get_obligations_individual(INVALID_EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert recorder.requests == []
+    assert recorder.lookups[0].outcome == KatErrorSubtype.VALIDATION_EGN_INVALID
+
+
+def test_observer_sync_client(httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture) -> None:
+    """Instrumentation - the sync client reports the same events."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    recorder = _Recorder()
+
+    with KatApiClientSync(observers=[recorder]) as client:
+        client.get_obligations(_IDENTITY)
+
+    assert len(recorder.requests) == len(recorder.lookups) == len(recorder.parses) == 1
+    assert recorder.requests[0].outcome is None
+    assert recorder.parses[0].count == 0
+
+
+class _Failing(KatObserver):
+    def on_request(self, event) -> None:
+        raise RuntimeError("observer failed")
+
+    def on_lookup(self, event) -> None:
+        raise RuntimeError("observer failed")
+
+
+@pytest.mark.asyncio
+async def test_failing_observer_is_logged(
+    httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Instrumentation - an observer error is logged, the lookup and other observers are not affected."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    recorder = _Recorder()
+
+    async with KatApiClient(observers=[_Failing(), recorder]) as client:
+        assert await client.get_obligations(_IDENTITY) == []
+
+    assert len(recorder.requests) == len(recorder.lookups) == 1
+    assert "on_request" in caplog.text and "on_lookup" in caplog.text
+
+
+def test_failing_observer_sync_client(httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture) -> None:
+    """Instrumentation - the sync client is not affected by an observer error either."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    with KatApiClientSync(observers=[_Failing()]) as client:
+        assert client.get_obligations(_IDENTITY) == []
+
+
+def test_prometheus_observer() -> None:
+    """Instrumentation - Prometheus adapter records request metrics."""
+
+    prometheus_client = pytest.importorskip("prometheus_client")
+
+    from kat_bulgaria.instrumentation import KatPrometheusObserver, KatRequestEvent
+
+    registry = prometheus_client.CollectorRegistry()
+    observer = KatPrometheusObserver(registry=registry)
+    observer.on_request(KatRequestEvent(
+        _IDENTITY, 2, None, 200, 1000, 0.5, 0.0, None, 0.4, 0.05, 0.01))
+
+    assert registry.get_sample_value("kat_response_bytes_total") == 1000
+    assert registry.get_sample_value("kat_retries_total") == 1
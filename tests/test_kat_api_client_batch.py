@@ -0,0 +1,82 @@
+"""Batch obligations tests."""
+
+import asyncio
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.kat_api_client import KatApiClient, KatErrorSubtype
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+
+from .conftest import EGN, LICENSE, GOV_ID, BULSTAT, CAR_PLATE, INVALID_EGN
+
+
+@pytest.mark.asyncio
+async def test_batch_mixed_identities(
+    httpx_mock: HTTPXMock, ok_sample2_6fines: pytest.fixture
+) -> None:
+    """Batch - individual and business identities, one invalid."""
+
+    httpx_mock.add_response(json=ok_sample2_6fines, is_reusable=True)
+
+    identities = [
+        KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE),
+        KatIdentity.individual(EGN, PersonalIdentificationType.CAR_PLATE_NUM, CAR_PLATE),
+        KatIdentity.business(EGN, GOV_ID, BULSTAT),
+        KatIdentity.individual(INVALID_EGN, PersonalIdentificationType.NATIONAL_ID, GOV_ID),
+    ]
+
+    async with KatApiClient() as client:
+        results = [r async for r in client.get_obligations_many(identities, concurrency=2)]
+
+    assert len(httpx_mock.get_requests()) == 3
+    assert {r.identity for r in results} == set(identities)
+
+    failed = [r for r in results if r.error is not None]
+    assert len(failed) == 1
+    assert failed[0].identity.egn == INVALID_EGN
+    assert failed[0].obligations is None
+    assert failed[0].error.error_subtype == KatErrorSubtype.VALIDATION_EGN_INVALID
+
+    assert all(len(r.obligations) == 6 for r in results if r.error is None)
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_concurrency(
+    httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture
+) -> None:
+    """Batch - no more than `concurrency` lookups are in flight."""
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=ok_no_fines)
+
+    httpx_mock.add_callback(handler, is_reusable=True)
+
+    identities = [
+        KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, f"{i:09d}")
+        for i in range(10)
+    ]
+
+    async with KatApiClient() as client:
+        results = [r async for r in client.get_obligations_many(identities, concurrency=3)]
+
+    assert len(results) == 10
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_invalid_concurrency() -> None:
+    """Batch - concurrency must be positive."""
+
+    with pytest.raises(ValueError):
+        async for _ in KatApiClient().get_obligations_many([], concurrency=0):
+            pass
@@ -64,6 +64,17 @@ async def test_verify_credentials_local_invalid_bulstat(httpx_mock: HTTPXMock) -
     assert ctx.value.error_message == ERR_INVALID_BULSTAT
 
 
+@pytest.mark.asyncio
+async def test_verify_credentials_local_missing_bulstat(httpx_mock: HTTPXMock) -> None:
+    """Verify credentials - a business lookup without a BULSTAT is not sent as an individual lookup."""
+
+    with pytest.raises(KatError) as ctx:
+        await KatApiClient().get_obligations_business(EGN, GOV_ID, None)
+
+    assert len(httpx_mock.get_requests()) == 0
+    assert ctx.value.error_subtype == KatErrorSubtype.VALIDATION_BULSTAT_INVALID
+
+
 # endregion
 
 
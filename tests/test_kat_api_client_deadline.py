@@ -0,0 +1,147 @@
+"""Timeout and deadline tests."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorSubtype
+from kat_bulgaria.kat_api_client_sync import KatApiClientSync
+from kat_bulgaria.rate_limiter import KatRateLimiter
+from kat_bulgaria.retry import KatRetryPolicy
+
+from .conftest import EGN, LICENSE
+
+_IDENTITY = KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+
+@pytest.mark.asyncio
+async def test_structured_timeout(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """Per-phase timeouts are sent with the request."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    async with KatApiClient(timeout=httpx.Timeout(10, connect=2, pool=1)) as client:
+        await client.get_obligations(_IDENTITY)
+
+    assert httpx_mock.get_request().extensions["timeout"] == {"connect": 2, "read": 10, "write": 10, "pool": 1}
+
+
+@pytest.mark.asyncio
+async def test_deadline_caps_timeout(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """Every phase timeout is capped by the time left until the deadline."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    async with KatApiClient(timeout=httpx.Timeout(30, connect=1)) as client:
+        await client.get_obligations(_IDENTITY, deadline=2)
+
+    timeout = httpx_mock.get_request().extensions["timeout"]
+
+    assert timeout["connect"] == 1
+    assert 1 < timeout["read"] <= 2
+    assert 1 < timeout["pool"] <= 2
+
+
+@pytest.mark.asyncio
+async def test_deadline_stops_retries(httpx_mock: HTTPXMock) -> None:
+    """No retry is started if its backoff would end after the deadline."""
+
+    httpx_mock.add_exception(httpx.ReadTimeout("timed out"))
+
+    policy = KatRetryPolicy(max_attempts=5, backoff_base=1, jitter=False)
+
+    async with KatApiClient(retry_policy=policy) as client:
+        started = time.monotonic()
+
+        with pytest.raises(KatError) as ctx:
+            await client.get_obligations(_IDENTITY, deadline=0.5)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_TIMEOUT
+    assert time.monotonic() - started < 0.5
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_rate_limiter_wait(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """Waiting for the rate limiter counts towards the deadline."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    async with KatApiClient(rate_limiter=KatRateLimiter(rate=0.1, burst=1), coalesce_requests=False) as client:
+        await client.get_obligations(_IDENTITY)
+
+        started = time.monotonic()
+
+        with pytest.raises(KatError) as ctx:
+            await client.get_obligations(_IDENTITY, deadline=0.1)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_TIMEOUT
+    assert "deadline" in ctx.value.error_message
+    assert time.monotonic() - started < 1
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_deadline(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """One deadline is shared by every lookup of a batch."""
+
+    async def slow(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05 if request.url.params["drivingLicenceNumber"] == LICENSE else 5)
+        return httpx.Response(200, json=ok_no_fines)
+
+    httpx_mock.add_callback(slow, is_reusable=True)
+
+    identities = [_IDENTITY, KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, "987654321")]
+
+    async with KatApiClient() as client:
+        started = time.monotonic()
+        results = {result.identity: result async for result in client.get_obligations_many(identities, deadline=0.3)}
+
+    assert time.monotonic() - started < 1
+    assert results[identities[0]].error is None
+    assert results[identities[1]].error.error_subtype == KatErrorSubtype.API_TIMEOUT
+
+
+@pytest.mark.asyncio
+async def test_deadline_not_shared_by_coalesced_lookups(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """A lookup is not cut short by the deadline of a concurrent lookup of the same identity."""
+
+    async def slow(_request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.3)
+        return httpx.Response(200, json=ok_no_fines)
+
+    httpx_mock.add_callback(slow, is_reusable=True)
+
+    async with KatApiClient() as client:
+        short, long = await asyncio.gather(
+            client.get_obligations(_IDENTITY, deadline=0.1),
+            client.get_obligations(_IDENTITY, deadline=30),
+            return_exceptions=True)
+
+    assert short.error_subtype == KatErrorSubtype.API_TIMEOUT
+    assert long == []
+
+
+def test_sync_deadline_caps_timeout(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """Sync client - phase timeouts are capped by the deadline."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    with KatApiClientSync(timeout=30) as client:
+        client.get_obligations(_IDENTITY, deadline=2)
+
+    assert httpx_mock.get_request().extensions["timeout"]["read"] <= 2
+
+
+def test_sync_expired_batch_deadline(httpx_mock: HTTPXMock) -> None:
+    """Sync client - lookups starting after the batch deadline fail without a request."""
+
+    with KatApiClientSync() as client:
+        results = list(client.get_obligations_many([_IDENTITY], deadline=0))
+
+    assert results[0].error.error_subtype == KatErrorSubtype.API_TIMEOUT
+    assert not httpx_mock.get_requests()
@@ -0,0 +1,90 @@
+"""External httpx client tests."""
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorType, KatErrorSubtype
+from kat_bulgaria.data_models import PersonalIdentificationType
+from kat_bulgaria.rate_limiter import KatRateLimiter
+
+from .conftest import EGN, LICENSE, GOV_ID, BULSTAT
+
+
+@pytest.mark.asyncio
+async def test_external_client_success(
+    httpx_mock: HTTPXMock, ok_sample1_2fines: pytest.fixture
+) -> None:
+    """External client - obligations are parsed as with the pooled client."""
+
+    httpx_mock.add_response(json=ok_sample1_2fines)
+
+    async with httpx.AsyncClient() as external:
+        resp = await KatApiClient().get_obligations_business(EGN, GOV_ID, BULSTAT, external)
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert len(resp) == 2
+
+
+@pytest.mark.asyncio
+async def test_external_client_too_many_requests(
+    httpx_mock: HTTPXMock, err_too_many_requests: pytest.fixture
+) -> None:
+    """External client - the throttling page is detected and reported to the limiter."""
+
+    httpx_mock.add_response(status_code=200, html=err_too_many_requests, headers={
+                            'content-type': 'text/html'})
+
+    limiter = KatRateLimiter(rate=4, backoff_factor=0.5)
+
+    with pytest.raises(KatError) as ctx:
+        async with httpx.AsyncClient() as external:
+            await KatApiClient(rate_limiter=limiter).get_obligations_individual(
+                EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE, external)
+
+    assert ctx.value.error_type == KatErrorType.API_ERROR
+    assert ctx.value.error_subtype == KatErrorSubtype.API_TOO_MANY_REQUESTS
+    assert limiter.rate == 2
+
+
+@pytest.mark.asyncio
+async def test_external_client_status_checked_before_parse(
+    httpx_mock: HTTPXMock, err_random_html: pytest.fixture
+) -> None:
+    """External client - a non-success status is reported before parsing the body."""
+
+    httpx_mock.add_response(status_code=502, html=err_random_html)
+
+    with pytest.raises(KatError) as ctx:
+        async with httpx.AsyncClient() as external:
+            await KatApiClient().get_obligations_individual(
+                EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE, external)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_UNKNOWN_ERROR
+    assert "unknown error" in ctx.value.error_message
+
+
+@pytest.mark.asyncio
+async def test_status_429_is_too_many_requests(httpx_mock: HTTPXMock) -> None:
+    """Status 429 is treated as too many requests regardless of the body."""
+
+    httpx_mock.add_response(status_code=429, text="slow down")
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient() as client:
+            await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_TOO_MANY_REQUESTS
+
+
+@pytest.mark.asyncio
+async def test_non_object_json_is_invalid_schema(httpx_mock: HTTPXMock) -> None:
+    """A JSON body that is not an object is reported as an invalid schema."""
+
+    httpx_mock.add_response(json=["obligationsData"])
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient() as client:
+            await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_INVALID_SCHEMA
@@ -0,0 +1,65 @@
+"""Streaming obligations tests."""
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorSubtype
+from kat_bulgaria.data_models import KatIdentity, KatObligation, PersonalIdentificationType
+
+from .conftest import EGN, LICENSE, GOV_ID, BULSTAT, INVALID_BULSTAT
+
+
+@pytest.mark.asyncio
+async def test_iter_obligations_individual(
+    httpx_mock: HTTPXMock, ok_sample2_6fines: pytest.fixture
+) -> None:
+    """Iterate - yields the same obligations as the list API."""
+
+    httpx_mock.add_response(json=ok_sample2_6fines, is_reusable=True)
+
+    async with KatApiClient() as client:
+        streamed = [ob async for ob in client.iter_obligations_individual(
+            EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)]
+        listed = await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(streamed) == 6
+    assert all(isinstance(ob, KatObligation) for ob in streamed)
+    assert streamed == listed
+
+
+@pytest.mark.asyncio
+async def test_iter_obligations_business_error(httpx_mock: HTTPXMock) -> None:
+    """Iterate - validation errors are raised on first iteration."""
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient() as client:
+            async for _ in client.iter_obligations_business(EGN, GOV_ID, INVALID_BULSTAT):
+                pass
+
+    assert len(httpx_mock.get_requests()) == 0
+    assert ctx.value.error_subtype == KatErrorSubtype.VALIDATION_BULSTAT_INVALID
+
+
+@pytest.mark.asyncio
+async def test_iter_obligations_many(
+    httpx_mock: HTTPXMock, ok_sample1_2fines: pytest.fixture
+) -> None:
+    """Iterate - batch yields one pair per obligation and one per failed identity."""
+
+    httpx_mock.add_response(json=ok_sample1_2fines, is_reusable=True)
+
+    individual = KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+    business = KatIdentity.business(EGN, GOV_ID, BULSTAT)
+    invalid = KatIdentity.business(EGN, GOV_ID, INVALID_BULSTAT)
+
+    async with KatApiClient() as client:
+        items = [item async for item in client.iter_obligations_many([individual, business, invalid])]
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert len(items) == 5
+    assert sum(1 for identity, ob in items if identity == individual and isinstance(ob, KatObligation)) == 2
+    assert sum(1 for identity, ob in items if identity == business and isinstance(ob, KatObligation)) == 2
+
+    errors = [(identity, err) for identity, err in items if isinstance(err, KatError)]
+    assert errors == [(invalid, errors[0][1])]
+    assert errors[0][1].error_subtype == KatErrorSubtype.VALIDATION_BULSTAT_INVALID
@@ -0,0 +1,113 @@
+"""Pooled client tests."""
+
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import httpx
+import pytest
+
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria import query
+from kat_bulgaria.kat_api_client import KatApiClient
+from kat_bulgaria.data_models import PersonalIdentificationType
+from kat_bulgaria.query import build_query
+
+from .conftest import EGN, LICENSE
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_reused_between_calls(
+    httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture
+) -> None:
+    """Pooled client - multiple lookups share one client."""
+
+    httpx_mock.add_response(json=ok_no_fines, is_reusable=True)
+
+    async with KatApiClient(max_connections=2, max_keepalive_connections=1) as client:
+        resp1 = await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+        resp2 = await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert resp1 == resp2 == []
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_usable_after_close(
+    httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture
+) -> None:
+    """Pooled client - a closed client is recreated on next use."""
+
+    httpx_mock.add_response(json=ok_no_fines, is_reusable=True)
+
+    client = KatApiClient()
+    await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+    await client.aclose()
+    await client.aclose()
+
+    resp = await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+    await client.aclose()
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert len(resp) == 0
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_custom_transport(ok_no_fines: pytest.fixture) -> None:
+    """Pooled client - requests go through a custom transport."""
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=ok_no_fines)
+
+    async with KatApiClient(transport=httpx.MockTransport(handler)) as client:
+        resp = await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert resp == []
+    assert len(requests) == 1
+    assert requests[0].url.host == "e-uslugi.mvr.bg"
+
+
+def test_pooled_client_reused_across_event_loops(monkeypatch: pytest.MonkeyPatch, ok_no_fines: pytest.fixture) -> None:
+    """Pooled client - a client reused in a new event loop gets a new pool."""
+
+    body = json.dumps(ok_no_fines).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Real connections to a local server instead of MVR
+    monkeypatch.setattr(query, "_API_URL", httpx.URL(f"http://127.0.0.1:{server.server_address[1]}/api"))
+    build_query.cache_clear()
+
+    client = KatApiClient()
+
+    async def lookup() -> list:
+        return await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    try:
+        for _ in range(3):
+            assert asyncio.run(lookup()) == []
+
+        asyncio.run(client.aclose())
+    finally:
+        build_query.cache_clear()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,129 @@
+"""Synchronous client tests."""
+
+import threading
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.cache import KatMemoryCache
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.errors import KatError, KatErrorSubtype
+from kat_bulgaria.kat_api_client_sync import KatApiClientSync
+from kat_bulgaria.retry import KatRetryPolicy
+
+from .conftest import EGN, LICENSE, GOV_ID, BULSTAT, INVALID_EGN, ENCODING
+
+
+def test_sync_individual(httpx_mock: HTTPXMock, ok_sample2_6fines: pytest.fixture) -> None:
+    """Sync client - individual lookup returns obligations."""
+
+    httpx_mock.add_response(json=ok_sample2_6fines)
+
+    with KatApiClientSync() as client:
+        obligations = client.get_obligations_individual(
+            EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(obligations) == 6
+
+
+def test_sync_business_summary(httpx_mock: HTTPXMock, ok_sample2_6fines: pytest.fixture) -> None:
+    """Sync client - summary matches the full lookup."""
+
+    httpx_mock.add_response(json=ok_sample2_6fines, is_reusable=True)
+
+    identity = KatIdentity.business(EGN, GOV_ID, BULSTAT)
+
+    with KatApiClientSync() as client:
+        summary = client.get_obligations_summary(identity)
+        obligations = client.get_obligations(identity)
+
+    assert summary.count == len(obligations)
+    assert summary.amount == sum(ob.amount for ob in obligations)
+
+
+def test_sync_reuses_pooled_client(httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture) -> None:
+    """Sync client - lookups share one connection pool until closed."""
+
+    httpx_mock.add_response(json=ok_no_fines, is_reusable=True)
+
+    client = KatApiClientSync()
+    client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+    pooled = client._KatApiClientSync__client
+    client.get_obligations_individual(EGN, PersonalIdentificationType.NATIONAL_ID, GOV_ID)
+
+    assert client._KatApiClientSync__client is pooled
+
+    client.close()
+
+    assert pooled.is_closed
+    assert client._KatApiClientSync__client is None
+
+
+def test_sync_too_many_requests(httpx_mock: HTTPXMock, err_too_many_requests: pytest.fixture) -> None:
+    """Sync client - the throttling page raises API_TOO_MANY_REQUESTS."""
+
+    httpx_mock.add_response(content=err_too_many_requests.encode(ENCODING), headers={
+                            'content-type': 'text/html; charset=utf-8'})
+
+    with pytest.raises(KatError) as ctx:
+        with KatApiClientSync() as client:
+            client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_TOO_MANY_REQUESTS
+
+
+def test_sync_retry_and_cache(httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture) -> None:
+    """Sync client - a timeout is retried and the answer is cached."""
+
+    httpx_mock.add_exception(httpx.ReadTimeout("timeout"))
+    httpx_mock.add_response(json=ok_no_fines)
+
+    policy = KatRetryPolicy(backoff_base=0.001, jitter=False)
+
+    with KatApiClientSync(retry_policy=policy, cache=KatMemoryCache()) as client:
+        for _ in range(3):
+            assert client.get_obligations_individual(
+                EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE) == []
+
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_sync_batch(httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture) -> None:
+    """Sync batch - runs lookups on threads, at most `max_workers` at a time."""
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return httpx.Response(200, json=ok_no_fines)
+
+    httpx_mock.add_callback(handler, is_reusable=True)
+
+    identities = [
+        KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, f"{i:09d}")
+        for i in range(12)
+    ] + [KatIdentity.individual(INVALID_EGN, PersonalIdentificationType.NATIONAL_ID, GOV_ID)]
+
+    with KatApiClientSync() as client:
+        results = list(client.get_obligations_many(identities, max_workers=3))
+
+    assert {r.identity for r in results} == set(identities)
+    assert len([r for r in results if r.error is not None]) == 1
+    assert 1 < max_in_flight <= 3
+
+
+def test_sync_batch_invalid_workers() -> None:
+    """Sync batch - max_workers must be positive."""
+
+    with pytest.raises(ValueError):
+        list(KatApiClientSync().get_obligations_many([], max_workers=0))
@@ -0,0 +1,92 @@
+"""Lazy parsing tests."""
+
+import dataclasses
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorSubtype
+from kat_bulgaria.data_models import (
+    KatIdentity,
+    KatObligation,
+    KatObligationApiResponse,
+    KatObligationSummary,
+    KatObligationView,
+    PersonalIdentificationType
+)
+
+from .conftest import EGN, LICENSE
+
+
+def test_view_matches_parsed_obligation(ok_sample2_6fines: pytest.fixture) -> None:
+    """Lazy - views expose the same values as parsed obligations."""
+
+    eager = KatObligationApiResponse(ok_sample2_6fines)
+    lazy = KatObligationApiResponse(ok_sample2_6fines, lazy=True)
+
+    for eager_group, lazy_group in zip(eager.obligations_data, lazy.obligations_data):
+        for obligation, view in zip(eager_group.obligations, lazy_group.obligations):
+            assert isinstance(view, KatObligationView)
+            for field in dataclasses.fields(KatObligation):
+                assert getattr(view, field.name) == getattr(obligation, field.name)
+            assert view.materialize() == obligation
+
+
+def test_summary_matches_parsed(ok_sample2_6fines: pytest.fixture) -> None:
+    """Lazy - the raw payload summary equals the parsed totals."""
+
+    summary = KatObligationSummary.from_payload(ok_sample2_6fines)
+
+    assert summary == KatObligationApiResponse(ok_sample2_6fines).summary()
+    assert summary == KatObligationApiResponse(ok_sample2_6fines, lazy=True).summary()
+    assert summary.count == 6
+    assert summary.amount == 600
+
+
+@pytest.mark.asyncio
+async def test_client_lazy_parsing(
+    httpx_mock: HTTPXMock, ok_fine_served: pytest.fixture
+) -> None:
+    """Lazy - the client returns views when lazy parsing is on."""
+
+    httpx_mock.add_response(json=ok_fine_served)
+
+    async with KatApiClient(lazy_parsing=True) as client:
+        resp = await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(resp) == 1
+    assert isinstance(resp[0], KatObligationView)
+    assert resp[0].is_served is True
+    assert resp[0].amount == 100
+
+
+@pytest.mark.asyncio
+async def test_client_summary(
+    httpx_mock: HTTPXMock, ok_sample1_2fines: pytest.fixture
+) -> None:
+    """Lazy - the client summary counts obligations without parsing them."""
+
+    httpx_mock.add_response(json=ok_sample1_2fines)
+
+    async with KatApiClient() as client:
+        summary = await client.get_obligations_summary(
+            KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE))
+
+    assert summary == KatObligationSummary.from_payload(ok_sample1_2fines)
+    assert summary.count == 2
+
+
+@pytest.mark.asyncio
+async def test_client_summary_user_not_found(
+    httpx_mock: HTTPXMock, err_nodatafound: pytest.fixture
+) -> None:
+    """Lazy - the summary still reports API errors."""
+
+    httpx_mock.add_response(json=err_nodatafound)
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient() as client:
+            await client.get_obligations_summary(
+                KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE))
+
+    assert ctx.value.error_subtype == KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE
@@ -0,0 +1,69 @@
+"""Query building tests."""
+
+import pytest
+
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.errors import KatError, KatErrorSubtype
+from kat_bulgaria.query import KatQuery, build_query
+
+from .conftest import EGN, LICENSE, GOV_ID, BULSTAT, CAR_PLATE
+
+
+@pytest.mark.parametrize("identity, params", [
+    (KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE),
+     {"obligatedPersonType": "1", "additinalDataForObligatedPersonType": "1", "drivingLicenceNumber": LICENSE}),
+    (KatIdentity.individual(EGN, PersonalIdentificationType.NATIONAL_ID, GOV_ID),
+     {"obligatedPersonType": "1", "additinalDataForObligatedPersonType": "2", "personalDocumentNumber": GOV_ID}),
+    (KatIdentity.individual(EGN, PersonalIdentificationType.CAR_PLATE_NUM, CAR_PLATE),
+     {"obligatedPersonType": "1", "additinalDataForObligatedPersonType": "3", "foreignVehicleNumber": CAR_PLATE}),
+    (KatIdentity.business(EGN, GOV_ID, BULSTAT),
+     {"obligatedPersonType": "2", "additinalDataForObligatedPersonType": "1", "personalDocumentNumber": GOV_ID,
+      "uic": BULSTAT}),
+], ids=["license", "national_id", "car_plate", "business"])
+def test_query_url(identity: KatIdentity, params: dict) -> None:
+    """URL parameters per identity type."""
+
+    url = build_query(identity).url
+
+    assert url.host == "e-uslugi.mvr.bg"
+    assert url.path == "/api/Obligations/AND"
+    assert dict(url.params) == {"mode": "1", "obligedPersonIdent": EGN, **params}
+
+
+def test_query_key_dedups_formatting() -> None:
+    """Identities differing only in formatting give equal queries."""
+
+    latin = build_query(KatIdentity.individual(EGN, PersonalIdentificationType.CAR_PLATE_NUM, CAR_PLATE))
+    cyrillic = build_query(KatIdentity.individual(EGN, PersonalIdentificationType.CAR_PLATE_NUM, "ОВ 4444 АР"))
+
+    assert latin == cyrillic
+    assert hash(latin) == hash(cyrillic)
+    assert latin.key == cyrillic.key == KatIdentity.individual(
+        EGN, PersonalIdentificationType.CAR_PLATE_NUM, CAR_PLATE).key
+
+
+def test_query_memoised() -> None:
+    """The same identity gives the same query object."""
+
+    identity = KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert build_query(identity) is build_query(identity)
+    assert isinstance(build_query(identity), KatQuery)
+
+
+def test_query_invalid() -> None:
+    """Invalid identities raise."""
+
+    with pytest.raises(KatError) as ctx:
+        build_query(KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, f"{LICENSE}\n1"))
+
+    assert ctx.value.error_subtype == KatErrorSubtype.VALIDATION_DRIVING_LICENSE_INVALID
+
+
+def test_query_unknown_identifier_type() -> None:
+    """Unknown identifier types are rejected, not sent as another document."""
+
+    with pytest.raises(KatError) as ctx:
+        build_query(KatIdentity.individual(EGN, "passport", LICENSE))
+
+    assert ctx.value.error_subtype == KatErrorSubtype.VALIDATION_IDENTIFIER_TYPE_INVALID
@@ -0,0 +1,95 @@
+"""Rate limiter tests."""
+
+import pytest
+
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorSubtype
+from kat_bulgaria.data_models import PersonalIdentificationType
+from kat_bulgaria.rate_limiter import KatRateLimiter
+
+from .conftest import EGN, LICENSE
+
+
+def test_rate_limiter_burst_then_rate() -> None:
+    """Rate limiter - burst is free, then requests are spaced by the rate."""
+
+    limiter = KatRateLimiter(rate=2, burst=3)
+
+    delays = [limiter._reserve(100.0) for _ in range(5)]
+
+    assert delays == [0, 0, 0, 0.5, 1.0]
+
+
+def test_rate_limiter_refills_over_time() -> None:
+    """Rate limiter - tokens refill at the configured rate."""
+
+    limiter = KatRateLimiter(rate=10, burst=1)
+
+    assert limiter._reserve(100.0) == 0
+    assert limiter._reserve(100.0) == pytest.approx(0.1)
+    assert limiter._reserve(100.5) == 0
+
+
+def test_rate_limiter_throttled_backs_off_once() -> None:
+    """Rate limiter - throttling cuts the rate once per cooldown and pauses requests."""
+
+    limiter = KatRateLimiter(rate=4, burst=4, backoff_factor=0.5, cooldown=2)
+
+    limiter._throttled(100.0)
+    limiter._throttled(100.5)
+
+    assert limiter.rate == 2
+    assert limiter._reserve(100.0) == pytest.approx(2.5)
+
+
+def test_rate_limiter_recovers_on_success() -> None:
+    """Rate limiter - successes restore the rate up to the maximum."""
+
+    limiter = KatRateLimiter(rate=1, min_rate=0.1, backoff_factor=0.1, recovery_step=0.5)
+
+    limiter.on_throttled()
+    assert limiter.rate == pytest.approx(0.1)
+
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(0.6)
+
+    limiter.on_success()
+    assert limiter.rate == 1
+
+
+def test_rate_limiter_invalid_config() -> None:
+    """Rate limiter - rate and burst must be positive."""
+
+    with pytest.raises(ValueError):
+        KatRateLimiter(rate=0)
+
+
+@pytest.mark.asyncio
+async def test_client_reports_too_many_requests_to_limiter(
+    httpx_mock: HTTPXMock, err_too_many_requests: pytest.fixture
+) -> None:
+    """Rate limiter - client backs off when KAT says too many requests."""
+
+    httpx_mock.add_response(status_code=200, html=err_too_many_requests, headers={
+                            'content-type': 'text/html'})
+
+    limiter = KatRateLimiter(rate=4, backoff_factor=0.5)
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient(rate_limiter=limiter) as client:
+            await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_TOO_MANY_REQUESTS
+    assert limiter.rate == 2
+
+
+def test_rate_limiter_acquire_sync() -> None:
+    """Rate limiter - blocking acquire spends the burst without waiting."""
+
+    limiter = KatRateLimiter(rate=1000, burst=2)
+
+    for _ in range(3):
+        limiter.acquire_sync()
+
+    assert limiter._reserve(limiter._KatRateLimiter__updated_at) > 0
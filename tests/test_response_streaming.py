@@ -0,0 +1,73 @@
+"""Streamed response classification tests."""
+
+import pytest
+from pytest_httpx import HTTPXMock, IteratorStream
+
+from kat_bulgaria.helpers import ByteMarkerScanner
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorSubtype
+from kat_bulgaria.data_models import PersonalIdentificationType
+
+from .conftest import EGN, LICENSE, ENCODING
+
+_MARKER = "Достигнат е максимално допустимият брой заявки".encode(ENCODING)
+
+
+def test_marker_scanner_split_between_chunks() -> None:
+    """Scanner - finds a marker split between two chunks."""
+
+    scanner = ByteMarkerScanner(_MARKER)
+
+    assert scanner.feed(b"<html>" + _MARKER[:7]) is False
+    assert scanner.feed(_MARKER[7:] + b"</html>") is True
+
+
+def test_marker_scanner_missing() -> None:
+    """Scanner - reports missing marker and counts scanned bytes."""
+
+    scanner = ByteMarkerScanner(_MARKER)
+
+    assert scanner.feed(b"a" * 100) is False
+    assert scanner.feed(_MARKER[:-1]) is False
+    assert scanner.scanned == 100 + len(_MARKER) - 1
+
+
+@pytest.mark.asyncio
+async def test_too_many_requests_stops_reading_at_marker(
+    httpx_mock: HTTPXMock, err_too_many_requests: pytest.fixture
+) -> None:
+    """Streaming - the throttling page is not downloaded past the marker."""
+
+    body = err_too_many_requests.encode(ENCODING)
+    chunks = [body[i:i + 4096] for i in range(0, len(body), 4096)]
+    served = []
+
+    def stream():
+        for chunk in chunks:
+            served.append(chunk)
+            yield chunk
+
+    httpx_mock.add_response(status_code=200, stream=IteratorStream(stream()), headers={
+                            'content-type': 'text/html; charset=utf-8'})
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient() as client:
+            await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_TOO_MANY_REQUESTS
+    assert len(served) < len(chunks)
+
+
+@pytest.mark.asyncio
+async def test_html_with_charset_is_malformed(
+    httpx_mock: HTTPXMock, err_random_html: pytest.fixture
+) -> None:
+    """Streaming - other HTML pages are reported as malformed responses."""
+
+    httpx_mock.add_response(status_code=200, html=err_random_html)
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient() as client:
+            await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_UNKNOWN_ERROR
+    assert "malformed response" in ctx.value.error_message
@@ -0,0 +1,104 @@
+"""Retry policy tests."""
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorType, KatErrorSubtype
+from kat_bulgaria.data_models import PersonalIdentificationType
+from kat_bulgaria.retry import KatRetryPolicy
+
+from .conftest import EGN, LICENSE
+
+_NO_BACKOFF = KatRetryPolicy(max_attempts=3, backoff_base=0)
+
+
+def test_retry_policy_delay_exponential_capped() -> None:
+    """Retry policy - exponential delay without jitter, capped."""
+
+    policy = KatRetryPolicy(backoff_base=1, backoff_cap=5, jitter=False)
+
+    assert [policy.get_delay(a) for a in range(1, 6)] == [1, 2, 4, 5, 5]
+
+
+def test_retry_policy_delay_jitter_bounded() -> None:
+    """Retry policy - jittered delay never exceeds the exponential delay."""
+
+    policy = KatRetryPolicy(backoff_base=1, backoff_cap=5)
+
+    assert all(0 <= policy.get_delay(3) <= 4 for _ in range(100))
+
+
+def test_retry_policy_never_retries_validation() -> None:
+    """Retry policy - validation errors are never retried."""
+
+    policy = KatRetryPolicy(retry_on=frozenset(KatErrorSubtype))
+
+    assert not policy.is_retryable(KatError(
+        KatErrorType.VALIDATION_ERROR, KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE, ""))
+    assert policy.is_retryable(KatError(
+        KatErrorType.API_ERROR, KatErrorSubtype.API_UNKNOWN_ERROR, ""))
+
+
+@pytest.mark.asyncio
+async def test_retry_timeout_then_success(
+    httpx_mock: HTTPXMock, ok_fine_served: pytest.fixture
+) -> None:
+    """Retry - a timeout is retried and the next attempt succeeds."""
+
+    httpx_mock.add_exception(httpx.TimeoutException(""))
+    httpx_mock.add_response(json=ok_fine_served)
+
+    async with KatApiClient(retry_policy=_NO_BACKOFF) as client:
+        resp = await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert len(resp) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_gives_up_after_max_attempts(
+    httpx_mock: HTTPXMock, err_apidown: pytest.fixture
+) -> None:
+    """Retry - the last error is raised once all attempts fail."""
+
+    httpx_mock.add_response(json=err_apidown, is_reusable=True)
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient(retry_policy=_NO_BACKOFF) as client:
+            await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(httpx_mock.get_requests()) == 3
+    assert ctx.value.error_subtype == KatErrorSubtype.API_ERROR_READING_DATA
+
+
+@pytest.mark.asyncio
+async def test_retry_skips_user_not_found(
+    httpx_mock: HTTPXMock, err_nodatafound: pytest.fixture
+) -> None:
+    """Retry - user not found is not retried."""
+
+    httpx_mock.add_response(json=err_nodatafound)
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient(retry_policy=_NO_BACKOFF) as client:
+            await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert ctx.value.error_subtype == KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE
+
+
+@pytest.mark.asyncio
+async def test_retry_stops_at_deadline(httpx_mock: HTTPXMock) -> None:
+    """Retry - no new attempt is started if its backoff would cross the deadline."""
+
+    httpx_mock.add_exception(httpx.TimeoutException(""))
+
+    policy = KatRetryPolicy(max_attempts=5, backoff_base=10, jitter=False, deadline=1)
+
+    with pytest.raises(KatError) as ctx:
+        async with KatApiClient(retry_policy=policy) as client:
+            await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert ctx.value.error_subtype == KatErrorSubtype.API_TIMEOUT
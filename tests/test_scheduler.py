@@ -0,0 +1,111 @@
+"""Polling scheduler tests."""
+
+import re
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.kat_api_client import KatApiClient
+from kat_bulgaria.scheduler import KatPollingScheduler
+from kat_bulgaria.store import KatObligationStore
+
+from .conftest import EGN, LICENSE, GOV_ID, BULSTAT, INVALID_EGN
+
+_DRIVER = KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+_BUSINESS = KatIdentity.business(EGN, GOV_ID, BULSTAT)
+_INVALID = KatIdentity.individual(INVALID_EGN, PersonalIdentificationType.NATIONAL_ID, GOV_ID)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_reschedules_by_outcome(
+    tmp_path, httpx_mock: HTTPXMock, ok_sample1_2fines: pytest.fixture, ok_no_fines: pytest.fixture
+) -> None:
+    """Scheduler - identities with obligations and higher priority are due sooner."""
+
+    httpx_mock.add_response(url=re.compile(r".*drivingLicenceNumber=.*"), json=ok_sample1_2fines)
+    httpx_mock.add_response(url=re.compile(r".*uic=.*"), json=ok_no_fines)
+
+    async with KatApiClient() as client:
+        scheduler = KatPollingScheduler(
+            client, str(tmp_path / "schedule.db"), interval=1000, unpaid_interval=100, invalid_interval=5000)
+        scheduler.add(_DRIVER)
+        scheduler.add(_BUSINESS, priority=2)
+        scheduler.add(_INVALID)
+
+        started = time.time()
+        results = await scheduler.run_once()
+
+        assert {r.identity for r in results} == {_DRIVER, _BUSINESS, _INVALID}
+        assert await scheduler.run_once() == []
+        assert 100 <= scheduler.next_check() - started < 110
+
+        rows = dict(scheduler._KatPollingScheduler__db.execute(
+            "SELECT identity_key, next_check FROM kat_schedule").fetchall())
+        assert 500 <= rows[_BUSINESS.key] - started < 510
+        assert 5000 <= rows[_INVALID.key] - started < 5010
+        scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_budget_persisted(
+    tmp_path, httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture
+) -> None:
+    """Scheduler - the budget and the registry survive a restart."""
+
+    httpx_mock.add_response(json=ok_no_fines, is_reusable=True)
+    path = str(tmp_path / "schedule.db")
+
+    async with KatApiClient() as client:
+        scheduler = KatPollingScheduler(client, path, budget=2)
+        for i in range(3):
+            scheduler.add(KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, f"{i:09d}"))
+
+        assert len(await scheduler.run_once()) == 2
+        assert scheduler.remaining_budget() == 0
+        scheduler.close()
+
+        scheduler = KatPollingScheduler(client, path, budget=3)
+
+        assert len(scheduler) == 3
+        assert scheduler.remaining_budget() == 1
+        assert len(await scheduler.run_once()) == 1
+        assert await scheduler.run_once() == []
+        scheduler.close()
+
+    assert len(httpx_mock.get_requests()) == 3
+
+
+@pytest.mark.asyncio
+async def test_scheduler_updates_store(
+    tmp_path, httpx_mock: HTTPXMock, ok_sample1_2fines: pytest.fixture
+) -> None:
+    """Scheduler - changes are saved to the store and reported."""
+
+    httpx_mock.add_response(json=ok_sample1_2fines)
+
+    diffs = []
+    store = KatObligationStore(str(tmp_path / "store.db"))
+
+    async with KatApiClient() as client:
+        scheduler = KatPollingScheduler(client, str(tmp_path / "schedule.db"), store=store, on_change=diffs.append)
+        scheduler.add(_DRIVER)
+        await scheduler.run_once()
+        scheduler.close()
+
+    assert len(diffs) == 1
+    assert len(diffs[0].added) == 2
+    assert len(store.get(_DRIVER)) == 2
+    store.close()
+
+
+def test_scheduler_invalid_priority(tmp_path) -> None:
+    """Scheduler - priority must be positive."""
+
+    scheduler = KatPollingScheduler(KatApiClient(), str(tmp_path / "schedule.db"))
+
+    with pytest.raises(ValueError):
+        scheduler.add(_DRIVER, priority=0)
+
+    scheduler.close()
@@ -0,0 +1,189 @@
+"""Request coalescing tests."""
+
+import asyncio
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.kat_api_client import KatApiClient, KatError, KatErrorSubtype
+from kat_bulgaria.data_models import PersonalIdentificationType
+from kat_bulgaria.retry import KatRetryPolicy
+from kat_bulgaria.single_flight import SingleFlight
+
+from .conftest import EGN, LICENSE
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_result() -> None:
+    """Single flight - concurrent callers with one key share one call."""
+
+    calls = 0
+
+    async def func():
+        nonlocal calls
+        calls += 1
+        result = calls
+        await asyncio.sleep(0.01)
+        return result
+
+    flight = SingleFlight()
+    results = await asyncio.gather(*(flight.run("a", func) for _ in range(5)), flight.run("b", func))
+
+    assert results == [1, 1, 1, 1, 1, 2]
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancelled_awaiter() -> None:
+    """Single flight - cancelling one awaiter does not cancel the shared call."""
+
+    async def func():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    flight = SingleFlight()
+    first = asyncio.ensure_future(flight.run("a", func))
+    second = asyncio.ensure_future(flight.run("a", func))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancelled_by_last_awaiter() -> None:
+    """Single flight - the shared call is cancelled once every awaiter is cancelled."""
+
+    cancelled = asyncio.Event()
+
+    async def func():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    flight = SingleFlight()
+    awaiters = [asyncio.ensure_future(flight.run("a", func)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    awaiters[0].cancel()
+    await asyncio.sleep(0.01)
+
+    assert not cancelled.is_set()
+
+    awaiters[1].cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    assert len(flight) == 0
+
+
+def _delayed(response: httpx.Response):
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return response
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_client_coalesces_identical_lookups(
+    httpx_mock: HTTPXMock, ok_sample2_6fines: pytest.fixture
+) -> None:
+    """Single flight - identical concurrent lookups send one request."""
+
+    httpx_mock.add_callback(_delayed(httpx.Response(200, json=ok_sample2_6fines)))
+
+    async with KatApiClient() as client:
+        results = await asyncio.gather(*(
+            client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+            for _ in range(5)))
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert all(len(r) == 6 for r in results)
+    assert results[0] is not results[1]
+
+
+@pytest.mark.asyncio
+async def test_client_coalesces_errors(
+    httpx_mock: HTTPXMock, err_nodatafound: pytest.fixture
+) -> None:
+    """Single flight - all awaiters receive the same error."""
+
+    httpx_mock.add_callback(_delayed(httpx.Response(200, json=err_nodatafound)))
+
+    async with KatApiClient() as client:
+        results = await asyncio.gather(*(
+            client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+            for _ in range(3)), return_exceptions=True)
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert all(isinstance(r, KatError) for r in results)
+    assert all(r.error_subtype == KatErrorSubtype.VALIDATION_USER_NOT_FOUND_ONLINE for r in results)
+
+
+@pytest.mark.asyncio
+async def test_client_coalescing_disabled(
+    httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture
+) -> None:
+    """Single flight - every lookup sends a request when coalescing is off."""
+
+    httpx_mock.add_callback(_delayed(httpx.Response(200, json=ok_no_fines)), is_reusable=True)
+
+    async with KatApiClient(coalesce_requests=False) as client:
+        await asyncio.gather(*(
+            client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+            for _ in range(3)))
+
+    assert len(httpx_mock.get_requests()) == 3
+
+
+@pytest.mark.asyncio
+async def test_client_cancelled_lookup_cancels_request(httpx_mock: HTTPXMock, ok_no_fines: pytest.fixture) -> None:
+    """Single flight - cancelling the only lookup cancels its request."""
+
+    cancelled = asyncio.Event()
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return httpx.Response(200, json=ok_no_fines)
+
+    httpx_mock.add_callback(handler)
+
+    async with KatApiClient() as client:
+        lookup = asyncio.ensure_future(
+            client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE))
+        await asyncio.sleep(0.05)
+        lookup.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+
+@pytest.mark.asyncio
+async def test_client_close_cancels_shared_requests(httpx_mock: HTTPXMock) -> None:
+    """Single flight - requests in flight are cancelled on close and not retried."""
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(5)
+        raise httpx.ReadTimeout("timed out")
+
+    httpx_mock.add_callback(handler, is_reusable=True)
+
+    client = KatApiClient(retry_policy=KatRetryPolicy(max_attempts=3, backoff_base=0))
+    lookup = asyncio.ensure_future(
+        client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE))
+    await asyncio.sleep(0.05)
+    await client.aclose()
+
+    with pytest.raises(KatError) as ctx:
+        await lookup
+
+    await asyncio.sleep(0.05)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.API_UNKNOWN_ERROR
+    assert len(httpx_mock.get_requests()) == 1
@@ -0,0 +1,128 @@
+"""Obligation store tests."""
+
+import copy
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.data_models import KatIdentity, KatObligation, KatObligationApiResponse, PersonalIdentificationType
+from kat_bulgaria.kat_api_client import KatApiClient
+from kat_bulgaria.store import KatObligationStore
+
+from .conftest import EGN, LICENSE
+
+_IDENTITY = KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+
+def _obligations(payload: dict, lazy: bool = False) -> list[KatObligation]:
+    return [ob for og in KatObligationApiResponse(payload, lazy).obligations_data for ob in og.obligations]
+
+
+def test_obligation_identifier_and_key(ok_fine_served: pytest.fixture) -> None:
+    """Models - the raw obligation identifier is kept and the key is stable."""
+
+    obligation = _obligations(ok_fine_served)[0]
+    view = _obligations(ok_fine_served, lazy=True)[0]
+
+    assert obligation.obligation_identifier == "KAT|TICKET|17720000"
+    assert obligation.key == "K|123456"
+    assert view.obligation_identifier == obligation.obligation_identifier
+    assert view.key == obligation.key
+
+
+def test_store_first_update_adds_all(tmp_path, ok_sample1_2fines: pytest.fixture) -> None:
+    """Store - the first snapshot reports every obligation as added and persists it."""
+
+    obligations = _obligations(ok_sample1_2fines)
+    path = str(tmp_path / "store.db")
+
+    store = KatObligationStore(path)
+    diff = store.update(_IDENTITY, obligations)
+    store.close()
+
+    assert diff.added == obligations
+    assert not diff.removed and not diff.changed
+
+    store = KatObligationStore(path)
+    assert store.get(_IDENTITY) == obligations
+    assert not store.update(_IDENTITY, obligations)
+    store.close()
+
+
+def test_store_obligations_sharing_a_document(tmp_path, ok_sample2_6fines: pytest.fixture) -> None:
+    """Store - obligations with the same document series and number are all kept."""
+
+    obligations = _obligations(ok_sample2_6fines)
+    store = KatObligationStore(str(tmp_path / "store.db"))
+
+    assert len({ob.key for ob in obligations}) == 1
+    assert store.update(_IDENTITY, obligations).added == obligations
+    assert store.get(_IDENTITY) == obligations
+    assert not store.update(_IDENTITY, obligations)
+
+    diff = store.update(_IDENTITY, obligations[:-1])
+
+    assert diff.removed == obligations[-1:]
+    assert store.get(_IDENTITY) == obligations[:-1]
+    store.close()
+
+
+def test_store_diff(tmp_path, ok_sample1_2fines: pytest.fixture, ok_fine_sample: pytest.fixture) -> None:
+    """Store - reports added, removed and changed obligations."""
+
+    store = KatObligationStore(str(tmp_path / "store.db"))
+    store.update(_IDENTITY, _obligations(ok_fine_sample))
+
+    payload = copy.deepcopy(ok_sample1_2fines)
+    payload["obligationsData"][0]["obligations"][0]["amount"] += 50
+    new = _obligations(payload)
+
+    diff = store.update(_IDENTITY, new)
+
+    assert [ob.key for ob in diff.added] == [new[1].key]
+    assert diff.removed == []
+    assert len(diff.changed) == 1
+    assert diff.changed[0][1] == new[0]
+    assert diff.changed[0][1].amount == diff.changed[0][0].amount + 50
+
+    diff = store.update(_IDENTITY, new[1:])
+
+    assert diff.removed == [new[0]]
+    assert store.get(_IDENTITY) == new[1:]
+
+    other = KatIdentity.individual(EGN, PersonalIdentificationType.NATIONAL_ID, "AA1234567")
+    assert store.get(other) == []
+
+    store.delete(_IDENTITY)
+    assert store.get(_IDENTITY) == []
+    store.close()
+
+
+def test_store_frozen_obligations_unchanged(tmp_path, ok_sample1_2fines: pytest.fixture) -> None:
+    """Store - frozen obligations equal to the saved ones are not reported as changed."""
+
+    store = KatObligationStore(str(tmp_path / "store.db"))
+    store.update(_IDENTITY, _obligations(ok_sample1_2fines))
+
+    diff = store.update(_IDENTITY, [ob.freeze() for ob in _obligations(ok_sample1_2fines)])
+
+    assert (diff.added, diff.removed, diff.changed) == ([], [], [])
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_store_with_lazy_client(
+    tmp_path, httpx_mock: HTTPXMock, ok_sample1_2fines: pytest.fixture
+) -> None:
+    """Store - accepts lazy views returned by the client."""
+
+    httpx_mock.add_response(json=ok_sample1_2fines)
+
+    async with KatApiClient(lazy_parsing=True) as client:
+        obligations = await client.get_obligations(_IDENTITY)
+
+    store = KatObligationStore(str(tmp_path / "store.db"))
+    diff = store.update(_IDENTITY, obligations)
+
+    assert diff.added == [ob.materialize() for ob in obligations]
+    store.close()
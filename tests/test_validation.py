@@ -0,0 +1,177 @@
+"""Offline validation tests."""
+
+from datetime import date
+
+import pytest
+
+from pytest_httpx import HTTPXMock
+
+from kat_bulgaria.data_models import KatIdentity, PersonalIdentificationType
+from kat_bulgaria.errors import KatError, KatErrorSubtype
+from kat_bulgaria.kat_api_client import KatApiClient
+from kat_bulgaria.validation import (
+    egn_birth_date,
+    is_valid_bulstat,
+    is_valid_egn,
+    is_valid_gov_id,
+    normalize_car_plate,
+    validate_identities,
+    validate_identity
+)
+
+from .conftest import EGN, GOV_ID, LICENSE, BULSTAT, INVALID_EGN
+
+VALID_EGN = "8001010008"
+
+
+@pytest.mark.parametrize("egn, birth_date", [
+    ("8001010008", date(1980, 1, 1)),
+    ("7523169263", date(1875, 3, 16)),
+    ("0041010002", date(2000, 1, 1)),
+    ("8002300000", None),
+    ("8013010000", None),
+    (INVALID_EGN, None),
+])
+def test_egn_birth_date(egn: str, birth_date: date | None) -> None:
+    """Birth date with the century encoded in the month."""
+
+    assert egn_birth_date(egn) == birth_date
+
+
+@pytest.mark.parametrize("egn, valid", [
+    ("8001010008", True),
+    ("7523169263", True),
+    ("8001010009", False),
+    (EGN, False),
+    (INVALID_EGN, False),
+    (None, False),
+])
+def test_is_valid_egn(egn: str, valid: bool) -> None:
+    """EGN checksum."""
+
+    assert is_valid_egn(egn) is valid
+
+
+@pytest.mark.parametrize("bulstat, valid", [
+    ("831642181", True),
+    ("831642182", False),
+    # First checksum is 10, the second set of weights is used
+    ("100000086", True),
+    ("100000080", False),
+    ("12345678", False),
+])
+def test_is_valid_bulstat(bulstat: str, valid: bool) -> None:
+    """BULSTAT checksum."""
+
+    assert is_valid_bulstat(bulstat) is valid
+
+
+@pytest.mark.parametrize("govt_id, valid", [
+    ("123456789", True),
+    ("AA1234567", True),
+    # Matched by the unanchored alternation of the old regex
+    ("1234567890", False),
+    ("123456789AA", False),
+    ("XAA1234567", False),
+    ("AA1234567\n", False),
+])
+def test_is_valid_gov_id(govt_id: str, valid: bool) -> None:
+    """ID card number format."""
+
+    assert is_valid_gov_id(govt_id) is valid
+
+
+def test_normalize_car_plate() -> None:
+    """Cyrillic look-alikes become Latin, spaces and dashes are removed."""
+
+    assert normalize_car_plate(" св 1234-ав ") == "CB1234AB"
+    assert normalize_car_plate("CB1234AB") == "CB1234AB"
+
+
+def test_validate_identity_normalizes() -> None:
+    """The normalized identity is returned."""
+
+    identity = KatIdentity.individual(f" {VALID_EGN} ", PersonalIdentificationType.CAR_PLATE_NUM, "СВ 1234 АВ")
+
+    normalized = validate_identity(identity)
+
+    assert normalized.egn == VALID_EGN
+    assert normalized.identifier == "CB1234AB"
+
+
+def test_validate_identities() -> None:
+    """Per-row results, in order."""
+
+    identities = [
+        KatIdentity.individual(VALID_EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE),
+        KatIdentity.individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE),
+        KatIdentity.individual(VALID_EGN, PersonalIdentificationType.CAR_PLATE_NUM, "Б 0000 ББ"),
+        KatIdentity.business(VALID_EGN, GOV_ID, "831642182"),
+    ]
+
+    results = validate_identities(identities)
+
+    assert [result.identity for result in results] == identities
+    assert results[0].error is None
+    assert results[0].normalized == identities[0]
+    assert results[1].error.error_subtype == KatErrorSubtype.VALIDATION_EGN_INVALID
+    assert results[2].error.error_subtype == KatErrorSubtype.VALIDATION_CAR_PLATE_NUMBER_INVALID
+    assert results[3].error.error_subtype == KatErrorSubtype.VALIDATION_BULSTAT_INVALID
+    assert all(result.normalized is None for result in results[1:])
+
+
+def test_validate_identities_non_string_values() -> None:
+    """Numbers, e.g. read from a spreadsheet, are per-row errors, not a failed batch."""
+
+    identities = [
+        KatIdentity.individual(7523169263, PersonalIdentificationType.DRIVING_LICENSE, LICENSE),
+        KatIdentity.individual(VALID_EGN, PersonalIdentificationType.DRIVING_LICENSE, 123456789),
+        KatIdentity.individual(VALID_EGN, PersonalIdentificationType.CAR_PLATE_NUM, 1234),
+        KatIdentity.individual(VALID_EGN, 1, LICENSE),
+        KatIdentity.business(VALID_EGN, 123456789, "831642181"),
+        KatIdentity.business(VALID_EGN, GOV_ID, 831642181),
+    ]
+
+    results = validate_identities(identities)
+
+    assert [result.error.error_subtype for result in results] == [
+        KatErrorSubtype.VALIDATION_EGN_INVALID,
+        KatErrorSubtype.VALIDATION_DRIVING_LICENSE_INVALID,
+        KatErrorSubtype.VALIDATION_CAR_PLATE_NUMBER_INVALID,
+        KatErrorSubtype.VALIDATION_IDENTIFIER_TYPE_INVALID,
+        KatErrorSubtype.VALIDATION_GOV_ID_NUMBER_INVALID,
+        KatErrorSubtype.VALIDATION_BULSTAT_INVALID,
+    ]
+
+
+def test_validate_identities_without_checksums() -> None:
+    """Only the format is checked without checksums."""
+
+    results = validate_identities([KatIdentity.business(EGN, GOV_ID, BULSTAT)], checksums=False)
+
+    assert results[0].error is None
+
+
+@pytest.mark.asyncio
+async def test_client_strict_validation(httpx_mock: HTTPXMock) -> None:
+    """Strict validation rejects a bad checksum without a request."""
+
+    client = KatApiClient(strict_validation=True)
+
+    with pytest.raises(KatError) as ctx:
+        await client.get_obligations_individual(EGN, PersonalIdentificationType.DRIVING_LICENSE, LICENSE)
+
+    assert ctx.value.error_subtype == KatErrorSubtype.VALIDATION_EGN_INVALID
+    assert not httpx_mock.get_requests()
+
+
+@pytest.mark.asyncio
+async def test_client_normalizes_car_plate(httpx_mock: HTTPXMock, ok_no_fines: dict) -> None:
+    """Cyrillic car plates are sent with Latin letters."""
+
+    httpx_mock.add_response(json=ok_no_fines)
+
+    client = KatApiClient()
+    await client.get_obligations_individual(EGN, PersonalIdentificationType.CAR_PLATE_NUM, "СВ 1234 АВ")
+
+    assert httpx_mock.get_request().url.params["foreignVehicleNumber"] == "CB1234AB"